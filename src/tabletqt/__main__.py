@@ -42,6 +42,9 @@ def parse(cl_input):
                         help='Debug mode'),
     parser.add_argument('-V', '--version', action='store_true',
                         help='Print the current version')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('compile', help='Compile the configuration files into a binary bundle '
+                                           'in the user configuration directory')
     return parser.parse_args(cl_input)
 
 
@@ -59,6 +62,13 @@ def main():
         print(f'{app_name} version: {version}')
         sys.exit(0)
 
+    if args.command == 'compile':
+        # Compile the configuration bundle and quit
+        from tabletqt.config_bundle import ConfigBundle
+        bundle_path = ConfigBundle.compile()  # Where Tablets look for it
+        print(f'Compiled configuration bundle: {bundle_path}')
+        sys.exit(0)
+
     if args.demo:
         spath = Path(__file__).parent / f'demo/{args.demo}.py'
         sys.exit(0)
@@ -0,0 +1,131 @@
+"""
+config_bundle.py – Compiled snapshot of all the yaml configuration files
+"""
+# System
+import logging
+import pickle
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Tablet
+from tabletqt import version
+from tabletqt.config_cache import ConfigCache, CacheEntry, ConfigSections
+from tabletqt.styledb import StyleDB, config_type
+
+_logger = logging.getLogger(__name__)
+
+bundle_format = 2  # Bump whenever the layout of the bundle changes
+
+# Every configuration file loaded by a Tablet
+bundle_fspec = {**{k: v.nt for k, v in config_type.items()}, 'images': None}
+# Files organized by Drawing Type, each Drawing Type is pickled separately so that it can be loaded on demand
+bundle_sections = ['symbols', 'stickers', 'drawing_types']
+
+
+class ConfigBundle:
+    """
+    Parsing and validating the yaml configuration files is most of what it costs to start up a Tablet.
+    A short-lived process, such as a command line render, pays that cost on every run.
+
+    Compiling the configuration files produces a single binary snapshot of the parsed and validated data.
+    The snapshot records the library version and the stamp (modification time, size and content hash) of
+    each source file. When a Tablet starts up, the snapshot is loaded in a single read and used to seed the
+    ConfigCache, but only if it was compiled by this version of the library and every source file still
+    has the recorded content. Otherwise, it is ignored and the yaml files are loaded as usual.
+    """
+    bundle_path = ConfigCache.user_config_dir / "config.bundle"
+    loaded = False  # Only load once per process
+    rejected: Optional[Tuple[Path, int, int]] = None  # Path, mtime and size of the last bundle found unusable
+
+    @classmethod
+    def compile(cls, path: Optional[Path] = None) -> Path:
+        """
+        Load and validate every configuration file and save the results in a bundle
+
+        :param path: Write the bundle here instead of the default bundle path
+        :return: Path of the bundle written
+        """
+        path = path or cls.bundle_path
+        config_data = ConfigCache.load_many(bundle_fspec)
+        for fname in bundle_sections:
+            config_data[fname] = ConfigCache.load_sections(fname).pickled()
+        StyleDB.load_config_files()  # Raises an exception if any of the style data is invalid
+
+        snapshot = {
+            'format': bundle_format,
+            'version': version,
+            'stamps': {fname: ConfigCache.entry(fname).stamp for fname in config_data},
+            'data': config_data,
+        }
+        # Write the new bundle alongside the old one and then swap it in so that
+        # a concurrently starting Tablet never reads a partially written bundle
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+        tmp_path.replace(path)
+        _logger.info(f"Compiled configuration bundle: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> bool:
+        """
+        Seed the ConfigCache and StyleDB from a compiled bundle if there is a current one
+
+        A bundle that can't be used is only read once. Until the bundle file itself changes, later calls
+        cost a stat of it and fall straight back to the yaml files.
+
+        :param path: Read the bundle here instead of the default bundle path
+        :return: True if the bundle was loaded
+        """
+        if cls.loaded:
+            return True
+        path = path or cls.bundle_path
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return False
+        bundle_stamp = (path, st.st_mtime_ns, st.st_size)
+        if bundle_stamp == cls.rejected:
+            return False
+        cls.loaded = cls.read(path)
+        if not cls.loaded:
+            cls.rejected = bundle_stamp
+        return cls.loaded
+
+    @classmethod
+    def read(cls, path: Path) -> bool:
+        """
+        Read a bundle and, if it is current, seed the ConfigCache and StyleDB with it
+
+        :param path: The bundle file
+        :return: True if the bundle was current
+        """
+        try:
+            snapshot = pickle.loads(path.read_bytes())
+        except FileNotFoundError:
+            return False
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            _logger.warning(f"Ignoring unreadable configuration bundle [{path}]: {e}")
+            return False
+
+        if snapshot.get('format') != bundle_format or snapshot.get('version') != version:
+            _logger.info(f"Configuration bundle [{path}] compiled by another version, using yaml files")
+            return False
+
+        entries = {}
+        for fname, stamp in snapshot['stamps'].items():
+            current_stamp = ConfigCache.verify(fname, stamp)
+            if not current_stamp:
+                _logger.info(f"Configuration file [{fname}] changed since bundle was compiled, using yaml files")
+                return False
+            data = snapshot['data'][fname]
+            if fname in bundle_sections:
+                data = ConfigSections.from_pickled(data)
+            entries[fname] = CacheEntry(stamp=current_stamp, data=data)
+        if entries.keys() != {*bundle_fspec, *bundle_sections}:
+            _logger.info(f"Configuration bundle [{path}] is incomplete, using yaml files")
+            return False
+
+        ConfigCache.seed(entries)
+        StyleDB.install(snapshot['data'])  # Already validated when compiled
+        _logger.info(f"Loaded configuration bundle: {path}")
+        return True
@@ -0,0 +1,322 @@
+"""
+config_cache.py – Process wide, load once cache of the yaml configuration files
+"""
+# System
+import logging
+import hashlib
+import pickle
+import re
+import shutil
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import NamedTuple, Any, Dict, Optional, Iterator
+
+# Tablet
+from tabletqt.tablet_config import TabletConfig
+
+_logger = logging.getLogger(__name__)
+
+# A top level mapping key in block style, ex: 'Starr class diagram:  # Drawing type'
+top_level_key = re.compile(r"^(?P<key>[A-Za-z_][^:#]*?)\s*:(\s.*)?$")
+
+
+class FileStamp(NamedTuple):
+    """Identifies the exact content of a configuration file when it was loaded"""
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+class CacheEntry(NamedTuple):
+    stamp: FileStamp
+    data: Any
+
+
+class ConfigSections(Mapping):
+    """
+    Read only mapping of the top level keys of a configuration file, such as the Drawing Types in
+    drawing_types.yaml and symbols.yaml, where each top level value is parsed only when first requested.
+
+    The file is scanned once to find the text of each top level section. A Tablet that draws a single
+    Drawing Type never parses the sections for any other Drawing Type, so startup time and memory don't
+    grow as more notations are added to the file.
+
+    If the file contains anything the scan doesn't understand (documents, anchors, flow style mappings, ...)
+    the whole file is parsed up front instead.
+    """
+
+    def __init__(self, sections: Dict[Any, Any], decode, loaded: Optional[Dict[Any, Any]] = None):
+        """
+        Constructor, see the from_yaml and from_pickled constructors
+
+        :param sections: Undecoded section content keyed by top level key
+        :param decode: Converts a key and its undecoded content into the section data
+        :param loaded: Section data that has already been decoded
+        """
+        self._sections = sections
+        self._decode = decode
+        self._loaded = loaded or {}
+        self._keys = list(self._loaded) + [k for k in sections if k not in self._loaded]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_yaml(cls, text: str) -> 'ConfigSections':
+        """
+        Index the top level sections of yaml text without parsing them
+
+        :param text: Content of a yaml configuration file
+        :return: Lazily parsed sections of the file
+        """
+        import yaml  # Deferred along with mi_config, see ConfigCache._reload
+
+        def parse(key, section_text):
+            section = yaml.safe_load(section_text)
+            if not isinstance(section, dict) or list(section) != [key]:
+                raise ValueError(f"Section [{key}] is not a simple top level mapping")
+            return section[key]
+
+        sections = {}
+        key = None
+        start = 0
+        lines = text.splitlines(keepends=True)
+        offset = 0
+        for line in lines:
+            if line[:1] not in ('', ' ', '\t', '\n', '\r', '#'):
+                m = top_level_key.match(line.rstrip('\r\n'))
+                if not m:
+                    # Not a simple block style key, so don't try to be clever
+                    return cls(sections={}, decode=parse, loaded=yaml.safe_load(text) or {})
+                if key is not None:
+                    sections[key] = text[start:offset]
+                key = m.group('key')
+                start = offset
+            offset += len(line)
+        if key is not None:
+            sections[key] = text[start:]
+        return cls(sections=sections, decode=parse)
+
+    @classmethod
+    def from_pickled(cls, sections: Dict[Any, bytes]) -> 'ConfigSections':
+        """
+        Wrap sections that were pickled individually, in a compiled configuration bundle for example
+
+        :param sections: Pickled section data keyed by top level key
+        :return: Lazily unpickled sections
+        """
+        return cls(sections=sections, decode=lambda key, data: pickle.loads(data))
+
+    def pickled(self) -> Dict[Any, bytes]:
+        """
+        Decodes every section and pickles each one separately
+
+        :return: Pickled section data keyed by top level key
+        """
+        return {k: pickle.dumps(self[k], protocol=pickle.HIGHEST_PROTOCOL) for k in self._keys}
+
+    def __getitem__(self, key):
+        try:
+            return self._loaded[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._loaded:
+                content = self._sections[key]  # KeyError if there is no such section
+                self._loaded[key] = self._decode(key, content)
+                del self._sections[key]  # No longer needed
+            return self._loaded[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self._loaded or key in self._sections
+
+
+class ConfigCache:
+    """
+    Every Tablet needs the same set of yaml configuration files (colors, line styles, symbols, stickers, ...).
+    Rather than re-reading and re-validating each of these files whenever a Tablet is created, each file is
+    loaded once per process and then shared by all subsequent requests.
+
+    Each cached file is stamped with its modification time, size, and content hash. A request for a file that has
+    not been touched since it was loaded costs a single stat call. If the modification time or size has changed,
+    the content hash decides whether the file really needs to be parsed again (a touched, but otherwise identical
+    file is not reloaded).
+
+    The generation count is bumped whenever any file is (re)loaded, so that anything derived from the
+    configuration data can cheaply detect that it must be rebuilt.
+    """
+    user_config_dir = Path.home() / ".config" / TabletConfig.app_name  # Where mi_config keeps the user's copies
+    ext = ".yaml"
+    generation = 0
+    _entries: Dict[str, CacheEntry] = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def load(cls, fname: str, nt: Optional[Any] = None) -> Any:
+        """
+        Returns the loaded data for a single configuration file, parsing it only if it has never been
+        loaded or has changed since it was last loaded.
+
+        :param fname: Configuration file name without the extension, ex: 'colors'
+        :param nt: Optional named tuple used by mi_config to load each record
+        :return: The loaded configuration data
+        """
+        with cls._lock:
+            entry = cls._entries.get(fname)
+            if entry and not isinstance(entry.data, ConfigSections) and cls._is_current(fname, entry):
+                return entry.data
+            return cls._reload(fname, nt)
+
+    @classmethod
+    def load_sections(cls, fname: str) -> ConfigSections:
+        """
+        Returns the top level sections of a configuration file, such as symbols.yaml, where each
+        section is parsed only when it is first requested
+
+        :param fname: Configuration file name without the extension, ex: 'symbols'
+        :return: The lazily parsed configuration data
+        """
+        with cls._lock:
+            entry = cls._entries.get(fname)
+            if entry and isinstance(entry.data, ConfigSections) and cls._is_current(fname, entry):
+                return entry.data
+            _logger.info(f"Config cache indexing: [{fname}]")
+            fpath = cls.file_path(fname)
+            st = fpath.stat()
+            content = fpath.read_bytes()
+            stamp = FileStamp(mtime_ns=st.st_mtime_ns, size=st.st_size, digest=hashlib.sha256(content).hexdigest())
+            data = ConfigSections.from_yaml(content.decode('utf-8'))
+            cls._entries[fname] = CacheEntry(stamp=stamp, data=data)
+            cls.generation += 1
+            return data
+
+    @classmethod
+    def load_many(cls, fspec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Loads each file in an mi_config style file specification
+
+        :param fspec: Configuration file names, each with an optional named tuple
+        :return: Loaded data keyed by file name
+        """
+        return {fname: cls.load(fname, nt) for fname, nt in fspec.items()}
+
+    @classmethod
+    def entry(cls, fname: str) -> Optional[CacheEntry]:
+        """
+        The cached entry for a configuration file, if it has been loaded
+
+        :param fname: Configuration file name without the extension
+        :return: Stamp and data of the file or None if it hasn't been loaded
+        """
+        with cls._lock:
+            return cls._entries.get(fname)
+
+    @classmethod
+    def seed(cls, entries: Dict[str, CacheEntry]):
+        """
+        Populate the cache with data that has already been loaded elsewhere, a compiled
+        configuration bundle for example. The stamps must describe the files' current content.
+
+        :param entries: Stamped data keyed by configuration file name
+        """
+        with cls._lock:
+            cls._entries.update(entries)
+            cls.generation += 1
+
+    @classmethod
+    def clear(cls):
+        """
+        Discard all cached data so that every file is parsed again on its next request
+        """
+        with cls._lock:
+            cls._entries.clear()
+            cls.generation += 1
+
+    @classmethod
+    def file_path(cls, fname: str) -> Path:
+        """
+        Path to the user's copy of a configuration file. As with mi_config, the file is copied
+        from the library configuration directory if the user doesn't have it yet.
+
+        :param fname: Configuration file name without the extension
+        :return: Path to the user's configuration file
+        """
+        fpath = cls.user_config_dir / (fname + cls.ext)
+        if not fpath.exists():
+            cls.user_config_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy(TabletConfig.config_path / fpath.name, cls.user_config_dir)
+        return fpath
+
+    @classmethod
+    def stamp(cls, fname: str) -> FileStamp:
+        """
+        Stamp the current content of a configuration file
+
+        :param fname: Configuration file name without the extension
+        :return: Modification time, size and content hash of the file
+        """
+        fpath = cls.file_path(fname)
+        st = fpath.stat()
+        return FileStamp(mtime_ns=st.st_mtime_ns, size=st.st_size,
+                         digest=hashlib.sha256(fpath.read_bytes()).hexdigest())
+
+    @classmethod
+    def verify(cls, fname: str, stamp: FileStamp) -> Optional[FileStamp]:
+        """
+        Does a configuration file still have the content described by a stamp?
+
+        :param fname: Configuration file name without the extension
+        :param stamp: Stamp taken when the file's data was loaded
+        :return: The file's current stamp if the content is unchanged, otherwise None
+        """
+        try:
+            st = (cls.user_config_dir / (fname + cls.ext)).stat()
+        except FileNotFoundError:
+            return None
+        if st.st_mtime_ns == stamp.mtime_ns and st.st_size == stamp.size:
+            return stamp
+        # The file has been touched, but its content may be the same
+        current = cls.stamp(fname)
+        return current if current.digest == stamp.digest else None
+
+    @classmethod
+    def _is_current(cls, fname: str, entry: CacheEntry) -> bool:
+        """
+        Has this file's content changed since it was cached?
+
+        :param fname: Configuration file name without the extension
+        :param entry: The cached entry
+        :return: True if the cached data is still valid
+        """
+        stamp = cls.verify(fname, entry.stamp)
+        if not stamp:
+            return False
+        if stamp is not entry.stamp:
+            cls._entries[fname] = entry._replace(stamp=stamp)
+        return True
+
+    @classmethod
+    def _reload(cls, fname: str, nt: Optional[Any]) -> Any:
+        """
+        Parse a configuration file and cache its data
+
+        :param fname: Configuration file name without the extension
+        :param nt: Optional named tuple used by mi_config to load each record
+        :return: The loaded configuration data
+        """
+        # Parsing yaml is only necessary when something isn't cached, and it is slow to import,
+        # so modules that merely import the configuration classes don't pay for it
+        from mi_config.config import Config
+
+        _logger.info(f"Config cache parsing: [{fname}]")
+        stamp = cls.stamp(fname)
+        c = Config(app_name=TabletConfig.app_name, lib_config_dir=TabletConfig.config_path, fspec={fname: nt})
+        data = c.loaded_data[fname]
+        cls._entries[fname] = CacheEntry(stamp=stamp, data=data)
+        cls.generation += 1
+        return data
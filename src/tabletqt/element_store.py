@@ -0,0 +1,184 @@
+"""
+element_store.py - Compact column storage for the elements drawn on a Layer
+"""
+# System
+from array import array
+from itertools import repeat
+from enum import Enum
+from collections.abc import Sequence
+from typing import Dict, List, Iterator, Any
+
+# Tablet
+import tabletqt.element as element
+from tabletqt.geometry_types import Position, Rect_Size
+
+
+class Column(Enum):
+    """How an element field is stored"""
+    POINT = 0  # A Position, as x and y float columns
+    SIZE = 1  # A Rect_Size, as height and width float columns
+    NUMBER = 2  # A float column
+    FLAG = 3  # A boolean column
+    VALUE = 4  # An id column for a value, such as a style name, that few elements differ in
+
+
+class ElementColumns(Sequence):
+    """
+    The elements of one kind drawn on a Layer, such as its line segments, kept by column rather than as
+    a tuple per element. Each coordinate and size is a float in a growable array and each style, fill or
+    color is a small integer id into a table of the distinct values seen so far. So a line segment takes
+    a few dozen bytes rather than the hundreds taken by a tuple of tuples of Python numbers.
+
+    Elements are appended as their usual namedtuples, and iterating or indexing hands back the same
+    namedtuples, built on the fly. So anything that draws or exports the elements needn't know how they
+    are stored. Code that wants to work on whole columns at once can get each one with column(). The
+    arrays support the buffer protocol, so with NumPy, np.frombuffer() views a column without copying.
+    """
+
+    def __init__(self, element_type, **fields: Column):
+        """
+        Constructor
+
+        :param element_type: The element namedtuple
+        :param fields: How to store each field of the element, in the namedtuple's order
+        """
+        self.element_type = element_type
+        self.fields = fields
+        self.count = 0
+        self.columns: Dict[str, array] = {}
+        self.values: Dict[str, List[Any]] = {}  # Distinct values of each VALUE field, by id
+        self.value_ids: Dict[str, Dict[Any, int]] = {}
+        for name, kind in fields.items():
+            if kind is Column.POINT:
+                self.columns[name + '.x'] = array('d')
+                self.columns[name + '.y'] = array('d')
+            elif kind is Column.SIZE:
+                self.columns[name + '.height'] = array('d')
+                self.columns[name + '.width'] = array('d')
+            elif kind is Column.NUMBER:
+                self.columns[name] = array('d')
+            elif kind is Column.FLAG:
+                self.columns[name] = array('b')
+            else:
+                self.columns[name] = array('H')
+                self.values[name] = []
+                self.value_ids[name] = {}
+
+    def append(self, e):
+        """
+        Add an element
+
+        :param e: The element namedtuple
+        """
+        for (name, kind), value in zip(self.fields.items(), e):
+            if kind is Column.POINT:
+                self.columns[name + '.x'].append(value[0])
+                self.columns[name + '.y'].append(value[1])
+            elif kind is Column.SIZE:
+                self.columns[name + '.height'].append(value[0])
+                self.columns[name + '.width'].append(value[1])
+            elif kind is Column.FLAG:
+                self.columns[name].append(bool(value))
+            elif kind is Column.NUMBER:
+                self.columns[name].append(value)
+            else:
+                self.columns[name].append(self.value_id(name, value))
+        self.count += 1
+
+    def extend(self, elements):
+        for e in elements:
+            self.append(e)
+
+    def value_id(self, name: str, value) -> int:
+        """
+        Returns the id of a value of a VALUE field, assigning the next id the first time the value is seen
+
+        :param name: Field name
+        :param value: Field value
+        :return: The value's id
+        """
+        ids = self.value_ids[name]
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = len(ids)
+            ids[value] = value_id
+            self.values[name].append(value)
+            if value_id > 0xffff and self.columns[name].typecode == 'H':
+                self.columns[name] = array('I', self.columns[name])
+        return value_id
+
+    def column(self, name: str) -> array:
+        """
+        Returns a column of the elements
+
+        :param name: Field name, with .x or .y for a POINT field and .height or .width for a SIZE field
+        :return: The column's array, with a value id per element for a VALUE field, see values
+        """
+        return self.columns[name]
+
+    def field_values(self, name: str) -> Iterator:
+        """
+        The values of one field of each element
+
+        :param name: Field name
+        :return: An iterator over the field's values, element by element
+        """
+        kind = self.fields[name]
+        # Tuples are made directly, bypassing the namedtuple constructors, as they are made in bulk
+        if kind is Column.POINT:
+            return map(tuple.__new__, repeat(Position), zip(self.columns[name + '.x'], self.columns[name + '.y']))
+        if kind is Column.SIZE:
+            return map(tuple.__new__, repeat(Rect_Size),
+                       zip(self.columns[name + '.height'], self.columns[name + '.width']))
+        if kind is Column.FLAG:
+            return map(bool, self.columns[name])
+        if kind is Column.NUMBER:
+            return iter(self.columns[name])
+        return map(self.values[name].__getitem__, self.columns[name])
+
+    def __iter__(self):
+        fields = zip(*(self.field_values(name) for name in self.fields))
+        return map(tuple.__new__, repeat(self.element_type), fields)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('element index out of range')
+        values = []
+        for name, kind in self.fields.items():
+            if kind is Column.POINT:
+                values.append(Position(self.columns[name + '.x'][index], self.columns[name + '.y'][index]))
+            elif kind is Column.SIZE:
+                values.append(Rect_Size(self.columns[name + '.height'][index],
+                                        self.columns[name + '.width'][index]))
+            elif kind is Column.FLAG:
+                values.append(bool(self.columns[name][index]))
+            elif kind is Column.NUMBER:
+                values.append(self.columns[name][index])
+            else:
+                values.append(self.values[name][self.columns[name][index]])
+        return self.element_type._make(values)
+
+
+def line_segments() -> ElementColumns:
+    return ElementColumns(element.Line_Segment, from_here=Column.POINT, to_there=Column.POINT, style=Column.VALUE)
+
+
+def circles() -> ElementColumns:
+    return ElementColumns(element.Circle, center=Column.POINT, radius=Column.NUMBER, border_style=Column.VALUE,
+                          fill=Column.VALUE)
+
+
+def rectangles() -> ElementColumns:
+    return ElementColumns(element.Rectangle, upper_left=Column.POINT, size=Column.SIZE, border_style=Column.VALUE,
+                          fill=Column.VALUE, radius=Column.NUMBER, top=Column.FLAG, bottom=Column.FLAG)
+
+
+def fill_rects() -> ElementColumns:
+    return ElementColumns(element.FillRect, upper_left=Column.POINT, size=Column.SIZE, color=Column.VALUE)
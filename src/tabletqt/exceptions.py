@@ -21,3 +21,6 @@ class TabletBoundsExceeded(TabletException):
         self.width = width
         super().__init__(f"{message} (Height exceeded: {height} Width exceeded: {width})")
 
+
+class UnsupportedFont(TabletException):
+    pass
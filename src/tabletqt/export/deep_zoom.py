@@ -0,0 +1,136 @@
+""" deep_zoom.py -- Export a Tablet as a Deep Zoom tile pyramid for viewing in a web browser """
+
+# System
+import os
+import math
+import json
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union, Dict, Any
+
+if TYPE_CHECKING:
+    from tabletqt.tablet import Tablet
+
+# Qt
+from PyQt6.QtGui import QColor
+
+# Tablet
+from tabletqt.export.raster import TiledRaster
+
+_logger = logging.getLogger(__name__)
+
+dzi_namespace = 'http://schemas.microsoft.com/deepzoom/2008'
+
+
+class DeepZoom:
+    """
+    Writes a Tablet as a Deep Zoom image: a descriptor file (name.dzi) and a folder (name_files) holding
+    a folder of PNG tiles for each zoom level. At level n the whole image fits in 2^n pixels, each level
+    doubling the resolution of the one before, up to the full resolution at the last level.
+    A browser viewer such as OpenSeadragon then fetches only the tiles in view at the current zoom.
+
+    Each level is painted straight from the Layer elements at its own scale rather than shrunk from
+    the level above. Since an element is only painted on the tiles it overlaps, tiles with nothing
+    on them are never painted and no file is written for them. Viewers draw a missing tile as empty, so the
+    Tablet's background color goes in the OpenSeadragon options written beside the descriptor (name.json)
+    for the viewer to fill the empty areas with. And at coarse levels, text too small to read is painted
+    as grey bars and symbols too small to make out are left out.
+    """
+
+    def __init__(self, tablet: 'Tablet', path: Union[str, os.PathLike], dpi: float = 300, tile_size: int = 256,
+                 legible: float = 6, workers: Optional[int] = None, antialias: bool = True):
+        """
+        Constructor
+
+        :param tablet: The Tablet to export
+        :param path: Path of the descriptor file, ending in .dzi
+        :param dpi: Pixels per inch at full resolution, where one tablet unit is a point
+        :param tile_size: Width and height of a tile in pixels
+        :param legible: Text less than this many pixels high is drawn as a grey bar, and symbols smaller than
+        this are left out
+        :param workers: Number of painting threads, by default one per CPU
+        :param antialias: Smooth the edges of lines, shapes and text
+        """
+        self.tablet = tablet
+        self.path = Path(path)
+        self.tiles_folder = self.path.with_name(self.path.stem + '_files')
+        self.dpi = dpi
+        self.tile_size = tile_size
+        self.legible = legible
+        self.workers = workers or os.cpu_count() or 1
+        self.antialias = antialias
+        self.width = math.ceil(tablet.Size.width * dpi / 72)
+        self.height = math.ceil(tablet.Size.height * dpi / 72)
+        self.max_level = math.ceil(math.log2(max(self.width, self.height, 1)))
+
+    def level_raster(self, level: int) -> TiledRaster:
+        """
+        Index the elements for painting at a zoom level
+
+        :param level: Zoom level, 0 being a single pixel
+        :return: A raster at the level's resolution, halved for each level below full resolution
+        """
+        return TiledRaster(self.tablet, dpi=self.dpi / 2 ** (self.max_level - level), tile_size=self.tile_size,
+                           antialias=self.antialias, legible=self.legible)
+
+    def viewer_options(self) -> Dict[str, Any]:
+        """
+        Options for an OpenSeadragon viewer of the image
+
+        :return: The descriptor to view, and the background color, if any, to fill where no tile was written
+        """
+        options: Dict[str, Any] = {'tileSources': self.path.name}
+        if self.tablet.background_color:
+            options['placeholderFillStyle'] = QColor(*self.tablet.background_color).name()
+        return options
+
+    def write(self) -> int:
+        """
+        Paint and write the tiles of every level, the descriptor and the viewer options
+
+        :return: Number of tiles written
+        """
+        # Tiles left over from an earlier export to the same path would show where there are none now
+        if self.tiles_folder.is_dir():
+            shutil.rmtree(self.tiles_folder)
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for level in range(self.max_level + 1):
+                raster = self.level_raster(level)
+                folder = self.tiles_folder / str(level)
+                folder.mkdir(parents=True)
+
+                def write_tile(column: int, row: int):
+                    raster.paint_tile(column, row).save(str(folder / f'{column}_{row}.png'), 'PNG')
+
+                tiles = [pool.submit(write_tile, column, row) for column, row in raster.index.tiles]
+                for t in tiles:
+                    t.result()
+                written += len(tiles)
+        self.path.write_text(
+            f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<Image xmlns="{dzi_namespace}" Format="png" Overlap="0" TileSize="{self.tile_size}">\n'
+            f'  <Size Width="{self.width}" Height="{self.height}"/>\n'
+            f'</Image>\n')
+        self.path.with_suffix('.json').write_text(json.dumps(self.viewer_options(), indent=2) + '\n')
+        _logger.info(f"Wrote deep zoom image [{self.path}] with {self.max_level + 1} levels, {written} tiles")
+        return written
+
+
+def save_deep_zoom(tablet: 'Tablet', path: Union[str, os.PathLike], dpi: float = 300, tile_size: int = 256,
+                   legible: float = 6, workers: Optional[int] = None) -> int:
+    """
+    Save a Tablet as a Deep Zoom tile pyramid
+
+    :param tablet: The Tablet to save
+    :param path: Path of the descriptor file, ending in .dzi. The tiles go in a folder beside it
+    :param dpi: Pixels per inch at full resolution, where one tablet unit is a point
+    :param tile_size: Width and height of a tile in pixels
+    :param legible: Text less than this many pixels high is drawn as a grey bar, and symbols smaller than
+    this are left out
+    :param workers: Number of painting threads, by default one per CPU
+    :return: Number of tiles written
+    """
+    return DeepZoom(tablet, path, dpi=dpi, tile_size=tile_size, legible=legible, workers=workers).write()
@@ -0,0 +1,109 @@
+""" document.py -- Paint many Tablets as the pages of a single PDF """
+
+# System
+import logging
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from tabletqt.tablet import Tablet
+
+# Qt
+from PyQt6.QtGui import QPainter
+
+# Tablet
+from tabletqt.scene_view import pdf_writer, page_layout
+from tabletqt.export.painter import DirectPainter, paint_page
+from tabletqt.export.target import ExportTarget, Output
+
+_logger = logging.getLogger(__name__)
+
+
+class PdfDocument:
+    """
+    A PDF with one page per Tablet, each page exactly the size of its Tablet.
+
+    Every page is painted directly from its Tablet's element lists onto the same PDF writer, so each
+    font and each image file is embedded only once for the whole document, no matter how many pages use it.
+    That is both faster and smaller than saving each Tablet to its own file and merging them afterward.
+
+    A Tablet added to a document need not be rendered, and is best created headless and immediate
+    so that no scene is built for it::
+
+        with PdfDocument('model.pdf') as doc:
+            for diagram in diagrams:
+                doc.add_page(diagram.tablet)
+    """
+
+    def __init__(self, output: Output):
+        """
+        Constructor
+
+        :param output: Path of the PDF file, a writable binary stream, or None to get the PDF content from close()
+        """
+        self.target = ExportTarget(output)
+        self.writer = None
+        self.painter: Optional[QPainter] = None
+        self.direct_painter: Optional[DirectPainter] = None
+        self.pages = 0
+        self.content: Optional[bytes] = None  # PDF content once closed, if there was no output
+
+    def add_page(self, tablet: 'Tablet'):
+        """
+        Paint a Tablet on a new page sized to fit it
+
+        :param tablet: The Tablet to paint
+        """
+        if not self.pages:
+            # The painter can't begin until the writer knows the size of its first page
+            self.writer = pdf_writer(self.target, tablet.Size)
+            self.painter = QPainter(self.writer)
+            # Shared by all pages so each image file is loaded only once
+            self.direct_painter = DirectPainter(self.painter)
+        else:
+            self.writer.setPageLayout(page_layout(tablet.Size))
+            self.writer.newPage()
+        paint_page(self.painter, tablet, self.direct_painter)
+        self.pages += 1
+        _logger.info(f"Added page [{self.pages}]: {tablet.Size.width} x {tablet.Size.height}")
+
+    def add_pages(self, tablets: Iterable['Tablet']):
+        """
+        Paint each Tablet on its own page, in order
+
+        :param tablets: The Tablets to paint
+        """
+        for t in tablets:
+            self.add_page(t)
+
+    def close(self) -> Optional[bytes]:
+        """
+        Finish writing the PDF
+
+        :return: The PDF content if no output was given
+        """
+        if self.painter:
+            self.painter.end()
+            self.painter = None
+            self.content = self.target.finish()
+        elif not self.pages:
+            _logger.warning("PDF document closed without any pages, nothing written")
+        return self.content
+
+    def __enter__(self) -> 'PdfDocument':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def save_pdf_document(tablets: Iterable['Tablet'], output: Output) -> Optional[bytes]:
+    """
+    Save a sequence of Tablets as the pages of one PDF
+
+    :param tablets: The Tablets to save, one per page
+    :param output: Path of the PDF file, a writable binary stream, or None
+    :return: The PDF content if no output was given
+    """
+    doc = PdfDocument(output)
+    doc.add_pages(tablets)
+    return doc.close()
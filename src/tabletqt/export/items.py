@@ -0,0 +1,75 @@
+""" items.py -- Geometry and crayons of the Qt items built when some elements are added to a Layer """
+
+# System
+import logging
+from collections import namedtuple
+from typing import Optional, Tuple
+
+# Qt
+from PyQt6.QtGui import QPainterPath, QBrush, QPen, QColor
+from PyQt6.QtWidgets import (QGraphicsItem, QGraphicsLineItem, QGraphicsRectItem, QGraphicsEllipseItem,
+                             QGraphicsPolygonItem, QGraphicsPathItem, QAbstractGraphicsShapeItem)
+
+# Tablet
+from tabletqt.graphics.symbol import SymbolItem
+
+_logger = logging.getLogger(__name__)
+
+# DiagnosticMarker.render draws raw rectangles in black, whatever their items' pens. Exporters use this
+# pen in their place rather than setting it on items that the caller still owns
+raw_rectangle_pen = QPen(QColor(0, 0, 0))
+
+# What a Qt item draws, in scene coordinates, as plain data that can be painted without the item
+ItemShape = namedtuple('_ItemShape', 'path pen brush')  # No brush for an unfilled shape
+
+
+def item_path(item: QGraphicsItem) -> Optional[QPainterPath]:
+    """
+    Returns the outline of a Qt shape item in its own coordinates
+
+    :param item: A line, rectangle, ellipse, polygon or path item
+    :return: The outline, or None for any other kind of item
+    """
+    path = QPainterPath()
+    if isinstance(item, QGraphicsLineItem):
+        path.moveTo(item.line().p1())
+        path.lineTo(item.line().p2())
+    elif isinstance(item, QGraphicsRectItem):
+        path.addRect(item.rect())
+    elif isinstance(item, QGraphicsEllipseItem):
+        path.addEllipse(item.rect())
+    elif isinstance(item, QGraphicsPolygonItem):
+        path.addPolygon(item.polygon())
+        path.closeSubpath()
+    elif isinstance(item, QGraphicsPathItem):
+        path = item.path()
+    else:
+        _logger.warning(f"Cannot export a [{type(item).__name__}], skipped")
+        return None
+    return path
+
+
+def item_brush(item: QGraphicsItem) -> Optional[QBrush]:
+    return item.brush() if isinstance(item, QAbstractGraphicsShapeItem) else None
+
+
+def item_shapes(item: QGraphicsItem, pen: Optional[QPen] = None) -> Tuple[ItemShape, ...]:
+    """
+    Returns what a placed symbol or Qt shape item draws, copied out of the item so that it can be painted
+    from any thread. Qt items may only be used from the thread that built them.
+
+    :param item: A placed symbol, or a line, rectangle, ellipse, polygon or path item
+    :param pen: Draw a shape item's outline with this pen rather than the item's own
+    :return: Each path drawn, mapped to scene coordinates, with copies of the pen and brush to draw it
+    """
+    transform = item.sceneTransform()
+    if isinstance(item, SymbolItem):
+        return tuple(ItemShape(path=transform.map(c.path), pen=QPen(c.pen),
+                               brush=None if c.brush is None else QBrush(c.brush))
+                     for c in item.prototype.components)
+    path = item_path(item)
+    if path is None:
+        return ()
+    brush = item_brush(item)
+    return (ItemShape(path=transform.map(path), pen=QPen(pen or item.pen()),
+                      brush=None if brush is None else QBrush(brush)),)
@@ -0,0 +1,600 @@
+""" native_pdf.py -- Write Tablets to PDF content streams directly from their Layer element lists """
+
+# System
+import logging
+import hashlib
+import struct
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Iterable, Tuple
+
+if TYPE_CHECKING:
+    from tabletqt.tablet import Tablet
+    from tabletqt.layer import Layer
+
+# Qt
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainterPath, QPen, QBrush, QColor, QTextLayout, QImage, QRawFont, QGlyphRun
+from PyQt6.QtWidgets import QGraphicsItem
+
+# Tablet
+from tabletqt.exceptions import UnsupportedFont
+from tabletqt.styledb import StyleDB
+from tabletqt.graphics.crayon_box import CrayonBox
+from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.text_element import tbox_xoffset, tbox_yoffset
+from tabletqt.graphics.text_metrics import TextMetrics
+from tabletqt.graphics.symbol import SymbolItem, SymbolPrototype
+from tabletqt.export.painter import style_order
+from tabletqt.export.items import item_path, item_brush, raw_rectangle_pen
+from tabletqt.export.pdf_file import PdfFile, Name, Ref, number, serialize
+from tabletqt.export.target import ExportTarget, Output
+from tabletqt.export.truetype import TrueTypeFont
+
+_logger = logging.getLogger(__name__)
+
+cap_styles = {Qt.PenCapStyle.FlatCap: 0, Qt.PenCapStyle.RoundCap: 1, Qt.PenCapStyle.SquareCap: 2}
+join_styles = {Qt.PenJoinStyle.MiterJoin: 0, Qt.PenJoinStyle.SvgMiterJoin: 0, Qt.PenJoinStyle.RoundJoin: 1,
+               Qt.PenJoinStyle.BevelJoin: 2}
+
+
+def rgb(color: QColor) -> str:
+    return f'{number(color.redF())} {number(color.greenF())} {number(color.blueF())}'
+
+
+class ContentStream:
+    """
+    The drawing operators of a page or form.
+
+    Each graphics state parameter (colors, line width, dash pattern, ...) is only set when it changes,
+    so a run of elements in the same style costs nothing but their geometry.
+    """
+
+    def __init__(self):
+        self.ops: List[str] = []
+        self.state: Dict[str, str] = {}  # Operator that last set each graphics state parameter
+        self.resources: Dict[str, Dict[str, Ref]] = {}  # Named resources used, by category
+
+    def op(self, op: str):
+        self.ops.append(op)
+
+    def set(self, parameter: str, op: str):
+        """
+        Set a graphics state parameter, unless it is already set that way
+
+        :param parameter: Name of the parameter
+        :param op: Operator setting it
+        """
+        if self.state.get(parameter) != op:
+            self.ops.append(op)
+            self.state[parameter] = op
+
+    def use_resource(self, category: str, name: str, ref: Ref):
+        self.resources.setdefault(category, {})[name] = ref
+
+    def use_pen(self, pen: Optional[QPen]) -> bool:
+        """
+        Set up to stroke with a Qt pen
+
+        :param pen: The pen
+        :return: False if the pen doesn't draw anything
+        """
+        if pen is None or pen.style() == Qt.PenStyle.NoPen or pen.color().alpha() == 0:
+            return False
+        width = pen.widthF()
+        self.set('stroke color', f'{rgb(pen.color())} RG')
+        self.set('line width', f'{number(width)} w')
+        self.set('line cap', f'{cap_styles.get(pen.capStyle(), 2)} J')
+        self.set('line join', f'{join_styles.get(pen.joinStyle(), 2)} j')
+        if pen.style() == Qt.PenStyle.SolidLine:
+            self.set('dash', '[] 0 d')
+        else:
+            scale = width or 1  # Qt dash patterns are in units of the pen width
+            dashes = ' '.join(number(d * scale) for d in pen.dashPattern())
+            self.set('dash', f'[{dashes}] {number(pen.dashOffset() * scale)} d')
+        return True
+
+    def use_brush(self, brush: Optional[QBrush]) -> bool:
+        """
+        Set up to fill with a Qt brush, which is always a solid color in a Tablet
+
+        :param brush: The brush
+        :return: False if the brush doesn't fill anything
+        """
+        if brush is None or brush.style() == Qt.BrushStyle.NoBrush or brush.color().alpha() == 0:
+            return False
+        self.set('fill color', f'{rgb(brush.color())} rg')
+        return True
+
+    def path(self, path: QPainterPath):
+        """
+        Add the segments of a Qt path, closing each subpath that ends where it started
+
+        :param path: The path
+        """
+        start = last = None
+        segments = 0
+        i = 0
+        while i < path.elementCount():
+            e = path.elementAt(i)
+            if e.isMoveTo():
+                if segments and last == start:
+                    self.ops.append('h')
+                start = last = (e.x, e.y)
+                segments = 0
+                self.ops.append(f'{number(e.x)} {number(e.y)} m')
+            elif e.isLineTo():
+                last = (e.x, e.y)
+                segments += 1
+                self.ops.append(f'{number(e.x)} {number(e.y)} l')
+            else:
+                c2, end = path.elementAt(i + 1), path.elementAt(i + 2)
+                last = (end.x, end.y)
+                segments += 1
+                self.ops.append(f'{number(e.x)} {number(e.y)} {number(c2.x)} {number(c2.y)} '
+                                f'{number(end.x)} {number(end.y)} c')
+                i += 2
+            i += 1
+        if segments and last == start:
+            self.ops.append('h')
+
+    def paint(self, stroked: bool, filled: bool):
+        self.ops.append('B*' if stroked and filled else 'S' if stroked else 'f*' if filled else 'n')
+
+    def shape(self, path: QPainterPath, pen: Optional[QPen], brush: Optional[QBrush]):
+        """
+        Stroke and fill a path
+
+        :param path: The outline
+        :param pen: Stroke with this pen
+        :param brush: Fill with this brush
+        """
+        stroked = self.use_pen(pen)
+        filled = self.use_brush(brush)
+        if stroked or filled:
+            self.path(path)
+            self.paint(stroked, filled)
+
+    def rect(self, rect: QRectF, pen: Optional[QPen], brush: Optional[QBrush]):
+        stroked = self.use_pen(pen)
+        filled = self.use_brush(brush)
+        if stroked or filled:
+            self.ops.append(f'{number(rect.x())} {number(rect.y())} {number(rect.width())} '
+                            f'{number(rect.height())} re')
+            self.paint(stroked, filled)
+
+    def data(self) -> bytes:
+        return '\n'.join(self.ops).encode('latin-1')
+
+
+class EmbeddedFont:
+    """
+    A TrueType font embedded as a composite font addressed by glyph id, exactly as Qt shaped our text.
+    Only the glyphs drawn anywhere in the document are embedded, once the document is complete, so the
+    pages refer to glyphs by their ids in the full font and the font maps those to its subset.
+    """
+
+    def __init__(self, name: str, ref: Ref, raw_font: QRawFont):
+        """
+        Constructor
+
+        :param name: Resource name of the font
+        :param ref: Object number reserved for the font
+        :param raw_font: A Qt raw font of the typeface
+        """
+        self.name = name
+        self.ref = ref
+        self.font_name = f'{raw_font.familyName()}-{raw_font.styleName()}'.replace(' ', '')
+        self.truetype = TrueTypeFont(raw_font)
+        self.glyphs: Dict[int, str] = {}  # Text of each glyph drawn, so the PDF text can be searched and copied
+
+    def add_run(self, run: QGlyphRun):
+        """
+        Record the glyphs in a run and the text each one represents
+
+        :param run: The glyph run
+        """
+        text = run.sourceString()
+        indexes = run.stringIndexes()
+        starts = sorted(set(indexes)) + [len(text)]
+        ends = {s: e for s, e in zip(starts, starts[1:])}
+        for gid, start in zip(run.glyphIndexes(), indexes):
+            if gid not in self.glyphs:
+                self.glyphs[gid] = text[start:ends.get(start, len(text))]
+
+    def widths(self) -> list:
+        """
+        Returns the advance widths of the drawn glyphs, one array per consecutive run of glyph ids
+        """
+        widths = []
+        for gid in sorted(self.glyphs):
+            if widths and widths[-2] + len(widths[-1]) == gid:
+                widths[-1].append(self.truetype.advance(gid))
+            else:
+                widths.extend([gid, [self.truetype.advance(gid)]])
+        return widths
+
+    def to_unicode(self) -> bytes:
+        """
+        Returns a CMap mapping each glyph drawn to its text
+        """
+        chars = [(gid, text) for gid, text in sorted(self.glyphs.items()) if text]
+        lines = ['/CIDInit /ProcSet findresource begin', '12 dict begin', 'begincmap',
+                 '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+                 '/CMapName /Adobe-Identity-UCS def', '/CMapType 2 def',
+                 '1 begincodespacerange', '<0000> <FFFF>', 'endcodespacerange']
+        for block in range(0, len(chars), 100):  # A CMap may have no more than 100 entries per block
+            entries = chars[block:block + 100]
+            lines.append(f'{len(entries)} beginbfchar')
+            lines.extend(f'<{gid:04X}> <{text.encode("utf-16-be").hex().upper()}>' for gid, text in entries)
+            lines.append('endbfchar')
+        lines.extend(['endcmap', 'CMapName currentdict /CMap defineresource pop', 'end', 'end'])
+        return '\n'.join(lines).encode('ascii')
+
+    def write(self, pdf: PdfFile):
+        """
+        Write the font subset and its dictionaries
+
+        :param pdf: Write to this PDF
+        """
+        tt = self.truetype
+        data, old_ids = tt.subset(self.glyphs)
+        # The text refers to glyphs by their ids in the full font, map each of those to the subset
+        gid_map = bytearray(2 * (max(old_ids) + 1))
+        for new, old in enumerate(old_ids):
+            struct.pack_into('>H', gid_map, 2 * old, new)
+        # Subset fonts are tagged with six capital letters that differ for each subset
+        digest = hashlib.md5(repr(sorted(self.glyphs)).encode('ascii')).digest()
+        base_font = Name(''.join(chr(65 + b % 26) for b in digest[:6]) + '+' + self.font_name)
+        font_file = pdf.write_stream({'Length1': len(data)}, data)
+        descriptor = pdf.write_object({
+            'Type': Name('FontDescriptor'), 'FontName': base_font, 'Flags': 4,
+            'FontBBox': [tt.scaled(v) for v in tt.bbox], 'ItalicAngle': 0,
+            'Ascent': tt.scaled(tt.ascent), 'Descent': tt.scaled(tt.descent), 'CapHeight': tt.scaled(tt.ascent),
+            'StemV': 80, 'FontFile2': font_file})
+        cid_font = pdf.write_object({
+            'Type': Name('Font'), 'Subtype': Name('CIDFontType2'), 'BaseFont': base_font,
+            'CIDSystemInfo': {'Registry': 'Adobe', 'Ordering': 'Identity', 'Supplement': 0},
+            'FontDescriptor': descriptor, 'CIDToGIDMap': pdf.write_stream({}, bytes(gid_map)),
+            'W': self.widths()})
+        to_unicode = pdf.write_stream({}, self.to_unicode())
+        pdf.write_object({
+            'Type': Name('Font'), 'Subtype': Name('Type0'), 'BaseFont': base_font,
+            'Encoding': Name('Identity-H'), 'DescendantFonts': [cid_font], 'ToUnicode': to_unicode}, ref=self.ref)
+        _logger.info(f"Embedded font [{self.font_name}] with {len(self.glyphs)} glyphs, {len(data)} bytes")
+
+
+class NativePdfWriter:
+    """
+    Writes Tablets as the pages of a PDF, generating the PDF drawing operators ourselves straight from
+    the element lists on each Layer rather than going through a Qt paint device.
+
+    Each distinct symbol drawing is written once as a form and each image file once as an image,
+    and every placement just refers to it. So a diagram with hundreds of multiplicity and arrowhead
+    symbols or a logo on every page is only a fraction of the size. Text is laid out by Qt just as in
+    a scene and drawn with the same font, of which only the glyphs drawn are embedded.
+
+    Each page, image and form is written to the output as soon as it is complete, so the document
+    is never held in memory.
+    """
+
+    def __init__(self, output: Output, compress: bool = True):
+        """
+        Constructor
+
+        :param output: Path of the PDF file, a writable binary stream, or None to get the PDF content from close()
+        :param compress: Deflate each content stream, image and font
+        """
+        self.target = ExportTarget(output)
+        self.pdf = PdfFile(self.target.stream, compress=compress)
+        self.pages_ref = self.pdf.reserve()
+        self.page_refs: List[Ref] = []
+        self.forms: Dict[bytes, Tuple[str, Ref]] = {}  # Name and object of each distinct symbol drawing
+        self.symbol_forms: Dict[SymbolPrototype, Tuple[str, Ref]] = {}  # The same, by symbol prototype
+        self.images: Dict[Path, Optional[Tuple[str, Ref, QRectF]]] = {}  # Name, object and size by file
+        self.fonts: Dict[tuple, Optional[EmbeddedFont]] = {}  # By typeface, None if it can't be embedded
+        self.content: Optional[ContentStream] = None  # Content of the page being written
+        self.closed = False
+        self.result: Optional[bytes] = None
+
+    def add_page(self, tablet: 'Tablet'):
+        """
+        Write a Tablet as a page exactly its size
+
+        :param tablet: The Tablet to write
+        """
+        size = tablet.Size
+        self.content = ContentStream()
+        # Flip the page so that we can draw in tablet device coordinates, with y running down from the top
+        self.content.op(f'1 0 0 -1 0 {number(size.height)} cm')
+        if tablet.background_color:
+            self.content.rect(QRectF(0, 0, size.width, size.height), None,
+                              QBrush(QColor(*tablet.background_color)))
+        for name in tablet.layer_order:
+            layer = tablet.layers.get(name)
+            if layer:
+                self.write_layer(layer)
+
+        contents = self.pdf.write_stream({}, self.content.data())
+        resources = {category: dict(named) for category, named in self.content.resources.items()}
+        self.page_refs.append(self.pdf.write_object({
+            'Type': Name('Page'), 'Parent': self.pages_ref, 'MediaBox': [0, 0, size.width, size.height],
+            'Resources': resources, 'Contents': contents}))
+        self.content = None
+        _logger.info(f"Wrote page [{len(self.page_refs)}]: {size.width} x {size.height}")
+
+    def add_pages(self, tablets: Iterable['Tablet']):
+        for t in tablets:
+            self.add_page(t)
+
+    def write_layer(self, layer: 'Layer'):
+        """
+        Write all elements on a Layer, in the Layer.render order
+
+        :param layer: The Layer to write
+        """
+        _logger.info(f'Writing layer: {layer.Name}')
+        c = self.content
+        self.write_lines(layer)
+        for s in layer.Symbols:
+            self.write_symbol(s)
+        for e in style_order(layer.Circles, style=lambda e: e.border_style, filled=lambda e: e.fill):
+            path = QPainterPath()
+            path.addEllipse(QRectF(e.center.x, e.center.y, e.radius * 2, e.radius * 2))
+            c.shape(path, CrayonBox.pen(e.border_style), CrayonBox.brush(e.fill))
+        for r in style_order(layer.Rectangles, style=lambda e: e.border_style, filled=lambda e: e.fill):
+            top_radius = r.radius if r.top else 0
+            bottom_radius = r.radius if r.bottom else 0
+            pen, brush = CrayonBox.pen(r.border_style), CrayonBox.brush(r.fill)
+            if not top_radius and not bottom_radius:
+                c.rect(QRectF(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height), pen, brush)
+            else:
+                c.shape(RectangleSE.roundrect_path(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height,
+                                                   top_radius, bottom_radius), pen, brush)
+        for p in layer.Polygons:
+            self.write_item(p)
+        for u in layer.TextUnderlayRects:
+            c.rect(QRectF(u.upper_left.x, u.upper_left.y, u.size.width, u.size.height), None,
+                   CrayonBox.fill_brush(u.color))
+        self.write_text(layer)
+        self.write_images(layer)
+        for rl in layer.RawLines:
+            self.write_item(rl)
+        for rr in layer.RawRectangles:
+            self.write_item(rr, pen=raw_rectangle_pen)
+
+    def write_item(self, item: QGraphicsItem, pen: Optional[QPen] = None):
+        """
+        Write a Qt item that was built when it was added to a Layer
+
+        :param item: A Qt shape item
+        :param pen: Draw the outline with this pen rather than the item's own
+        """
+        path = item_path(item)
+        if path is not None:
+            self.content.shape(item.sceneTransform().map(path), pen or item.pen(), item_brush(item))
+
+    def write_lines(self, layer: 'Layer'):
+        """
+        Write the line segments, stroking all those in the same line style as a single path
+
+        :param layer: Write this Layer
+        """
+        c = self.content
+        style = None
+        stroked = False
+        for ls in sorted(layer.Line_segments, key=lambda e: e.style):
+            if ls.style != style:
+                if style is not None:
+                    c.paint(stroked, False)
+                style = ls.style
+                stroked = c.use_pen(CrayonBox.pen(style))
+            c.op(f'{number(ls.from_here[0])} {number(ls.from_here[1])} m '
+                 f'{number(ls.to_there[0])} {number(ls.to_there[1])} l')
+        if style is not None:
+            c.paint(stroked, False)
+
+    def write_symbol(self, symbol: SymbolItem):
+        """
+        Place a symbol, writing its prototype as a form the first time it is seen
+
+        Each component of a symbol prototype is drawn relative to the symbol's pin, which is also the origin
+        of its rotation. So every placement of the same prototype has the same form and only differs in
+        where it is pinned and how it is rotated.
+
+        :param symbol: The placed symbol
+        """
+        prototype = symbol.prototype
+        named = self.symbol_forms.get(prototype)
+        if named is None:
+            form = ContentStream()
+            for c in prototype.components:
+                form.shape(c.path, c.pen, c.brush)
+            bbox = prototype.bounds
+            box = [bbox.left(), bbox.top(), bbox.right(), bbox.bottom()]
+            drawing = form.data()
+            # Presentations may well draw a symbol the same way
+            key = drawing + serialize(box).encode('latin-1')
+            named = self.forms.get(key)
+            if named is None:
+                ref = self.pdf.write_stream({'Type': Name('XObject'), 'Subtype': Name('Form'), 'BBox': box},
+                                            drawing)
+                named = (f'S{len(self.forms) + 1}', ref)
+                self.forms[key] = named
+            self.symbol_forms[prototype] = named
+        name, ref = named
+        self.content.use_resource('XObject', name, ref)
+        m = symbol.sceneTransform()
+        self.content.op(f'q {number(m.m11())} {number(m.m12())} {number(m.m21())} {number(m.m22())} '
+                        f'{number(m.dx())} {number(m.dy())} cm /{name} Do Q')
+
+    def font(self, raw_font: QRawFont) -> Optional[EmbeddedFont]:
+        """
+        Returns the embedded font for a typeface, starting one the first time the typeface is used
+
+        :param raw_font: Qt raw font of a glyph run
+        :return: The embedded font, or None if the font can't be embedded
+        """
+        key = (raw_font.familyName(), raw_font.styleName(), raw_font.weight(), raw_font.style())
+        if key not in self.fonts:
+            try:
+                self.fonts[key] = EmbeddedFont(name=f'F{len(self.fonts) + 1}', ref=self.pdf.reserve(),
+                                               raw_font=raw_font)
+            except UnsupportedFont:
+                _logger.warning(f"Font [{raw_font.familyName()} {raw_font.styleName()}] is not TrueType, "
+                                f"its text will be drawn as outlines")
+                self.fonts[key] = None
+        return self.fonts[key]
+
+    def write_text(self, layer: 'Layer'):
+        """
+        Write all lines of text, laid out and positioned just as a text item would draw them
+
+        :param layer: Write this Layer
+        """
+        current_style = None
+        font = None
+        brush = None
+        for t in sorted(layer.Text, key=lambda e: e.style['text style']):
+            if t.style['text style'] != current_style:
+                current_style = t.style['text style']
+                font = TextMetrics.font(TextMetrics.font_key(current_style))
+                brush = QBrush(QColor(*StyleDB.color[StyleDB.text_style[current_style].color]))
+            layout = QTextLayout(t.text, font)
+            layout.beginLayout()
+            line = layout.createLine()
+            line.setPosition(QPointF(0, 0))
+            layout.endLayout()
+            origin = QPointF(t.upper_left.x + tbox_xoffset, t.upper_left.y + tbox_yoffset)
+            for run in layout.glyphRuns(-1, -1, QTextLayout.GlyphRunRetrievalFlag.RetrieveAll):
+                self.write_glyph_run(run, origin, brush)
+
+    def write_glyph_run(self, run: QGlyphRun, origin: QPointF, brush: QBrush):
+        """
+        Write a run of glyphs shaped by Qt, at exactly the positions Qt placed them
+
+        :param run: The glyphs
+        :param origin: Position of the text layout
+        :param brush: Fill the glyphs with this brush
+        """
+        c = self.content
+        raw_font = run.rawFont()
+        positions = [p + origin for p in run.positions()]
+        c.use_brush(brush)
+        font = self.font(raw_font)
+        if font is None:
+            for gid, p in zip(run.glyphIndexes(), positions):
+                c.shape(raw_font.pathForGlyph(gid).translated(p), None, brush)
+            return
+
+        font.add_run(run)
+        size = raw_font.pixelSize()
+        c.use_resource('Font', font.name, font.ref)
+        c.set('font', f'/{font.name} {number(size)} Tf')
+        c.op('BT')
+        parts: List[str] = []
+        glyphs = ''
+        baseline = pen_x = None
+        for gid, p in zip(run.glyphIndexes(), positions):
+            if p.y() != baseline:
+                if parts or glyphs:
+                    c.op('[' + ' '.join(parts + [f'<{glyphs}>']) + '] TJ')
+                    parts, glyphs = [], ''
+                c.op(f'1 0 0 -1 {number(p.x())} {number(p.y())} Tm')
+                baseline = p.y()
+            else:
+                # Shift the glyph from where its predecessor's advance put it to where Qt placed it
+                shift = (pen_x - p.x()) * 1000 / size
+                if abs(shift) >= 0.001:
+                    parts.extend([f'<{glyphs}>', number(shift)])
+                    glyphs = ''
+            glyphs += f'{gid:04X}'
+            pen_x = p.x() + font.truetype.advance(gid) * size / 1000
+        c.op('[' + ' '.join(parts + [f'<{glyphs}>']) + '] TJ')
+        c.op('ET')
+
+    def image(self, path: Path) -> Optional[Tuple[str, Ref, QRectF]]:
+        """
+        Returns an image, writing it the first time it is used
+
+        :param path: The image file
+        :return: Resource name, object and size of the image, or None if it can't be loaded
+        """
+        if path in self.images:
+            return self.images[path]
+        self.images[path] = None
+        if not path.exists():
+            _logger.error(f'Image file [{path}] not found')
+            return None
+        image = QImage(str(path))
+        if image.isNull():
+            _logger.error(f'Image file [{path}] could not be loaded as image')
+            return None
+
+        def pixels(img: QImage, row_bytes: int) -> bytes:
+            data = img.constBits().asstring(img.sizeInBytes())
+            line = img.bytesPerLine()
+            return b''.join(data[y * line:y * line + row_bytes] for y in range(img.height()))
+
+        width, height = image.width(), image.height()
+        attributes = {'Type': Name('XObject'), 'Subtype': Name('Image'), 'Width': width, 'Height': height,
+                      'BitsPerComponent': 8}
+        if image.hasAlphaChannel():
+            alpha = image.convertToFormat(QImage.Format.Format_Alpha8)
+            attributes['SMask'] = self.pdf.write_stream(
+                {**attributes, 'ColorSpace': Name('DeviceGray')}, pixels(alpha, width))
+        color = image.convertToFormat(QImage.Format.Format_RGB888)
+        ref = self.pdf.write_stream({**attributes, 'ColorSpace': Name('DeviceRGB')}, pixels(color, width * 3))
+        self.images[path] = (f'I{len(self.images)}', ref, QRectF(QPointF(0, 0), image.deviceIndependentSize()))
+        return self.images[path]
+
+    def write_images(self, layer: 'Layer'):
+        """
+        Place the images, each at its natural size
+
+        :param layer: Write this Layer
+        """
+        for i in layer.Images:
+            image = self.image(i.resource_path)
+            if image:
+                name, ref, size = image
+                self.content.use_resource('XObject', name, ref)
+                self.content.op(f'q {number(size.width())} 0 0 {number(-size.height())} {number(i.upper_left.x)} '
+                                f'{number(i.upper_left.y + size.height())} cm /{name} Do Q')
+
+    def close(self) -> Optional[bytes]:
+        """
+        Write the fonts and document structure to finish the PDF
+
+        :return: The PDF content if no output was given
+        """
+        if self.closed:
+            return self.result
+        for font in self.fonts.values():
+            if font:
+                font.write(self.pdf)
+        self.pdf.write_object({'Type': Name('Pages'), 'Kids': self.page_refs, 'Count': len(self.page_refs)},
+                              ref=self.pages_ref)
+        root = self.pdf.write_object({'Type': Name('Catalog'), 'Pages': self.pages_ref})
+        self.pdf.finish(root)
+        self.closed = True
+        self.result = self.target.finish()
+        return self.result
+
+    def __enter__(self) -> 'NativePdfWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def save_native_pdf(tablets: Iterable['Tablet'], output: Output) -> Optional[bytes]:
+    """
+    Save a sequence of Tablets as the pages of one PDF, with the native writer
+
+    :param tablets: The Tablets to save, one per page
+    :param output: Path of the PDF file, a writable binary stream, or None
+    :return: The PDF content if no output was given
+    """
+    writer = NativePdfWriter(output)
+    writer.add_pages(tablets)
+    return writer.close()
@@ -0,0 +1,279 @@
+""" painter.py -- Paint a Tablet straight from its Layer element lists, without a scene """
+
+# System
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Callable, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from tabletqt.tablet import Tablet
+    from tabletqt.layer import Layer
+
+# Qt
+from PyQt6.QtCore import QRectF, QLineF, QPointF, Qt
+from PyQt6.QtGui import QPainter, QPen, QColor, QImage, QTextLayout, QTransform
+from PyQt6.QtWidgets import QGraphicsItem
+
+# Tablet
+from tabletqt.styledb import StyleDB
+from tabletqt.graphics.crayon_box import CrayonBox
+from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.text_element import tbox_xoffset, tbox_yoffset
+from tabletqt.graphics.text_metrics import TextMetrics
+from tabletqt.scene_view import pdf_writer
+from tabletqt.export.items import ItemShape, item_shapes, raw_rectangle_pen
+from tabletqt.export.target import ExportTarget, Output
+
+_logger = logging.getLogger(__name__)
+
+
+def style_order(elements: List, style: Callable, filled: Callable) -> List:
+    """
+    Reorder elements so that those drawn in the same style are painted one after another.
+
+    A filled element must still cover everything painted before it, so only the runs of unfilled
+    elements between filled ones are sorted. Within a run, elements of the same style keep their order.
+
+    :param elements: Elements in the order they were added to the Layer
+    :param style: Returns the style of an element
+    :param filled: Returns true if an element is filled
+    :return: Elements in paint order
+    """
+    ordered = []
+    run = []
+    for e in elements:
+        if filled(e):
+            ordered.extend(sorted(run, key=style))
+            run = []
+            ordered.append(e)
+        else:
+            run.append(e)
+    ordered.extend(sorted(run, key=style))
+    return ordered
+
+
+def load_image(resource_path: Path, images: Dict[Path, QImage]) -> Optional[QImage]:
+    """
+    Load an image file, unless it is already loaded
+
+    :param resource_path: Path to the image file
+    :param images: Images already loaded, by path
+    :return: The image, or None if it can't be loaded
+    """
+    image = images.get(resource_path)
+    if image is None:
+        if not resource_path.exists():
+            _logger.error(f'Image file [{resource_path}] not found')
+            return None
+        image = QImage(str(resource_path))
+        if image.isNull():
+            _logger.error(f'Image file [{resource_path}] could not be loaded as image')
+            return None
+        images[resource_path] = image
+    return image
+
+
+class DirectPainter:
+    """
+    Paints the elements recorded on each Layer of a Tablet onto any QPainter, in the same order
+    and with the same pens, brushes and fonts that Layer.render uses to populate a scene. But no
+    scene or scene items are created, so nothing has to be built up only to be walked again for export.
+
+    Within each kind of element, elements are painted grouped by style so that the painter switches
+    pens, brushes and fonts as rarely as possible.
+
+    Symbols, polygons and diagnostic markers are already built as Qt items when they are added
+    to a Layer, so the paths those items draw are painted with their pens and brushes. Where tiles are painted
+    on several threads, the paths are copied out of the items beforehand (see TileIndex), as Qt items must
+    not be used from other threads.
+    """
+
+    def __init__(self, painter: QPainter, images: Optional[Dict[Path, QImage]] = None):
+        """
+        Constructor
+
+        :param painter: Paint on this painter, in tablet device coordinates
+        :param images: Images already loaded, shared with other DirectPainters
+        """
+        self.painter = painter
+        self.border_style: Optional[str] = None  # Line style of the current pen
+        self.images: Dict[Path, QImage] = {} if images is None else images  # Each image file is loaded once
+
+    def paint_tablet(self, tablet: 'Tablet'):
+        """
+        Paint each populated layer of the Tablet moving up the z axis
+
+        :param tablet: The Tablet to paint
+        """
+        self.border_style = None  # The painter state may have been restored since the last Tablet
+        for name in tablet.layer_order:
+            layer = tablet.layers.get(name)
+            if layer:
+                self.paint_layer(layer)
+
+    def paint_layer(self, layer: 'Layer'):
+        """
+        Paint all elements on a Layer, in the Layer.render order
+
+        :param layer: The Layer to paint
+        """
+        _logger.info(f'Painting layer: {layer.Name}')
+        self.paint_lines(layer)
+        for s in layer.Symbols:
+            self.paint_item(s)
+        self.paint_circles(layer)
+        self.paint_rectangles(layer)
+        for p in layer.Polygons:
+            self.paint_item(p)
+        self.paint_underlays(layer)
+        self.paint_text(layer)
+        self.paint_images(layer)
+        for rl in layer.RawLines:
+            self.paint_item(rl)
+        for rr in layer.RawRectangles:
+            self.paint_item(rr, pen=raw_rectangle_pen)
+
+    def use_pen(self, border_style: str):
+        """
+        Switch to the pen for a line style, unless it is already in use
+
+        :param border_style: Name of the line style
+        """
+        if border_style != self.border_style:
+            self.painter.setPen(CrayonBox.pen(border_style))
+            self.border_style = border_style
+
+    def paint_item(self, item: Union[QGraphicsItem, Tuple[ItemShape, ...]], pen: Optional[QPen] = None):
+        """
+        Paint what a Qt item that was built when it was added to a Layer draws
+
+        :param item: The Qt item, or the shapes already copied out of it by item_shapes
+        :param pen: Draw a shape item's outline with this pen rather than the item's own
+        """
+        shapes = item if isinstance(item, tuple) else item_shapes(item, pen)
+        for shape in shapes:
+            self.painter.setPen(shape.pen)
+            self.painter.setBrush(Qt.BrushStyle.NoBrush if shape.brush is None else shape.brush)
+            self.painter.drawPath(shape.path)
+        self.border_style = None
+
+    def paint_lines(self, layer: 'Layer'):
+        """
+        Paint the line segments
+
+        :param layer: Paint this Layer
+        """
+        for ls in sorted(layer.Line_segments, key=lambda e: e.style):
+            self.use_pen(ls.style)
+            self.painter.drawLine(QLineF(*ls.from_here, *ls.to_there))
+
+    def paint_circles(self, layer: 'Layer'):
+        """
+        Paint the circle shapes
+
+        :param layer: Paint this Layer
+        """
+        for c in style_order(layer.Circles, style=lambda e: e.border_style, filled=lambda e: e.fill):
+            self.use_pen(c.border_style)
+            self.painter.setBrush(CrayonBox.brush(c.fill))
+            diameter = c.radius * 2
+            self.painter.drawEllipse(QRectF(c.center.x, c.center.y, diameter, diameter))
+
+    def paint_rectangles(self, layer: 'Layer'):
+        """
+        Paint the rectangle shapes
+
+        :param layer: Paint this Layer
+        """
+        for r in style_order(layer.Rectangles, style=lambda e: e.border_style, filled=lambda e: e.fill):
+            self.use_pen(r.border_style)
+            self.painter.setBrush(CrayonBox.brush(r.fill))
+            top_radius = r.radius if r.top else 0
+            bottom_radius = r.radius if r.bottom else 0
+            if not top_radius and not bottom_radius:
+                self.painter.drawRect(QRectF(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height))
+            else:
+                self.painter.drawPath(RectangleSE.roundrect_path(r.upper_left.x, r.upper_left.y, r.size.width,
+                                                                 r.size.height, top_radius, bottom_radius))
+
+    def paint_underlays(self, layer: 'Layer'):
+        """
+        Paint the borderless fills underneath text
+
+        :param layer: Paint this Layer
+        """
+        self.painter.setPen(CrayonBox.transparent_pen())
+        self.border_style = None
+        for u in layer.TextUnderlayRects:
+            self.painter.setBrush(CrayonBox.fill_brush(u.color))
+            self.painter.drawRect(QRectF(u.upper_left.x, u.upper_left.y, u.size.width, u.size.height))
+
+    def paint_text(self, layer: 'Layer'):
+        """
+        Paint all lines of text, positioned just as a text item would draw them
+
+        :param layer: Paint this Layer
+        """
+        current_style = None
+        font = None
+        for t in sorted(layer.Text, key=lambda e: e.style['text style']):
+            if t.style['text style'] != current_style:
+                current_style = t.style['text style']
+                font = TextMetrics.font(TextMetrics.font_key(current_style))
+                self.painter.setPen(QColor(*StyleDB.color[StyleDB.text_style[current_style].color]))
+            # Lay out the line just as a text item does. Setting the font on the painter instead would scale
+            # it to the resolution of the paint device, whereas scene text is laid out at screen resolution.
+            layout = QTextLayout(t.text, font)
+            layout.beginLayout()
+            line = layout.createLine()
+            line.setPosition(QPointF(0, 0))
+            layout.endLayout()
+            layout.draw(self.painter, QPointF(t.upper_left.x + tbox_xoffset, t.upper_left.y + tbox_yoffset))
+        self.border_style = None
+
+    def paint_images(self, layer: 'Layer'):
+        """
+        Paint the images
+
+        :param layer: Paint this Layer
+        """
+        self.painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        for i in layer.Images:
+            image = load_image(i.resource_path, self.images)
+            if image is not None:
+                self.painter.drawImage(QPointF(i.upper_left.x, i.upper_left.y), image)
+
+def paint_page(painter: QPainter, tablet: 'Tablet', direct_painter: Optional[DirectPainter] = None):
+    """
+    Paint a Tablet scaled to fit the whole paint device, as a scene render of the tablet would be
+
+    :param painter: Active painter on the page
+    :param tablet: The Tablet to paint
+    :param direct_painter: A DirectPainter on the same painter to reuse, say for each page of a document
+    """
+    size = tablet.Size
+    target = QRectF(0, 0, painter.device().width(), painter.device().height())
+    ratio = min(target.width() / size.width, target.height() / size.height)
+    painter.save()
+    painter.setClipRect(target)
+    painter.setWorldTransform(QTransform().scale(ratio, ratio), True)
+    if tablet.background_color:
+        painter.fillRect(QRectF(0, 0, size.width, size.height), QColor(*tablet.background_color))
+    (direct_painter or DirectPainter(painter)).paint_tablet(tablet)
+    painter.restore()
+
+
+def save_pdf(tablet: 'Tablet', output: Output) -> Optional[bytes]:
+    """
+    Save a Tablet as a PDF, painting it directly from its element lists
+
+    :param tablet: The Tablet to save
+    :param output: Path of the PDF file, a writable binary stream, or None
+    :return: The PDF content if no output was given
+    """
+    target = ExportTarget(output)
+    writer = pdf_writer(target, tablet.Size)
+    painter = QPainter(writer)
+    paint_page(painter, tablet)
+    painter.end()
+    return target.finish()
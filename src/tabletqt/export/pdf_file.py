@@ -0,0 +1,156 @@
+""" pdf_file.py -- Write PDF objects to a stream as they are made """
+
+# System
+import logging
+import zlib
+from typing import BinaryIO, List, Dict, Optional
+
+_logger = logging.getLogger(__name__)
+
+
+class Name(str):
+    """A PDF name, such as /Type"""
+    pass
+
+
+class Ref(int):
+    """A reference to an indirect PDF object by its object number"""
+    pass
+
+
+def number(value: float) -> str:
+    """
+    Format a number compactly for a PDF
+
+    :param value: The number
+    :return: An integer or a decimal with at most three places
+    """
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    text = f'{value:.3f}'.rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def pdf_string(value: str) -> str:
+    """
+    Format a literal PDF string
+
+    :param value: Latin-1 text
+    :return: The text in parentheses, escaped
+    """
+    return '(' + value.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+def serialize(value) -> str:
+    """
+    Format a Python value as a PDF object
+
+    :param value: A dict, list, Name, Ref, str, bytes, number, bool or None
+    :return: The PDF syntax for the value
+    """
+    if isinstance(value, Name):
+        return '/' + value
+    if isinstance(value, Ref):
+        return f'{int(value)} 0 R'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return number(value)
+    if isinstance(value, str):
+        return pdf_string(value)
+    if isinstance(value, bytes):
+        return '<' + value.hex() + '>'
+    if isinstance(value, (list, tuple)):
+        return '[' + ' '.join(serialize(v) for v in value) + ']'
+    if isinstance(value, dict):
+        return '<<' + ' '.join(f'/{k} {serialize(v)}' for k, v in value.items()) + '>>'
+    if value is None:
+        return 'null'
+    raise TypeError(f'Cannot write {type(value)} to a PDF')
+
+
+class PdfFile:
+    """
+    The PDF file structure: a header, numbered objects and a cross reference table locating them.
+
+    Each object is written to the output stream as soon as it is complete, so nothing is held
+    in memory but the offset of each object. An object that must be referred to before its content
+    is known (the page tree, a font) is given its number up front with reserve() and written later.
+    """
+
+    def __init__(self, stream: BinaryIO, compress: bool = True):
+        """
+        Constructor
+
+        :param stream: Write the PDF to this binary stream
+        :param compress: Deflate the content of each stream object
+        """
+        self.stream = stream
+        self.compress = compress
+        self.offsets: Dict[int, int] = {}  # Position of each object in the file
+        self.next_number = 1
+        self.position = 0
+        self.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def write(self, data: bytes):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def reserve(self) -> Ref:
+        """
+        Number an object to be written later
+
+        :return: Reference to the object
+        """
+        ref = Ref(self.next_number)
+        self.next_number += 1
+        return ref
+
+    def write_object(self, value, ref: Optional[Ref] = None) -> Ref:
+        """
+        Write an object
+
+        :param value: Object content
+        :param ref: The object's reserved number, if any
+        :return: Reference to the object
+        """
+        ref = ref or self.reserve()
+        self.offsets[ref] = self.position
+        self.write(f'{int(ref)} 0 obj\n{serialize(value)}\nendobj\n'.encode('latin-1'))
+        return ref
+
+    def write_stream(self, attributes: dict, data: bytes, ref: Optional[Ref] = None) -> Ref:
+        """
+        Write a stream object
+
+        :param attributes: The stream dictionary, without Length or Filter
+        :param data: Stream content
+        :param ref: The object's reserved number, if any
+        :return: Reference to the object
+        """
+        ref = ref or self.reserve()
+        attributes = dict(attributes)
+        if self.compress:
+            data = zlib.compress(data)
+            attributes['Filter'] = Name('FlateDecode')
+        attributes['Length'] = len(data)
+        self.offsets[ref] = self.position
+        self.write(f'{int(ref)} 0 obj\n{serialize(attributes)}\nstream\n'.encode('latin-1'))
+        self.write(data)
+        self.write(b'\nendstream\nendobj\n')
+        return ref
+
+    def finish(self, root: Ref):
+        """
+        Write the cross reference table and trailer
+
+        :param root: Reference to the document catalog
+        """
+        xref = self.position
+        lines: List[str] = [f'xref\n0 {self.next_number}\n', '0000000000 65535 f \n']
+        for n in range(1, self.next_number):
+            lines.append(f'{self.offsets.get(n, 0):010d} 00000 n \n')
+        trailer = serialize({'Size': self.next_number, 'Root': root})
+        lines.append(f'trailer\n{trailer}\nstartxref\n{xref}\n%%EOF\n')
+        self.write(''.join(lines).encode('latin-1'))
+        _logger.info(f"Wrote PDF with {self.next_number - 1} objects, {self.position} bytes")
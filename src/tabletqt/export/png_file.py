@@ -0,0 +1,76 @@
+""" png_file.py -- Write a PNG to a stream a band of rows at a time """
+
+# System
+import logging
+import struct
+import zlib
+from typing import BinaryIO
+
+_logger = logging.getLogger(__name__)
+
+signature = b'\x89PNG\r\n\x1a\n'
+chunk_size = 1 << 16  # Compressed image data is written out in chunks of about this many bytes
+
+
+class PngFile:
+    """
+    A PNG image written row by row, so the whole image never has to be in memory at once.
+
+    Rows are deflated as they arrive and the compressed data is written to the stream in IDAT
+    chunks of modest size. The image is finished by writing the remaining data and the IEND chunk.
+    """
+
+    def __init__(self, stream: BinaryIO, width: int, height: int, alpha: bool, dpi: float = 0):
+        """
+        Constructor
+
+        :param stream: Write the PNG to this binary stream
+        :param width: Image width in pixels
+        :param height: Image height in pixels
+        :param alpha: Rows are 8 bit RGBA pixels, otherwise 8 bit RGB
+        :param dpi: Resolution recorded in the file, if any
+        """
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.row_bytes = width * (4 if alpha else 3)
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(6)
+        self.pending = bytearray()  # Compressed data not yet written in a chunk
+        self.stream.write(signature)
+        color_type = 6 if alpha else 2
+        self.write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+        if dpi:
+            ppm = round(dpi / 0.0254)  # Pixels per meter
+            self.write_chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+
+    def write_chunk(self, kind: bytes, data: bytes):
+        self.stream.write(struct.pack('>I', len(data)))
+        self.stream.write(kind)
+        self.stream.write(data)
+        self.stream.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_row(self, row: bytes):
+        """
+        Append a row of pixels
+
+        :param row: The pixels of one row, left to right
+        """
+        # Each row is preceded by its filter type, here always None
+        self.pending += self.compressor.compress(b'\x00' + row)
+        self.rows_written += 1
+        if len(self.pending) >= chunk_size:
+            self.write_chunk(b'IDAT', bytes(self.pending))
+            self.pending.clear()
+
+    def finish(self):
+        """
+        Write the rest of the image data and the end of the image
+        """
+        if self.rows_written != self.height:
+            _logger.error(f'PNG has {self.rows_written} rows but {self.height} were promised')
+        self.pending += self.compressor.flush()
+        self.write_chunk(b'IDAT', bytes(self.pending))
+        self.pending.clear()
+        self.write_chunk(b'IEND', b'')
+        _logger.info(f"Wrote PNG of {self.width} x {self.height} pixels")
@@ -0,0 +1,302 @@
+""" raster.py -- Rasterize a Tablet to PNG in tiles painted in parallel """
+
+# System
+import os
+import math
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional, BinaryIO
+
+if TYPE_CHECKING:
+    from tabletqt.tablet import Tablet
+    from tabletqt.layer import Layer
+
+# Qt
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QPainter, QImage, QColor, QTransform
+
+# Tablet
+import tabletqt.element as element
+from tabletqt.styledb import StyleDB, FloatRGB
+from tabletqt.geometry_types import Position, Rect_Size
+from tabletqt.graphics.crayon_box import CrayonBox
+from tabletqt.graphics.text_element import tbox_xoffset, tbox_yoffset
+from tabletqt.graphics.text_metrics import TextMetrics
+from tabletqt.export.painter import DirectPainter, load_image
+from tabletqt.export.items import item_shapes, raw_rectangle_pen
+from tabletqt.export.png_file import PngFile
+from tabletqt.export.target import ExportTarget, Output
+
+_logger = logging.getLogger(__name__)
+
+bleed = 2  # Antialiasing and text ink may spill a little past an element's box, in tablet units
+
+
+class LayerTile:
+    """
+    The elements of a Layer that overlap one tile, in the order they were added to the Layer.
+    It has the same element lists as the Layer, so a DirectPainter paints it just as it would the Layer.
+    But in place of each Qt item (symbols, polygons and diagnostic markers) are the shapes the item draws.
+    """
+
+    def __init__(self, name: str):
+        """
+        Constructor
+
+        :param name: Name of the Layer
+        """
+        self.Name = name
+        self.Line_segments = []
+        self.Symbols = []
+        self.Circles = []
+        self.Polygons = []
+        self.Rectangles = []
+        self.RawRectangles = []
+        self.RawLines = []
+        self.TextUnderlayRects = []
+        self.Text = []
+        self.Images = []
+
+
+def text_bar(t: element.Text_line, text_size: Rect_Size) -> element.FillRect:
+    """
+    A grey bar standing in for a line of text too small to read
+
+    :param t: The line of text
+    :param text_size: Size of the text
+    :return: A borderless fill covering the middle of the line, in a lighter shade of the text color
+    """
+    color = StyleDB.color[StyleDB.text_style[t.style['text style']].color]
+    grey = FloatRGB(*(v + (255 - v) // 2 for v in color))
+    return element.FillRect(upper_left=Position(t.upper_left.x + tbox_xoffset,
+                                                t.upper_left.y + tbox_yoffset + text_size.height / 4),
+                            size=Rect_Size(height=text_size.height / 2, width=text_size.width), color=grey)
+
+
+class TileIndex:
+    """
+    Sorts the elements of each Layer into the tiles their bounding boxes overlap, so that each tile
+    is painted with only the elements that can touch it. An element straddling tiles goes to each of them.
+
+    When the tiles are to be painted at a small scale, detail that wouldn't be legible can be simplified
+    away: text is indexed as a grey bar and small symbols are left out.
+    """
+
+    def __init__(self, tablet: 'Tablet', span: float, simplify_below: float = 0):
+        """
+        Constructor
+
+        :param tablet: Index the elements on this Tablet's layers
+        :param span: Width and height of a tile in tablet units
+        :param simplify_below: Text less than this high and symbols smaller than this in both directions,
+        in tablet units, are simplified
+        """
+        self.span = span
+        self.simplify_below = simplify_below
+        self.columns = max(1, math.ceil(tablet.Size.width / span))
+        self.rows = max(1, math.ceil(tablet.Size.height / span))
+        self.tiles: Dict[Tuple[int, int], List[LayerTile]] = {}  # Layers overlapping each tile, bottom up
+        self.images: Dict[Path, QImage] = {}  # Loaded here so that painting threads only ever read them
+        for name in tablet.layer_order:
+            layer = tablet.layers.get(name)
+            if layer:
+                self.add_layer(layer)
+
+    def layers(self, column: int, row: int) -> List[LayerTile]:
+        """
+        The layers to paint on a tile
+
+        :param column: Tile column from the left
+        :param row: Tile row from the top
+        :return: Each Layer with elements on the tile, bottom up
+        """
+        return self.tiles.get((column, row), [])
+
+    def add_layer(self, layer: 'Layer'):
+        """
+        Index each element of a Layer
+
+        :param layer: The Layer to index
+        """
+        layer_tiles: Dict[Tuple[int, int], LayerTile] = {}
+
+        def add(kind: str, element, box: QRectF, margin: float = bleed):
+            # Every tile the box overlaps gets the element
+            first_column = max(0, int((box.left() - margin) // self.span))
+            last_column = min(self.columns - 1, int((box.right() + margin) // self.span))
+            first_row = max(0, int((box.top() - margin) // self.span))
+            last_row = min(self.rows - 1, int((box.bottom() + margin) // self.span))
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    tile = layer_tiles.get((column, row))
+                    if tile is None:
+                        tile = LayerTile(layer.Name)
+                        layer_tiles[(column, row)] = tile
+                        self.tiles.setdefault((column, row), []).append(tile)
+                    getattr(tile, kind).append(element)
+
+        def pen_margin(border_style: str) -> float:
+            return CrayonBox.pen(border_style).widthF() / 2 + bleed
+
+        for ls in layer.Line_segments:
+            box = QRectF(ls.from_here.x, ls.from_here.y, ls.to_there.x - ls.from_here.x,
+                         ls.to_there.y - ls.from_here.y).normalized()
+            add('Line_segments', ls, box, pen_margin(ls.style))
+        for c in layer.Circles:
+            diameter = c.radius * 2
+            add('Circles', c, QRectF(c.center.x, c.center.y, diameter, diameter), pen_margin(c.border_style))
+        for r in layer.Rectangles:
+            add('Rectangles', r, QRectF(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height),
+                pen_margin(r.border_style))
+        for u in layer.TextUnderlayRects:
+            add('TextUnderlayRects', u, QRectF(u.upper_left.x, u.upper_left.y, u.size.width, u.size.height))
+        for t in layer.Text:
+            text_size = TextMetrics.line_size(TextMetrics.font_key(t.style['text style']), t.text)
+            if text_size.height < self.simplify_below:
+                # Painted just like a text underlay
+                bar = text_bar(t, text_size)
+                add('TextUnderlayRects', bar, QRectF(bar.upper_left.x, bar.upper_left.y, bar.size.width,
+                                                     bar.size.height))
+                continue
+            add('Text', t, QRectF(t.upper_left.x, t.upper_left.y, text_size.width + tbox_xoffset * 2,
+                                  text_size.height + tbox_yoffset * 2))
+        for i in layer.Images:
+            # An image is painted at its natural size, whatever size it was added with
+            image = load_image(i.resource_path, self.images)
+            if image is not None:
+                add('Images', i, QRectF(i.upper_left.x, i.upper_left.y, image.width(), image.height()))
+        # Qt items may only be used from this thread, so what each one draws is copied out of it here
+        # and the painting threads are only ever handed the copies
+        for s in layer.Symbols:
+            box = s.sceneBoundingRect()
+            if box.width() < self.simplify_below and box.height() < self.simplify_below:
+                continue
+            add('Symbols', item_shapes(s), box)
+        for p in layer.Polygons:
+            add('Polygons', item_shapes(p), p.sceneBoundingRect())
+        for rl in layer.RawLines:
+            add('RawLines', item_shapes(rl), rl.sceneBoundingRect())
+        for rr in layer.RawRectangles:
+            add('RawRectangles', item_shapes(rr, pen=raw_rectangle_pen), rr.sceneBoundingRect())
+
+
+class TiledRaster:
+    """
+    Rasterizes a Tablet one tile at a time, painting the tiles of each row on a pool of threads and
+    streaming finished rows of pixels into a PNG. At most two rows of tiles are held at any time,
+    so memory depends on the tile size and the width of the Tablet, never on the whole image.
+
+    Painting into separate QImages is safe from any thread and Qt releases the interpreter
+    while it paints, so the tiles really are painted in parallel. The Layer elements and Qt items are
+    shared by all threads, so the work can't be split across processes without rebuilding each Tablet.
+    """
+
+    def __init__(self, tablet: 'Tablet', dpi: float = 300, tile_size: int = 1024, workers: Optional[int] = None,
+                 antialias: bool = True, legible: float = 0):
+        """
+        Constructor
+
+        :param tablet: The Tablet to rasterize
+        :param dpi: Pixels per inch, where one tablet unit is a point
+        :param tile_size: Width and height of a tile in pixels
+        :param workers: Number of painting threads, by default one per CPU
+        :param antialias: Smooth the edges of lines, shapes and text
+        :param legible: Text less than this many pixels high is drawn as a grey bar, and symbols smaller than
+        this are left out
+        """
+        self.tablet = tablet
+        self.dpi = dpi
+        self.scale = dpi / 72
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.antialias = antialias
+        self.width = math.ceil(tablet.Size.width * self.scale)
+        self.height = math.ceil(tablet.Size.height * self.scale)
+        self.alpha = not tablet.background_color
+        self.index = TileIndex(tablet, span=tile_size / self.scale, simplify_below=legible / self.scale)
+
+    def paint_tile(self, column: int, row: int) -> QImage:
+        """
+        Paint the elements overlapping one tile
+
+        :param column: Tile column from the left
+        :param row: Tile row from the top
+        :return: The tile as 8 bit RGB, or RGBA if there is no background color
+        """
+        left = column * self.tile_size
+        top = row * self.tile_size
+        image = QImage(min(self.tile_size, self.width - left), min(self.tile_size, self.height - top),
+                       QImage.Format.Format_ARGB32_Premultiplied)
+        if self.alpha:
+            image.fill(0)
+        else:
+            image.fill(QColor(*self.tablet.background_color))
+        layers = self.index.layers(column, row)
+        if layers:
+            painter = QPainter(image)
+            if self.antialias:
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+                painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+            # Shift by whole pixels so that the tiles line up exactly
+            painter.setWorldTransform(QTransform(self.scale, 0, 0, self.scale, -left, -top))
+            direct_painter = DirectPainter(painter, images=self.index.images)
+            for layer in layers:
+                direct_painter.paint_layer(layer)
+            painter.end()
+        return image.convertToFormat(QImage.Format.Format_RGBA8888 if self.alpha else QImage.Format.Format_RGB888)
+
+    def write(self, stream: BinaryIO):
+        """
+        Paint all of the tiles and write them as a PNG
+
+        :param stream: Write the PNG to this binary stream
+        """
+        png = PngFile(stream, self.width, self.height, alpha=self.alpha, dpi=self.dpi)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def submit(row: int) -> List[Future]:
+                return [pool.submit(self.paint_tile, column, row) for column in range(self.index.columns)]
+
+            # Keep the threads busy with the next row of tiles while this one is written
+            pending = submit(0)
+            for row in range(self.index.rows):
+                band = pending
+                if row + 1 < self.index.rows:
+                    pending = submit(row + 1)
+                self.write_band(png, [f.result() for f in band])
+        png.finish()
+        _logger.info(f"Rasterized tablet in {self.index.columns} x {self.index.rows} tiles at {self.dpi} dpi")
+
+    @staticmethod
+    def write_band(png: PngFile, tiles: List[QImage]):
+        """
+        Write a row of tiles to the PNG, a row of pixels at a time
+
+        :param png: The PNG being written
+        :param tiles: Tiles of equal height, left to right
+        """
+        pixels = []
+        for tile in tiles:
+            bits = tile.constBits()
+            bits.setsize(tile.sizeInBytes())
+            pixels.append((memoryview(bits), tile.bytesPerLine(), tile.width() * (tile.depth() // 8)))
+        for y in range(tiles[0].height()):
+            png.write_row(b''.join(bits[y * stride:y * stride + length] for bits, stride, length in pixels))
+
+
+def save_png(tablet: 'Tablet', output: Output, dpi: float = 300, tile_size: int = 1024,
+             workers: Optional[int] = None, antialias: bool = True) -> Optional[bytes]:
+    """
+    Save a Tablet as a PNG, painted directly from its element lists in tiles
+
+    :param tablet: The Tablet to save
+    :param output: Path of the PNG file, a writable binary stream, or None
+    :param dpi: Pixels per inch, where one tablet unit is a point
+    :param tile_size: Width and height of a tile in pixels
+    :param workers: Number of painting threads, by default one per CPU
+    :param antialias: Smooth the edges of lines, shapes and text
+    :return: The PNG content if no output was given
+    """
+    target = ExportTarget(output)
+    TiledRaster(tablet, dpi=dpi, tile_size=tile_size, workers=workers, antialias=antialias).write(target.stream)
+    return target.finish()
@@ -0,0 +1,466 @@
+""" svg.py -- Write a Tablet as SVG directly from its Layer element lists """
+
+# System
+import re
+import base64
+import logging
+from itertools import chain
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+from typing import TYPE_CHECKING, Dict, List, Optional, BinaryIO, Container
+
+if TYPE_CHECKING:
+    from tabletqt.tablet import Tablet
+    from tabletqt.layer import Layer
+
+# Qt
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPainterPath, QPen, QBrush, QColor, QTextLayout, QRawFont, QImageReader
+
+# Tablet
+from tabletqt.styledb import StyleDB, FloatRGB
+from tabletqt.graphics.crayon_box import CrayonBox
+from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.symbol import SymbolItem, SymbolPrototype
+from tabletqt.graphics.text_element import tbox_xoffset, tbox_yoffset
+from tabletqt.graphics.text_metrics import TextMetrics
+from tabletqt.export.painter import style_order
+from tabletqt.export.items import item_path, item_brush, raw_rectangle_pen
+from tabletqt.export.pdf_file import number
+from tabletqt.export.target import ExportTarget, Output
+
+_logger = logging.getLogger(__name__)
+
+image_types = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.gif': 'image/gif'}
+cap_styles = {Qt.PenCapStyle.FlatCap: 'butt', Qt.PenCapStyle.RoundCap: 'round', Qt.PenCapStyle.SquareCap: 'square'}
+join_styles = {Qt.PenJoinStyle.MiterJoin: 'miter', Qt.PenJoinStyle.SvgMiterJoin: 'miter',
+               Qt.PenJoinStyle.RoundJoin: 'round', Qt.PenJoinStyle.BevelJoin: 'bevel'}
+
+
+def slug(name: str) -> str:
+    """
+    Make a name usable as a CSS class or element id
+
+    :param name: A style, symbol or layer name
+    :return: The name with any run of other characters replaced by a hyphen
+    """
+    return re.sub(r'[^A-Za-z0-9_]+', '-', name).strip('-')
+
+
+def unique(name: str, taken: Container[str]) -> str:
+    """
+    Make a class name or id distinct from those already in use, since different names can have the same slug
+
+    :param name: The slug of a name
+    :param taken: Names already in use
+    :return: The name, with a numeric suffix if it is already in use
+    """
+    candidate = name
+    suffix = 1
+    while candidate in taken:
+        suffix += 1
+        candidate = f'{name}-{suffix}'
+    return candidate
+
+
+def path_data(path: QPainterPath) -> str:
+    """
+    Format a Qt path as SVG path data
+
+    :param path: The path
+    :return: Path data
+    """
+    d = []
+    start = last = None
+    i = 0
+    while i < path.elementCount():
+        e = path.elementAt(i)
+        if e.isMoveTo():
+            if last is not None and last == start:
+                d.append('Z')
+            start = last = (e.x, e.y)
+            d.append(f'M{number(e.x)} {number(e.y)}')
+        elif e.isLineTo():
+            last = (e.x, e.y)
+            d.append(f'L{number(e.x)} {number(e.y)}')
+        else:
+            c2, end = path.elementAt(i + 1), path.elementAt(i + 2)
+            last = (end.x, end.y)
+            d.append(f'C{number(e.x)} {number(e.y)} {number(c2.x)} {number(c2.y)} {number(end.x)} {number(end.y)}')
+            i += 2
+        i += 1
+    if last is not None and last == start and len(d) > 1:
+        d.append('Z')
+    return ''.join(d)
+
+
+def pen_css(pen: QPen) -> Optional[str]:
+    """
+    Express a Qt pen as CSS stroke properties
+
+    :param pen: The pen
+    :return: CSS declarations, or None if the pen doesn't draw anything
+    """
+    if pen.style() == Qt.PenStyle.NoPen or pen.color().alpha() == 0:
+        return None
+    width = pen.widthF() or 1  # Qt draws a zero width pen one pixel wide
+    css = [f'stroke:{pen.color().name()}', f'stroke-width:{number(width)}',
+           f'stroke-linecap:{cap_styles.get(pen.capStyle(), "square")}',
+           f'stroke-linejoin:{join_styles.get(pen.joinStyle(), "bevel")}']
+    if pen.style() != Qt.PenStyle.SolidLine:
+        # Qt dash patterns are in units of the pen width
+        css.append('stroke-dasharray:' + ','.join(number(d * width) for d in pen.dashPattern()))
+    return ';'.join(css)
+
+
+def brush_css(brush: QBrush) -> Optional[str]:
+    if brush.style() == Qt.BrushStyle.NoBrush or brush.color().alpha() == 0:
+        return None
+    return f'fill:{brush.color().name()}'
+
+
+class SvgStyles:
+    """
+    The CSS classes of an SVG document.
+
+    Each line style, fill and text style in the StyleDB that is used becomes one class named after it,
+    so an element only names its classes instead of repeating its styling. The pens and brushes of the
+    few elements that are built as Qt items (polygons, diagnostic markers) and of the symbol prototype
+    components are given generated class names.
+    """
+
+    def __init__(self):
+        self.rules: Dict[str, str] = {}  # CSS declarations by class name
+        self.classes: Dict[str, str] = {}  # Class name by what it styles, ex: 'line:connector'
+        self.generated: Dict[str, str] = {}  # Generated class name by CSS declarations
+
+    def add(self, key: str, name: str, css: Optional[str]) -> Optional[str]:
+        """
+        Add the class for a style
+
+        :param key: What the class styles, ex: 'line:connector'
+        :param name: Class name, given a numeric suffix if another style's class already has it
+        :param css: CSS declarations
+        :return: The class name, or None if there are no declarations
+        """
+        if css is None:
+            return None
+        name = unique(name, self.rules)
+        self.rules[name] = css
+        self.classes[key] = name
+        return name
+
+    def line(self, line_style: str) -> Optional[str]:
+        name = self.classes.get('line:' + line_style)
+        return name or self.add('line:' + line_style, 'line-' + slug(line_style), pen_css(CrayonBox.pen(line_style)))
+
+    def fill(self, fill: Optional[str]) -> Optional[str]:
+        if not fill:
+            return None
+        name = self.classes.get('fill:' + fill)
+        return name or self.add('fill:' + fill, 'fill-' + slug(fill), brush_css(CrayonBox.brush(fill)))
+
+    def underlay(self, color: FloatRGB) -> str:
+        color_name = QColor(*color).name()
+        name = self.classes.get('underlay:' + color_name)
+        return name or self.add('underlay:' + color_name, 'underlay-' + color_name[1:], f'fill:{color_name}')
+
+    def text(self, text_style: str) -> str:
+        """
+        Returns the class of a text style, with the configured typeface first and the
+        font Qt actually laid the text out with as its fallback
+
+        :param text_style: Name of the text style
+        :return: Class name
+        """
+        name = self.classes.get('text:' + text_style)
+        if name is None:
+            key = TextMetrics.font_key(text_style)
+            font = TextMetrics.font(key)
+            families = [key.family] + [f for f in [QRawFont.fromFont(font).familyName()] if f != key.family]
+            color = QColor(*StyleDB.color[StyleDB.text_style[text_style].color]).name()
+            name = self.add('text:' + text_style, 'text-' + slug(text_style), ';'.join([
+                'font-family:' + ','.join(f'"{f}"' for f in families),
+                f'font-size:{number(QRawFont.fromFont(font).pixelSize())}px',
+                f'font-weight:{key.weight}', f'font-style:{key.slant}', f'fill:{color}', 'white-space:pre']))
+        return name
+
+    def generate(self, css: Optional[str]) -> Optional[str]:
+        if css is None:
+            return None
+        name = self.generated.get(css)
+        if name is None:
+            name = unique(f'style-{len(self.generated) + 1}', self.rules)
+            self.generated[css] = name
+            self.rules[name] = css
+        return name
+
+    def css(self) -> str:
+        # Strokes only fill if they also have a fill class
+        rules = ['path,rect,circle,polygon,polyline{fill:none}']
+        rules.extend(f'.{name}{{{css}}}' for name, css in self.rules.items())
+        return '\n'.join(rules)
+
+
+def class_attribute(*names: Optional[str]) -> str:
+    names = [n for n in names if n]
+    return f' class="{" ".join(names)}"' if names else ''
+
+
+class SvgWriter:
+    """
+    Writes a Tablet as SVG from the element lists on each Layer, with no scene involved.
+
+    Each Layer becomes a group. All line segments in the same line style are drawn as one path.
+    Styling is by shared CSS classes. Each symbol is defined once and every placement of it is a
+    use of that definition, pinned and rotated, and likewise for each image. The styles and definitions
+    are written first, ahead of the elements that refer to them, and then the elements layer by layer.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        """
+        Constructor
+
+        :param stream: Write the SVG to this binary stream
+        """
+        self.stream = stream
+        self.styles = SvgStyles()
+        self.definitions: Dict[object, str] = {}  # Id of each symbol or image definition
+        self.defs: List[str] = []
+
+    def write(self, parts: List[str]):
+        self.stream.write(('\n'.join(parts) + '\n').encode('utf-8'))
+
+    def write_tablet(self, tablet: 'Tablet'):
+        """
+        Write a Tablet as a complete SVG document
+
+        :param tablet: The Tablet to write
+        """
+        layers = [tablet.layers[name] for name in tablet.layer_order if tablet.layers.get(name)]
+        for layer in layers:
+            self.prepare(layer)
+        w, h = number(tablet.Size.width), number(tablet.Size.height)
+        background = None
+        if tablet.background_color:
+            background = self.styles.add('background', 'background',
+                                         f'fill:{QColor(*tablet.background_color).name()}')
+        head = ['<?xml version="1.0" encoding="UTF-8"?>',
+                f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}pt" height="{h}pt" viewBox="0 0 {w} {h}">',
+                '<style>', self.styles.css(), '</style>', '<defs>'] + self.defs + ['</defs>']
+        if tablet.background_color:
+            head.append(f'<rect class="{background}" width="{w}" height="{h}"/>')
+        self.write(head)
+        for layer in layers:
+            self.write(self.layer(layer))
+        self.write(['</svg>'])
+        _logger.info(f"Wrote SVG with {len(self.styles.rules)} styles and {len(self.defs)} definitions")
+
+    def prepare(self, layer: 'Layer'):
+        """
+        Make the classes and definitions that the elements on a Layer use. They are written ahead of all
+        the elements, since some SVG renderers only apply styles to elements that follow them.
+
+        :param layer: The Layer
+        """
+        for ls in layer.Line_segments:
+            self.styles.line(ls.style)
+        for e in chain(layer.Circles, layer.Rectangles):
+            self.styles.line(e.border_style)
+            self.styles.fill(e.fill)
+        for u in layer.TextUnderlayRects:
+            self.styles.underlay(u.color)
+        for t in layer.Text:
+            self.styles.text(t.style['text style'])
+        for s in layer.Symbols:
+            self.symbol_id(s)
+        for i in layer.Images:
+            self.image(i.resource_path)
+        for item in layer.Polygons + layer.RawLines:
+            self.item_classes(item)
+        for rr in layer.RawRectangles:
+            self.item_classes(rr, pen=raw_rectangle_pen)
+
+    def layer(self, layer: 'Layer') -> List[str]:
+        """
+        Returns the elements of a Layer, in the Layer.render order
+
+        :param layer: The Layer
+        :return: SVG elements
+        """
+        _logger.info(f'Writing layer: {layer.Name}')
+        parts = [f'<g id="layer-{slug(layer.Name)}">']
+        parts.extend(self.lines(layer))
+        parts.extend(self.symbol(s) for s in layer.Symbols)
+        for c in style_order(layer.Circles, style=lambda e: e.border_style, filled=lambda e: e.fill):
+            classes = class_attribute(self.styles.line(c.border_style), self.styles.fill(c.fill))
+            parts.append(f'<circle cx="{number(c.center.x + c.radius)}" cy="{number(c.center.y + c.radius)}" '
+                         f'r="{number(c.radius)}"{classes}/>')
+        for r in style_order(layer.Rectangles, style=lambda e: e.border_style, filled=lambda e: e.fill):
+            classes = class_attribute(self.styles.line(r.border_style), self.styles.fill(r.fill))
+            top_radius = r.radius if r.top else 0
+            bottom_radius = r.radius if r.bottom else 0
+            if not top_radius and not bottom_radius:
+                parts.append(f'<rect x="{number(r.upper_left.x)}" y="{number(r.upper_left.y)}" '
+                             f'width="{number(r.size.width)}" height="{number(r.size.height)}"{classes}/>')
+            else:
+                path = RectangleSE.roundrect_path(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height,
+                                                  top_radius, bottom_radius)
+                parts.append(f'<path d="{path_data(path)}"{classes}/>')
+        parts.extend(self.item(p) for p in layer.Polygons)
+        for u in layer.TextUnderlayRects:
+            parts.append(f'<rect x="{number(u.upper_left.x)}" y="{number(u.upper_left.y)}" '
+                         f'width="{number(u.size.width)}" height="{number(u.size.height)}" '
+                         f'class="{self.styles.underlay(u.color)}"/>')
+        parts.extend(self.text(layer))
+        parts.extend(self.images(layer))
+        parts.extend(self.item(rl) for rl in layer.RawLines)
+        parts.extend(self.item(rr, pen=raw_rectangle_pen) for rr in layer.RawRectangles)
+        parts.append('</g>')
+        return [p for p in parts if p]
+
+    def lines(self, layer: 'Layer') -> List[str]:
+        """
+        Returns one path for all line segments drawn in each line style
+
+        :param layer: The Layer
+        :return: SVG elements
+        """
+        by_style: Dict[str, List[str]] = {}
+        for ls in layer.Line_segments:
+            by_style.setdefault(ls.style, []).append(
+                f'M{number(ls.from_here[0])} {number(ls.from_here[1])}L{number(ls.to_there[0])} '
+                f'{number(ls.to_there[1])}')
+        return [f'<path d="{"".join(d)}"{class_attribute(self.styles.line(style))}/>'
+                for style, d in sorted(by_style.items())]
+
+    def crayon_classes(self, pen: QPen, brush: Optional[QBrush]) -> str:
+        return class_attribute(self.styles.generate(pen_css(pen)),
+                               self.styles.generate(brush_css(brush)) if brush else None)
+
+    def item_classes(self, item, pen: Optional[QPen] = None) -> str:
+        """
+        Returns the class attribute for a Qt item's crayons
+
+        :param item: A Qt shape item
+        :param pen: Use this pen rather than the item's own
+        :return: The class attribute
+        """
+        return self.crayon_classes(pen or item.pen(), item_brush(item))
+
+    def item(self, item, pen: Optional[QPen] = None) -> Optional[str]:
+        path = item_path(item)
+        if path is None:
+            return None
+        return f'<path d="{path_data(item.sceneTransform().map(path))}"{self.item_classes(item, pen)}/>'
+
+    def symbol(self, symbol: SymbolItem) -> str:
+        """
+        Returns a use of a symbol's definition, pinned and rotated
+
+        :param symbol: The placed symbol
+        :return: SVG element
+        """
+        pin = symbol.pos()
+        rotation = f' rotate({number(symbol.rotation())})' if symbol.rotation() else ''
+        return (f'<use href="#{self.symbol_id(symbol)}" '
+                f'transform="translate({number(pin.x())} {number(pin.y())}){rotation}"/>')
+
+    def symbol_id(self, symbol: SymbolItem) -> str:
+        """
+        Returns the id of a symbol's definition, defining it the first time it is placed
+
+        :param symbol: The placed symbol
+        :return: The definition's id
+        """
+        prototype = symbol.prototype
+        symbol_id = self.definitions.get(prototype)
+        if symbol_id is None:
+            symbol_id = self.define(prototype, 'symbol-' + slug('-'.join(prototype.key)),
+                                    self.symbol_components(prototype))
+        return symbol_id
+
+    def define(self, key, element_id: str, components: List[str]) -> str:
+        element_id = unique(element_id, self.definitions.values())
+        self.defs.append(f'<g id="{element_id}">' + ''.join(components) + '</g>')
+        self.definitions[key] = element_id
+        return element_id
+
+    def symbol_components(self, prototype: SymbolPrototype) -> List[str]:
+        """
+        Returns the components of a symbol, drawn just as its prototype draws them, relative to its pin
+
+        :param prototype: The symbol's prototype
+        :return: SVG elements
+        """
+        return [f'<path d="{path_data(c.path)}"{self.crayon_classes(c.pen, c.brush)}/>'
+                for c in prototype.components]
+
+    def text(self, layer: 'Layer') -> List[str]:
+        """
+        Returns the lines of text, each placed on the baseline Qt lays it out on
+
+        :param layer: The Layer
+        :return: SVG elements
+        """
+        parts = []
+        ascents: Dict[str, float] = {}
+        for t in layer.Text:
+            text_style = t.style['text style']
+            ascent = ascents.get(text_style)
+            if ascent is None:
+                layout = QTextLayout('', TextMetrics.font(TextMetrics.font_key(text_style)))
+                layout.beginLayout()
+                line = layout.createLine()
+                layout.endLayout()
+                ascent = ascents[text_style] = line.ascent()
+            parts.append(f'<text x="{number(t.upper_left.x + tbox_xoffset)}" '
+                         f'y="{number(t.upper_left.y + tbox_yoffset + ascent)}" '
+                         f'class="{self.styles.text(text_style)}">{escape(t.text)}</text>')
+        return parts
+
+    def image(self, path: Path) -> Optional[str]:
+        """
+        Returns the id of an image's definition, defining it the first time it is used
+
+        :param path: The image file
+        :return: The definition's id, or None if the image can't be loaded
+        """
+        if path in self.definitions:
+            return self.definitions[path]
+        self.definitions[path] = None
+        if not path.exists():
+            _logger.error(f'Image file [{path}] not found')
+            return None
+        size = QImageReader(str(path)).size()
+        media_type = image_types.get(path.suffix.lower())
+        if not size.isValid() or not media_type:
+            _logger.error(f'Image file [{path}] could not be loaded as image')
+            return None
+        href = f'data:{media_type};base64,' + base64.b64encode(path.read_bytes()).decode('ascii')
+        element_id = f'image-{slug(path.stem)}-{len(self.defs) + 1}'
+        self.defs.append(f'<image id="{element_id}" width="{size.width()}" height="{size.height()}" '
+                         f'href={quoteattr(href)}/>')
+        self.definitions[path] = element_id
+        return element_id
+
+    def images(self, layer: 'Layer') -> List[str]:
+        parts = []
+        for i in layer.Images:
+            image_id = self.image(i.resource_path)
+            if image_id:
+                parts.append(f'<use href="#{image_id}" x="{number(i.upper_left.x)}" y="{number(i.upper_left.y)}"/>')
+        return parts
+
+
+def save_svg(tablet: 'Tablet', output: Output) -> Optional[bytes]:
+    """
+    Save a Tablet as SVG, written directly from its element lists
+
+    :param tablet: The Tablet to save
+    :param output: Path of the SVG file, a writable binary stream, or None
+    :return: The SVG content if no output was given
+    """
+    target = ExportTarget(output)
+    SvgWriter(target.stream).write_tablet(tablet)
+    return target.finish()
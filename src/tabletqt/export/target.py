@@ -0,0 +1,82 @@
+""" target.py -- Where an export is written """
+
+# System
+import io
+import os
+import logging
+from typing import Union, BinaryIO, Optional
+
+# Qt
+from PyQt6.QtCore import QIODevice, QBuffer
+
+_logger = logging.getLogger(__name__)
+
+Output = Union[str, os.PathLike, BinaryIO, None]
+"""A file path, any writable binary stream, or None to get the exported bytes back"""
+
+
+class ExportTarget:
+    """
+    Resolves the output of an export to something a Qt writer (or our own writers) can write to.
+
+    A path is handed to the writer as is. Otherwise the writer writes to an in memory buffer which,
+    when the export is finished, is copied to the output stream or, with no output at all, returned
+    as bytes. Either way, no temporary file is involved.
+    """
+
+    def __init__(self, output: Output):
+        """
+        Constructor
+
+        :param output: A file path, a writable binary stream, or None
+        """
+        self.output = output
+        self.memory = io.BytesIO() if output is None else None
+        self.buffer: Optional[QBuffer] = None
+        self.file: Optional[BinaryIO] = None  # Opened if a writer asks for a stream to a path
+
+    @property
+    def is_path(self) -> bool:
+        return isinstance(self.output, (str, os.PathLike))
+
+    @property
+    def stream(self) -> BinaryIO:
+        """
+        The Python stream to write to, for writers that don't need Qt
+
+        :return: The output stream, the in memory buffer, or the output file opened for writing
+        """
+        if self.is_path:
+            if self.file is None:
+                self.file = open(self.output, 'wb')
+            return self.file
+        return self.memory if self.memory is not None else self.output
+
+    def device(self) -> Union[str, QIODevice]:
+        """
+        Returns what a Qt writer should be constructed with
+
+        :return: A file name or a Qt device
+        """
+        if self.is_path:
+            return str(self.output)
+        self.buffer = QBuffer()
+        self.buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        return self.buffer
+
+    def finish(self) -> Optional[bytes]:
+        """
+        Close off the export once the writer is done with it
+
+        :return: The exported bytes if there was no output, otherwise None
+        """
+        if self.buffer:
+            self.buffer.close()
+            self.stream.write(bytes(self.buffer.data()))
+            self.buffer = None
+        if self.file:
+            self.file.close()
+            self.file = None
+        if self.memory is not None:
+            return self.memory.getvalue()
+        return None
@@ -0,0 +1,206 @@
+""" truetype.py -- Extract and subset TrueType font data for embedding """
+
+# System
+import logging
+import struct
+from typing import Dict, List, Tuple, Iterable
+
+# Qt
+from PyQt6.QtGui import QRawFont
+
+# Tablet
+from tabletqt.exceptions import UnsupportedFont
+
+_logger = logging.getLogger(__name__)
+
+# Tables a PDF viewer needs to draw glyphs from an embedded TrueType font
+embedded_tables = [b'head', b'hhea', b'maxp', b'hmtx', b'loca', b'glyf', b'cvt ', b'fpgm', b'prep']
+
+# Composite glyph component flags
+ARG_1_AND_2_ARE_WORDS = 0x0001
+WE_HAVE_A_SCALE = 0x0008
+MORE_COMPONENTS = 0x0020
+WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+
+class TrueTypeFont:
+    """
+    The tables of a TrueType font, read through a Qt raw font so we can embed the very font
+    Qt lays our text out with, wherever it came from.
+
+    A subset keeps only the glyphs that are drawn, renumbered from zero. The text still refers to
+    glyphs by their original ids, the PDF font maps those to the subset.
+    """
+
+    def __init__(self, raw_font: QRawFont):
+        """
+        Constructor
+
+        :param raw_font: Any Qt raw font of the typeface, its size doesn't matter
+        """
+        self.tables: Dict[bytes, bytes] = {}
+        for tag in embedded_tables:
+            data = bytes(raw_font.fontTable(tag.decode('ascii')))
+            if data:
+                self.tables[tag] = data
+        if b'glyf' not in self.tables or b'loca' not in self.tables:
+            raise UnsupportedFont
+
+        head = self.tables[b'head']
+        self.units_per_em = struct.unpack_from('>H', head, 18)[0]
+        self.bbox = struct.unpack_from('>4h', head, 36)
+        self.long_loca = struct.unpack_from('>h', head, 50)[0] == 1
+        self.num_glyphs = struct.unpack_from('>H', self.tables[b'maxp'], 4)[0]
+        hhea = self.tables[b'hhea']
+        self.ascent, self.descent = struct.unpack_from('>2h', hhea, 4)
+        metrics = struct.unpack_from('>H', hhea, 34)[0]
+        self.advances = list(struct.unpack_from(f'>{metrics * 2}H', self.tables[b'hmtx'])[::2])
+
+        loca = self.tables[b'loca']
+        if self.long_loca:
+            self.loca = struct.unpack_from(f'>{self.num_glyphs + 1}I', loca)
+        else:
+            self.loca = [o * 2 for o in struct.unpack_from(f'>{self.num_glyphs + 1}H', loca)]
+
+    def scaled(self, value: int) -> int:
+        """
+        Convert font units to the thousandths of an em used by PDF font dictionaries
+
+        :param value: Font units
+        :return: PDF glyph space units
+        """
+        return round(value * 1000 / self.units_per_em)
+
+    def advance(self, gid: int) -> int:
+        """
+        Returns the advance width of a glyph in PDF glyph space units
+
+        :param gid: Glyph id
+        :return: The advance width
+        """
+        return self.scaled(self.advances[min(gid, len(self.advances) - 1)])
+
+    def left_bearing(self, gid: int) -> bytes:
+        """
+        Returns the left side bearing of a glyph as it is stored
+
+        :param gid: Glyph id
+        :return: The bearing's two bytes from the hmtx table
+        """
+        metrics = len(self.advances)
+        # Glyphs past the last full metric only have a bearing, listed after the full metrics
+        offset = 4 * gid + 2 if gid < metrics else 4 * metrics + 2 * (gid - metrics)
+        return self.tables[b'hmtx'][offset:offset + 2]
+
+    def glyph(self, gid: int) -> bytes:
+        """
+        Returns the outline data of a glyph
+
+        :param gid: Glyph id
+        :return: The glyph's glyf table data, empty for a glyph with no outline
+        """
+        return self.tables[b'glyf'][self.loca[gid]:self.loca[gid + 1]]
+
+    def components(self, gid: int) -> List[Tuple[int, int]]:
+        """
+        Returns the glyphs a composite glyph is built from
+
+        :param gid: Glyph id
+        :return: Id of each component glyph and the offset of that id in the glyph data, empty for a simple glyph
+        """
+        found = []
+        data = self.glyph(gid)
+        if len(data) < 10 or struct.unpack_from('>h', data, 0)[0] >= 0:
+            return found
+        offset = 10
+        while True:
+            flags, component = struct.unpack_from('>HH', data, offset)
+            found.append((component, offset + 2))
+            offset += 4 + (4 if flags & ARG_1_AND_2_ARE_WORDS else 2)
+            if flags & WE_HAVE_A_SCALE:
+                offset += 2
+            elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+                offset += 4
+            elif flags & WE_HAVE_A_TWO_BY_TWO:
+                offset += 8
+            if not flags & MORE_COMPONENTS:
+                return found
+
+    def subset(self, glyphs: Iterable[int]) -> Tuple[bytes, List[int]]:
+        """
+        Build a font file with only the given glyphs, and any they are composed of, renumbered in order
+
+        :param glyphs: Ids of the glyphs that are drawn
+        :return: TrueType font file data and the original id of each glyph in it
+        """
+        keep = {0}  # The .notdef glyph is always required
+        pending = list(glyphs)
+        while pending:
+            gid = pending.pop()
+            if gid not in keep:
+                keep.add(gid)
+                pending.extend(c for c, _ in self.components(gid))
+        old_ids = sorted(keep)
+        new_ids = {old: new for new, old in enumerate(old_ids)}
+
+        glyf = bytearray()
+        loca = [0]
+        hmtx = bytearray()
+        for gid in old_ids:
+            data = bytearray(self.glyph(gid))
+            for component, offset in self.components(gid):
+                struct.pack_into('>H', data, offset, new_ids[component])
+            glyf += data
+            glyf += b'\0' * (-len(glyf) % 4)
+            loca.append(len(glyf))
+            hmtx += struct.pack('>H', self.advances[min(gid, len(self.advances) - 1)]) + self.left_bearing(gid)
+
+        tables = dict(self.tables)
+        tables[b'glyf'] = bytes(glyf)
+        tables[b'loca'] = struct.pack(f'>{len(loca)}I', *loca)
+        tables[b'hmtx'] = bytes(hmtx)
+        head = bytearray(self.tables[b'head'])
+        struct.pack_into('>I', head, 8, 0)  # Checksum adjustment, which no PDF viewer checks
+        struct.pack_into('>h', head, 50, 1)  # The loca table is now in long format
+        tables[b'head'] = bytes(head)
+        hhea = bytearray(self.tables[b'hhea'])
+        struct.pack_into('>H', hhea, 34, len(old_ids))  # A full metric for every glyph
+        tables[b'hhea'] = bytes(hhea)
+        maxp = bytearray(self.tables[b'maxp'])
+        struct.pack_into('>H', maxp, 4, len(old_ids))
+        tables[b'maxp'] = bytes(maxp)
+        return sfnt(tables), old_ids
+
+
+def checksum(data: bytes) -> int:
+    """
+    Sum a table as 32 bit words
+
+    :param data: Table data padded to a multiple of four bytes
+    :return: The table checksum
+    """
+    return sum(struct.unpack(f'>{len(data) // 4}I', data)) & 0xFFFFFFFF
+
+
+def sfnt(tables: Dict[bytes, bytes]) -> bytes:
+    """
+    Assemble tables into a TrueType font file
+
+    :param tables: Table data keyed by tag
+    :return: The font file data
+    """
+    tags = sorted(tables)
+    entry_selector = len(tags).bit_length() - 1
+    search_range = (1 << entry_selector) * 16
+    header = struct.pack('>IHHHH', 0x00010000, len(tags), search_range, entry_selector,
+                         len(tags) * 16 - search_range)
+    directory = b''
+    body = b''
+    offset = len(header) + 16 * len(tags)
+    for tag in tags:
+        data = tables[tag]
+        padded = data + b'\0' * (-len(data) % 4)
+        directory += struct.pack('>4sIII', tag, checksum(padded), offset + len(body), len(data))
+        body += padded
+    return header + directory + body
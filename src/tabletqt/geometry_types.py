@@ -29,4 +29,5 @@ class HorizAlign(Enum):
 Rectangle = namedtuple('Rectangle', 'line_style lower_left, size')
 Position = namedtuple('Position', 'x y')
 Line_Segment = namedtuple('Line_Segment', 'from_position to_position')
-Rect_Size = namedtuple('Rect_Size', 'height width')
\ No newline at end of file
+Rect_Size = namedtuple('Rect_Size', 'height width')
+Extent = namedtuple('Extent', 'lower_left size')  # A bounding box, lower_left may be relative to some origin
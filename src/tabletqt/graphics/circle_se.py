@@ -12,6 +12,7 @@ from PyQt6.QtCore import QRectF
 import tabletqt.element as element
 from tabletqt.geometry_types import Position
 from tabletqt.graphics.crayon_box import CrayonBox
+from tabletqt.graphics.path_batch import PathBatch
 
 if TYPE_CHECKING:
     from tabletqt.layer import Layer
@@ -58,11 +59,17 @@ class CircleSE:
 
         :param layer: Draw on this layer
         """
+        batch = PathBatch(layer) if layer.Tablet.coalesce_geometry else None
 
         for c in layer.Circles:
 
             # Create the circle item
             diameter = c.radius*2
+            if batch and not c.fill:
+                batch.path(c.border_style).addEllipse(QRectF(c.center.x, c.center.y, diameter, diameter))
+                continue
+            if batch:
+                batch.flush()  # Anything drawn so far must be underneath this filled circle
             c_item = QGraphicsEllipseItem(QRectF(c.center.x, c.center.y, diameter, diameter))
             _logger.info(f"> Circle at: ({c.center.x}, {c.center.y}), diameter: {diameter}")
 
@@ -71,4 +78,6 @@ class CircleSE:
 
             # Add it to the scene
             layer.Scene.addItem(c_item)
+        if batch:
+            batch.flush()
 
@@ -2,7 +2,7 @@
 
 # System
 import logging
-from typing import Optional
+from typing import Optional, Dict
 
 # Qt
 from PyQt6.QtGui import QBrush, QPen, QColor
@@ -16,33 +16,66 @@ _logger = logging.getLogger(__name__)
 class CrayonBox:
     """
     Get your crayons here. Specifically, your Qt pen and brush settings.
+
+    A diagram may have tens of thousands of items, but only a handful of line styles and fills.
+    So each pen and brush is made just once from the StyleDB and then shared by every item drawn with it.
+    All of them are thrown out and made again on demand whenever the StyleDB is reloaded.
     """
+    pens: Dict[str, QPen] = {}  # Pen for each line style
+    brushes: Dict[Optional[str], QBrush] = {}  # Brush for each fill color name (None for no fill)
+    fill_brushes: Dict[FloatRGB, QBrush] = {}  # Brush for each borderless fill RGB color
+    no_pen = None
+    generation = None  # StyleDB generation these crayons were made from
+
     @classmethod
-    def choose_crayons(cls, item: QAbstractGraphicsShapeItem | QGraphicsLineItem, border_style: str,
-                       fill: Optional['str'] = None):
+    def check_styles(cls):
         """
-        Create and assign a pen and brush for a given QT graphics item with settings found
-        in the StyleDB
+        Empty the box if the StyleDB has been reloaded since our crayons were made
+        """
+        if cls.generation != StyleDB.generation:
+            cls.pens = {}
+            cls.brushes = {}
+            cls.fill_brushes = {}
+            cls.generation = StyleDB.generation
+
+    @classmethod
+    def pen(cls, border_style: str) -> QPen:
+        """
+        Returns the pen for a line style, making it if necessary
 
-        :param item: Qt graphic item to be displayed
         :param border_style: Name of the user border style key in the StyleDB
-        :param fill: Name of user fill key in the StyleDB, if any
+        :return: Qt pen
         """
-        # Create a pen and set its properties using the StyleDB
-        # Color
-        cname = StyleDB.line_style[border_style].color
-        c_color = StyleDB.color[cname]
-        # Width
-        w = StyleDB.line_style[border_style].width
-        pen = QPen(QColor(*c_color), w)
-        # Pattern
-        pname = StyleDB.line_style[border_style].pattern  # name of line style's pattern
-        if pname != 'no dash':
-            pvalue = StyleDB.dash_pattern[pname]  # find pattern value in dash pattern dict
-            pen.setDashPattern([*pvalue])
+        cls.check_styles()
+        pen = cls.pens.get(border_style)
+        if pen is None:
+            # Create a pen and set its properties using the StyleDB
+            # Color
+            cname = StyleDB.line_style[border_style].color
+            c_color = StyleDB.color[cname]
+            # Width
+            w = StyleDB.line_style[border_style].width
+            pen = QPen(QColor(*c_color), w)
+            # Pattern
+            pname = StyleDB.line_style[border_style].pattern  # name of line style's pattern
+            if pname != 'no dash':
+                pvalue = StyleDB.dash_pattern[pname]  # find pattern value in dash pattern dict
+                pen.setDashPattern([*pvalue])
+            cls.pens[border_style] = pen
+            _logger.info(f"Pen [{border_style}] color: [{cname}], width: [{w}], pattern: [{pname}]")
+        return pen
 
-        if isinstance(item, QAbstractGraphicsShapeItem):
-            # item is fillable, not a line item, for example
+    @classmethod
+    def brush(cls, fill: Optional[str] = None) -> QBrush:
+        """
+        Returns the brush for a fill color, making it if necessary
+
+        :param fill: Name of user fill key in the StyleDB, if any
+        :return: Qt brush, transparent if there is no fill
+        """
+        cls.check_styles()
+        brush = cls.brushes.get(fill)
+        if brush is None:
             if fill:
                 # If a fill is specified, create a corresponding brush
                 fill_rgb_color_value = StyleDB.color[fill]
@@ -50,25 +83,63 @@ class CrayonBox:
                 _logger.info(f"Brush color: [{fill}]")
             else:
                 brush = QBrush(Qt.GlobalColor.transparent)
-            item.setBrush(brush)
+            cls.brushes[fill] = brush
+        return brush
+
+    @classmethod
+    def choose_crayons(cls, item: QAbstractGraphicsShapeItem | QGraphicsLineItem, border_style: str,
+                       fill: Optional['str'] = None):
+        """
+        Assign a pen and brush for a given QT graphics item with settings found
+        in the StyleDB
+
+        :param item: Qt graphic item to be displayed
+        :param border_style: Name of the user border style key in the StyleDB
+        :param fill: Name of user fill key in the StyleDB, if any
+        """
+        if isinstance(item, QAbstractGraphicsShapeItem):
+            # item is fillable, not a line item, for example
+            item.setBrush(cls.brush(fill))
 
         # Set the item pen and brush of the graphic item
-        item.setPen(pen)
-        _logger.info(f"Pen color: [{cname}], width: [{w}], pattern: [{pname}]")
+        item.setPen(cls.pen(border_style))
 
     @classmethod
     def choose_fill_only(cls, item: QAbstractGraphicsShapeItem, fill: FloatRGB):
         """
-        Create and assign a transparent pen (no border) and brush for a given QT graphics item
+        Assign a transparent pen (no border) and brush for a given QT graphics item
         with settings found in the StyleDB.
 
         :param item: Qt graphic item to be displayed (must be a closed shape)
         :param fill: RGB color
         :return:
         """
-        _logger.info(f"Brush color: {fill}")
+        item.setPen(cls.transparent_pen())
+        item.setBrush(cls.fill_brush(fill))
 
-        pen = QPen(Qt.GlobalColor.transparent)
-        brush = QBrush(QColor(*fill))
-        item.setPen(pen)
-        item.setBrush(brush)
\ No newline at end of file
+    @classmethod
+    def transparent_pen(cls) -> QPen:
+        """
+        Returns the transparent pen used for borderless fills
+
+        :return: Qt pen
+        """
+        if cls.no_pen is None:
+            cls.no_pen = QPen(Qt.GlobalColor.transparent)
+        return cls.no_pen
+
+    @classmethod
+    def fill_brush(cls, fill: FloatRGB) -> QBrush:
+        """
+        Returns the brush for a borderless fill color, making it if necessary
+
+        :param fill: RGB color
+        :return: Qt brush
+        """
+        cls.check_styles()
+        brush = cls.fill_brushes.get(fill)
+        if brush is None:
+            _logger.info(f"Brush color: {fill}")
+            brush = QBrush(QColor(*fill))
+            cls.fill_brushes[fill] = brush
+        return brush
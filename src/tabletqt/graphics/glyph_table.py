@@ -0,0 +1,154 @@
+""" glyph_table.py -- Vectorized text measurement from per font glyph metrics """
+
+# System
+import logging
+from typing import Dict, List, Optional
+
+# Qt
+from PyQt6.QtGui import QFontMetricsF, QTextLayout
+
+# Tablet
+from tabletqt.geometry_types import Rect_Size
+from tabletqt.graphics.text_metrics import TextMetrics, FontKey
+
+try:
+    import numpy as np
+except ImportError:  # Optional, install with the numpy extra
+    np = None
+
+_logger = logging.getLogger(__name__)
+
+fixed_scale = 64  # Qt lays out glyphs in 26.6 fixed point, so we compute in 1/64ths of a point
+table_chars = [chr(c) for c in range(32, 127)]  # Printable ascii, anything else is measured by Qt
+table_size = 128
+
+
+class GlyphTable:
+    """
+    Per font glyph metrics that let us measure many lines of text at once with NumPy rather than asking
+    Qt about each line.
+
+    Qt's ink bounding rectangle for a line is computed by placing each glyph at the sum of the preceding
+    (kerned) advances and taking the extent of the glyph ink boxes. So for each font we ask Qt once for the
+    advance and ink box of each character and for the kerning of each pair of characters. A line width is
+    then just a cumulative sum and a min/max per line, all in the same fixed point units Qt uses, so the
+    results are identical to Qt's.
+
+    That only holds when each character is shaped as its own glyph. Pairs that the font replaces with a
+    ligature (fi, fl, ...) are detected when the table is built, and any line containing one of them, any
+    non-ascii text (complex scripts, combining marks, ...) and any font that doesn't calibrate is measured
+    by Qt instead.
+    """
+    tables: Dict[FontKey, 'GlyphTable'] = {}
+
+    @classmethod
+    def for_font(cls, key: FontKey) -> 'GlyphTable':
+        """
+        Returns the glyph table for a font, building it if necessary
+
+        :param key: Font properties
+        :return: The font's glyph table
+        """
+        table = cls.tables.get(key)
+        if table is None:
+            table = GlyphTable(key)
+            cls.tables[key] = table
+        return table
+
+    def __init__(self, key: FontKey):
+        """
+        Extract glyph advances, ink boxes and kerning for a font from Qt
+
+        :param key: Font properties
+        """
+        self.key = key
+        fm = TextMetrics.metrics(key)
+        fmf = QFontMetricsF(TextMetrics.font(key))
+
+        self.advance = np.zeros(table_size, dtype=np.int64)
+        self.ink_left = np.zeros(table_size, dtype=np.int64)
+        self.ink_width = np.zeros(table_size, dtype=np.int64)
+        heights = set()
+        for c in table_chars:
+            ink = fm.boundingRect(c)
+            self.advance[ord(c)] = round(fmf.horizontalAdvance(c) * fixed_scale)
+            self.ink_left[ord(c)] = ink.x() * fixed_scale
+            self.ink_width[ord(c)] = ink.width() * fixed_scale
+            heights.add(ink.height())
+        # Qt reports the font height rather than the ink height, we can only use a single value
+        self.height: Optional[int] = heights.pop() if len(heights) == 1 else None
+
+        pairs = [a + b for a in table_chars for b in table_chars]
+        codes = np.array([[ord(p[0]), ord(p[1])] for p in pairs], dtype=np.intp)
+        pair_advance = np.array([round(fmf.horizontalAdvance(p) * fixed_scale) for p in pairs], dtype=np.int64)
+        self.kerning = np.zeros((table_size, table_size), dtype=np.int64)
+        self.kerning[codes[:, 0], codes[:, 1]] = pair_advance - self.advance[codes[:, 0]] - self.advance[codes[:, 1]]
+
+        # Flag any pair that isn't shaped as two glyphs or that we measure differently than Qt
+        self.ligature = np.zeros((table_size, table_size), dtype=bool)
+        layout = QTextLayout()
+        layout.setFont(TextMetrics.font(key))
+        predicted = self.widths(pairs)
+        for p, width in zip(pairs, predicted):
+            layout.setText(p)
+            layout.beginLayout()
+            layout.createLine()
+            layout.endLayout()
+            glyphs = sum(len(run.glyphIndexes()) for run in layout.glyphRuns())
+            if glyphs != 2 or fm.boundingRect(p).width() != width:
+                self.ligature[ord(p[0]), ord(p[1])] = True
+        if self.height is None:
+            _logger.warning(f"Font [{key}] has no uniform line height, it will be measured by Qt")
+        _logger.info(f"Glyph table [{key}], {self.ligature.sum()} pairs measured by Qt")
+
+    def widths(self, lines: List[str]) -> 'np.ndarray':
+        """
+        Computes the ink width of each line, assuming every line is non-empty printable ascii
+        without ligatures
+
+        :param lines: Lines of text
+        :return: Width of each line in points
+        """
+        codes = np.frombuffer(''.join(lines).encode('ascii'), dtype=np.uint8).astype(np.intp)
+        lengths = np.fromiter(map(len, lines), dtype=np.intp, count=len(lines))
+        starts = np.zeros(len(lines), dtype=np.intp)
+        np.cumsum(lengths[:-1], out=starts[1:])
+
+        # Each glyph advances the pen for the next one, kerned against its successor within the line
+        step = self.advance[codes]
+        step[:-1] += self.kerning[codes[:-1], codes[1:]]
+        step[starts + lengths - 1] = 0  # The pen restarts with each line
+        pen = np.cumsum(step) - step
+        pen -= np.repeat(pen[starts], lengths)
+
+        # Qt rounds each glyph's left edge up to a whole point before adding its ink width
+        left = pen + self.ink_left[codes]
+        right = -(-left // fixed_scale) * fixed_scale + self.ink_width[codes]
+        extent = np.maximum.reduceat(right, starts) - np.minimum.reduceat(left, starts)
+        return (extent + fixed_scale // 2) // fixed_scale
+
+    def measure(self, lines: List[str]) -> List[Rect_Size]:
+        """
+        Measures many lines of text, delegating any that can't be computed from the table to Qt
+
+        :param lines: Lines of text
+        :return: Size of each line's ink area
+        """
+        sizes: List[Optional[Rect_Size]] = [None] * len(lines)
+        if self.height is not None:
+            table_lines = [i for i, line in enumerate(lines) if line and line.isascii() and line.isprintable()]
+            if table_lines:
+                text = [lines[i] for i in table_lines]
+                widths = self.widths(text).tolist()
+                # Reject any line containing a ligature pair
+                codes = np.frombuffer(''.join(text).encode('ascii'), dtype=np.uint8).astype(np.intp)
+                lig = np.zeros(len(codes), dtype=bool)
+                lig[:-1] = self.ligature[codes[:-1], codes[1:]]
+                lengths = np.fromiter(map(len, text), dtype=np.intp, count=len(text))
+                ends = np.cumsum(lengths) - 1
+                lig[ends] = False  # Pairs straddling two lines don't count
+                has_lig = np.logical_or.reduceat(lig, ends - lengths + 1).tolist()
+                for i, width, skip in zip(table_lines, widths, has_lig):
+                    if not skip:
+                        sizes[i] = Rect_Size(height=self.height, width=width)
+        return [s if s else TextMetrics.line_size(self.key, line) for s, line in zip(sizes, lines)]
@@ -12,15 +12,12 @@ if TYPE_CHECKING:
 from PyQt6.QtWidgets import QGraphicsPixmapItem
 from PyQt6.QtGui import QPixmap
 
-# Modelint
-from mi_config.config import Config
-
 # Tablet
 import tabletqt.element as element
 from tabletqt.geometry_types import Position, Rect_Size
 from tabletqt.exceptions import TabletBoundsExceeded
 from tabletqt.styledb import StyleDB
-from tabletqt.tablet_config import TabletConfig
+from tabletqt.config_cache import ConfigCache
 
 _logger = logging.getLogger(__name__)
 
@@ -44,14 +41,19 @@ class ImageDE:
     - Size -- The actual size of the image in the file
     """
     image_paths = None
+    _image_dict = None  # The images configuration data the image paths were built from
+    _image_root = None  # And the configuration directory they were built in
 
     @classmethod
     def build_paths(cls):
         """ Assign image file dictionary """
-        raw_config_data = Config(app_name=TabletConfig.app_name, lib_config_dir=TabletConfig.config_path, fspec={'images': None})
-        image_dict = raw_config_data.loaded_data['images']
-        root_dir = raw_config_data.user_config_dir
+        image_dict = ConfigCache.load('images')
+        root_dir = ConfigCache.user_config_dir
+        if image_dict is cls._image_dict and root_dir == cls._image_root:
+            return  # Paths already built from this data
         cls.image_paths = {k: Path(root_dir / 'images' / v) for k,v in image_dict.items()}
+        cls._image_dict = image_dict
+        cls._image_root = root_dir
 
 
     @classmethod
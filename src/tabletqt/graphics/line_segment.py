@@ -15,6 +15,7 @@ from PyQt6.QtCore import QLineF
 import tabletqt.element as element
 from tabletqt.geometry_types import Position
 from tabletqt.graphics.crayon_box import CrayonBox
+from tabletqt.graphics.path_batch import PathBatch
 from tabletqt.exceptions import MissingConfigData
 
 _logger = logging.getLogger(__name__)
@@ -60,6 +61,16 @@ class LineSegment:
 
         :param layer: Draw on this layer
         """
+        if layer.Tablet.coalesce_geometry:
+            # Line segments are never filled, so all of them can go into one path per line style
+            batch = PathBatch(layer)
+            for ls in layer.Line_segments:
+                path = batch.path(ls.style)
+                path.moveTo(*ls.from_here)
+                path.lineTo(*ls.to_there)
+            batch.flush()
+            return
+
         for ls in layer.Line_segments:
             _logger.info(f"> Line {ls.from_here}, {ls.to_there}")
 
@@ -0,0 +1,174 @@
+""" metrics_store.py -- Persistent text measurement cache shared across processes """
+
+# System
+import logging
+import atexit
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, List, Tuple, TYPE_CHECKING
+
+# Qt
+from PyQt6.QtCore import qVersion
+from PyQt6.QtGui import QRawFont
+
+# Tablet
+from tabletqt.geometry_types import Rect_Size
+from tabletqt.config_cache import ConfigCache
+
+if TYPE_CHECKING:
+    from tabletqt.graphics.text_metrics import FontKey
+
+_logger = logging.getLogger(__name__)
+
+flush_threshold = 500  # Write new measurements to the database once this many have accumulated
+busy_timeout_ms = 5000  # How long to wait for another process that is writing to the database
+
+# A change to any of these files may change how a text style is measured
+style_files = ['text_styles', 'typefaces']
+
+
+class MetricsStore:
+    """
+    An optional SQLite database of text line sizes that survives from one process to the next, so that
+    repeated renders of the same model (in CI, for example) skip most of the font work.
+
+    Each size is keyed by a font id and the text. The font id is a digest of everything that determines
+    the measurement: the Qt version, the font's header table (which identifies the actual font file),
+    its family and style, and the size, weight and slant of the text style. So if a font is updated, it gets
+    a new id and the old measurements are simply never used again. Additionally, the database is emptied if
+    the text style or typeface configuration has changed since it was last used.
+
+    The database uses write ahead logging so that any number of processes can read it while another one
+    writes. New measurements are written in batches.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) a metrics database
+
+        :param path: Path of the SQLite database file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.font_ids: Dict['FontKey', str] = {}
+        self.sizes: Dict[str, Dict[str, Rect_Size]] = {}  # Sizes loaded from the database for each font id
+        self.pending: List[Tuple[str, str, int, int]] = []
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS line_size (font TEXT, text TEXT, height INTEGER, "
+                            "width INTEGER, PRIMARY KEY (font, text)) WITHOUT ROWID")
+            self.check_styles()
+        _logger.info(f"Text metrics store: {path}")
+
+    def check_styles(self):
+        """
+        Empty the database if the text style configuration has changed since it was last used
+        """
+        styles_digest = hashlib.sha256(''.join(ConfigCache.stamp(f).digest for f in style_files).encode())
+        digest = styles_digest.hexdigest()
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'styles'").fetchone()
+        if row and row[0] == digest:
+            return
+        if row:
+            _logger.info("Text styles changed, emptying text metrics store")
+        self.db.execute("DELETE FROM line_size")
+        self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('styles', ?)", (digest,))
+
+    def font_id(self, key: 'FontKey') -> str:
+        """
+        Returns the id of a font, computing it if necessary
+
+        :param key: Font properties
+        :return: Digest identifying the font and text style properties
+        """
+        fid = self.font_ids.get(key)
+        if fid is None:
+            from tabletqt.graphics.text_metrics import TextMetrics
+            raw_font = QRawFont.fromFont(TextMetrics.font(key))
+            h = hashlib.sha256()
+            for part in (qVersion(), raw_font.familyName(), raw_font.styleName(), *map(str, key)):
+                h.update(part.encode())
+                h.update(b'\0')
+            h.update(bytes(raw_font.fontTable('head')))
+            fid = h.hexdigest()[:16]
+            self.font_ids[key] = fid
+        return fid
+
+    def get(self, key: 'FontKey', text_line: str) -> Optional[Rect_Size]:
+        """
+        Look up the size of a line of text
+
+        :param key: Font properties
+        :param text_line: Line of text
+        :return: The stored size or None if it has never been measured
+        """
+        fid = self.font_id(key)
+        sizes = self.sizes.get(fid)
+        if sizes is None:
+            # First request for this font, load everything we have for it
+            with self.lock:
+                rows = self.db.execute("SELECT text, height, width FROM line_size WHERE font = ?", (fid,))
+                sizes = {text: Rect_Size(height=h, width=w) for text, h, w in rows}
+            self.sizes[fid] = sizes
+        return sizes.get(text_line)
+
+    def put(self, key: 'FontKey', text_line: str, size: Rect_Size):
+        """
+        Save the size of a line of text
+
+        :param key: Font properties
+        :param text_line: Line of text
+        :param size: Its measured size
+        """
+        fid = self.font_id(key)
+        self.sizes.setdefault(fid, {})[text_line] = size
+        with self.lock:
+            self.pending.append((fid, text_line, size.height, size.width))
+            if len(self.pending) >= flush_threshold:
+                self._flush()
+
+    def flush(self):
+        """
+        Write any new measurements to the database
+        """
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending or self.db is None:
+            return
+        try:
+            with self.db:
+                self.db.executemany("INSERT OR IGNORE INTO line_size (font, text, height, width) VALUES (?, ?, ?, ?)",
+                                    self.pending)
+        except sqlite3.OperationalError as e:
+            # Another process held the database too long, these measurements just won't be saved
+            _logger.warning(f"Could not save text metrics to [{self.path}]: {e}")
+        self.pending = []
+
+    def close(self):
+        """
+        Save any new measurements and close the database
+        """
+        self.flush()
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+def open_store(path: Optional[Path] = None) -> MetricsStore:
+    """
+    Open a metrics store that is saved and closed when the process exits
+
+    :param path: Database path, defaults to the user configuration directory
+    :return: The open store
+    """
+    store = MetricsStore(path or ConfigCache.user_config_dir / "text_metrics.db")
+    atexit.register(store.close)
+    return store
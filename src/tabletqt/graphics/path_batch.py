@@ -0,0 +1,64 @@
+""" path_batch.py -- Coalesce unfilled outlines into one path item per line style """
+
+# System
+import logging
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from tabletqt.layer import Layer
+
+# Qt
+from PyQt6.QtWidgets import QGraphicsPathItem
+from PyQt6.QtGui import QPainterPath
+
+# Tablet
+from tabletqt.graphics.crayon_box import CrayonBox
+
+_logger = logging.getLogger(__name__)
+
+
+class PathBatch:
+    """
+    A diagram may have tens of thousands of line segments and outlines, but only a handful of line styles.
+    When a Tablet coalesces geometry, each shape renderer adds its unfilled outlines to a PathBatch rather
+    than creating an item per shape, and the batch then adds a single path item per line style to the scene.
+
+    Between filled shapes, the outlines are drawn grouped by line style rather than in the order they were
+    added. Where outlines in different colors or widths overlap, a different one may end up on top. That
+    is the price of coalescing, accepted only when a Tablet is asked to coalesce geometry. A filled shape,
+    though, must still cover whatever was drawn before it, so a renderer flushes its batch before adding
+    each filled shape. Filled shapes therefore keep their place in the drawing order.
+    """
+
+    def __init__(self, layer: 'Layer'):
+        """
+        Constructor
+
+        :param layer: Add the coalesced path items to this Layer's scene
+        """
+        self.layer = layer
+        self.paths: Dict[str, QPainterPath] = {}  # Path for each line style, in order of first use
+
+    def path(self, border_style: str) -> QPainterPath:
+        """
+        Returns the path collecting outlines drawn in a line style
+
+        :param border_style: Name of the line style
+        :return: Qt painter path to add the outline to
+        """
+        path = self.paths.get(border_style)
+        if path is None:
+            path = QPainterPath()
+            self.paths[border_style] = path
+        return path
+
+    def flush(self):
+        """
+        Add a path item for each line style to the scene and start over
+        """
+        for border_style, path in self.paths.items():
+            p_item = QGraphicsPathItem(path)
+            CrayonBox.choose_crayons(item=p_item, border_style=border_style)
+            _logger.info(f"> Coalesced [{path.elementCount()}] path elements in line style [{border_style}]")
+            self.layer.Scene.addItem(p_item)
+        self.paths = {}
@@ -17,6 +17,7 @@ import tabletqt.element as element
 from tabletqt.geometry_types import Rect_Size, Position
 from tabletqt.styledb import StyleDB
 from tabletqt.graphics.crayon_box import CrayonBox
+from tabletqt.graphics.path_batch import PathBatch
 from tabletqt.exceptions import MissingConfigData
 
 _logger = logging.getLogger(__name__)
@@ -95,6 +96,20 @@ class RectangleSE:
         Draw rectangle with rounded corners on top, bottom or both. Radius is expressed in points
         with zero resulting in a square corner on top, bottom or both
 
+        :param x: Upper left x
+        :param y: Upper left y
+        :param width: Rect width
+        :param height: Rect height
+        :param top_r: Top corner radius
+        :param bottom_r: Bottom corner radius
+        """
+        return QGraphicsPathItem(cls.roundrect_path(x, y, width, height, top_r, bottom_r))
+
+    @classmethod
+    def roundrect_path(cls, x: float, y: float, width: float, height: float, top_r: int, bottom_r: int) -> QPainterPath:
+        """
+        Outline of a rectangle with rounded corners on top, bottom or both
+
         :param x: Upper left x
         :param y: Upper left y
         :param width: Rect width
@@ -130,7 +145,7 @@ class RectangleSE:
             path.lineTo(rect.left() + bottom_r, rect.bottom())
             path.arcTo(rect.left(), rect.bottom() - bottom_r * 2, bottom_r * 2, bottom_r * 2, 270, -90)
 
-        return QGraphicsPathItem(path)
+        return path
 
     @classmethod
     def render(cls, layer: 'Layer'):
@@ -139,6 +154,8 @@ class RectangleSE:
 
         :param layer: Draw on this Layer
         """
+        batch = PathBatch(layer) if layer.Tablet.coalesce_geometry else None
+
         for r in layer.Rectangles:
             # Diagnostic shaded rectangle bounding box under the rendered rectangle
             # to see if the corners are drawn correctly
@@ -152,6 +169,17 @@ class RectangleSE:
             # Set rectangle extents and draw
             top_radius = r.radius if r.top else 0
             bottom_radius = r.radius if r.bottom else 0
+            if batch and not r.fill:
+                # Just the outline, add it to the path for its line style
+                path = batch.path(r.border_style)
+                if not top_radius and not bottom_radius:
+                    path.addRect(QRectF(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height))
+                else:
+                    path.addPath(cls.roundrect_path(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height,
+                                                    top_radius, bottom_radius))
+                continue
+            if batch:
+                batch.flush()  # Anything drawn so far must be underneath this filled rectangle
             if not top_radius and not bottom_radius:
                 rect = QRectF(r.upper_left.x, r.upper_left.y, r.size.width, r.size.height)
                 r_item = QGraphicsRectItem(rect)
@@ -164,6 +192,8 @@ class RectangleSE:
             # Set pen and brush
             CrayonBox.choose_crayons(item=r_item, border_style=r.border_style, fill=r.fill)
             layer.Scene.addItem(r_item)
+        if batch:
+            batch.flush()
 
     @classmethod
     def render_fillrect(cls, layer: 'Layer', frect: element.FillRect):
@@ -1,39 +1,108 @@
 """ symbol.py - Draw a predefined symbol """
 
 # System
+import math
 import logging
-from PyQt6.QtWidgets import QGraphicsPolygonItem, QGraphicsLineItem, QGraphicsItemGroup, QGraphicsEllipseItem
-from PyQt6.QtCore import QPointF, QLineF, QRectF
-from PyQt6.QtGui import QPolygonF
-from typing import TYPE_CHECKING, Callable, Dict
+from collections import namedtuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Set
 
 if TYPE_CHECKING:
     from tabletqt.tablet import Layer
+    from tabletqt.presentation import Presentation
 
-# Modelint
-from mi_config.config import Config
+# Qt
+from PyQt6.QtWidgets import QGraphicsItem
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QPolygonF, QPainterPath, QPainterPathStroker
 
 # Tablet
 from tabletqt.styledb import StyleDB
-from tabletqt.geometry_types import Position
+from tabletqt.geometry_types import Position, Rect_Size, Extent
 from tabletqt.graphics.crayon_box import CrayonBox
-from tabletqt.tablet_config import TabletConfig
+from tabletqt.config_cache import ConfigCache
 from tabletqt.exceptions import BadConfigData
 
+_logger = logging.getLogger(__name__)
+
+SymbolComponent = namedtuple('_SymbolComponent', 'path pen brush')  # No brush for an unfilled polyline
+
+
+class SymbolPrototype:
+    """
+    The drawing of a symbol, compiled from its definition and Presentation styles: a path for each component
+    with the pen and brush to draw it, in device coordinates relative to the symbol's pin.
+    Every placement of the symbol shares the one prototype.
+    """
+
+    def __init__(self, key: Tuple[str, str, str], components: List[SymbolComponent], size: Rect_Size):
+        """
+        Constructor
+
+        :param key: Drawing Type, Presentation and symbol name
+        :param components: Each component shape, styled
+        :param size: Unrotated size of the symbol's bounding box
+        """
+        self.key = key
+        self.components = components
+        self.size = size
+        # Everything painted, pen width included
+        self.bounds = QRectF()
+        for c in components:
+            self.bounds = self.bounds.united(QPainterPathStroker(c.pen).createStroke(c.path).boundingRect())
+            self.bounds = self.bounds.united(c.path.boundingRect())
+
+
+class SymbolItem(QGraphicsItem):
+    """
+    A placed symbol: its prototype, moved to the pin and rotated about it
+    """
+
+    def __init__(self, prototype: SymbolPrototype, device_pin: Position, angle: int):
+        """
+        Constructor
+
+        :param prototype: What the symbol draws
+        :param device_pin: Pin location in device coordinates
+        :param angle: Degrees clockwise
+        """
+        super().__init__()
+        self.prototype = prototype
+        self.setPos(device_pin.x, device_pin.y)
+        self.setRotation(angle)
+
+    def boundingRect(self) -> QRectF:
+        return self.prototype.bounds
+
+    def paint(self, painter, option, widget=None):
+        for c in self.prototype.components:
+            painter.setPen(c.pen)
+            painter.setBrush(Qt.BrushStyle.NoBrush if c.brush is None else c.brush)
+            painter.drawPath(c.path)
+
+
 class Symbol:
     """
     A composite group of shapes that can be rotated and placed anywhere on the Tablet on a specified Layer.
+
+    A diagram may place the same few symbols thousands of times, so each symbol is compiled into
+    a prototype just once per Presentation, and placing it only positions a lightweight item
+    that draws the prototype.
     """
-    symbol_defs = None
+    symbol_defs = None  # Symbol definitions keyed by Drawing Type, each parsed on first use
+    # By Drawing Type, Presentation and name. Keyed by the Presentation itself, since a Presentation
+    # of the same name is loaded again if drawing_types.yaml is edited
+    prototypes: Dict[Tuple[str, 'Presentation', str], SymbolPrototype] = {}
+    prototype_generation = None  # StyleDB generation the prototypes' crayons were chosen from
+    sizes: Dict[Tuple[str, str], Rect_Size] = {}  # By Drawing Type and symbol name
+    extents: Dict[Tuple[str, str, float], Extent] = {}  # By Drawing Type, symbol name and angle
+    extent_drawing_types: Set[str] = set()  # Drawing Types with extents computed at each right angle
 
     def __init__(self, layer: 'Layer', name: str, pin: Position, angle: int = 0):
         """
-        Creates a Symbol that builds itself up from data specified in symbols.yaml and
-            builds a PyQt group which is added to the layer's list of Symbols
+        Places a Symbol built up from data specified in symbols.yaml, adding a Qt item
+        to the layer's list of Symbols
 
-        :param app: Name of the client application, ex: 'flatland', (needed to index into symbol data)
         :param layer: Layer where symbol will be drawn ex: 'diagram'
-        :param group: Symbol belongs to this group (diagram type/notation if flatland), ex: Starr class
         :param name: Symbol name (1 mult, target state, etc)
         :param pin: Where the symbol will be 'pinned' in table coordinates. Imagine a pin pushed through the
         bottom of the symbol bounding box into the tablet. Then the symbol can be rotated around this pin. So
@@ -43,196 +112,246 @@ class Symbol:
         the pin location.
         :param angle: Degrees clockwise with 0, 90, 180, and 270 at 12, 3, 6, and 9 o'clock respectively
         """
-        self.logger = logging.getLogger(__name__)
         self.layer = layer
         self.name = name
         self.pin = pin
         self.angle = angle
-        self.width = 0
-        self.height = 0
-        self.symbol_item = QGraphicsItemGroup()
+        prototype = self.prototype(drawing_type=layer.Drawing_type, presentation=layer.Presentation, name=name)
+        self.width = prototype.size.width
+        self.height = prototype.size.height
+
+        # Convert pin to device coordinates
+        self.device_pin = layer.Tablet.to_dc(pin)
+        self.symbol_item = SymbolItem(prototype=prototype, device_pin=self.device_pin, angle=angle)
+
+        # Add the placed symbol to the Symbols list in the specified layer of the tablet for later rendering
+        self.layer.Symbols.append(self.symbol_item)
+
+    @classmethod
+    def prototype(cls, drawing_type: str, presentation: 'Presentation', name: str) -> SymbolPrototype:
+        """
+        Returns the prototype of a symbol, compiling it the first time the symbol is placed in the Presentation
 
+        :param drawing_type: Drawing Type defining the Symbol
+        :param presentation: Presentation styling the Symbol
+        :param name: Symbol name
+        :return: The symbol's prototype
+        """
+        if cls.prototype_generation != StyleDB.generation:
+            # The pens and brushes may have changed
+            cls.prototypes = {}
+            cls.prototype_generation = StyleDB.generation
+        prototype = cls.prototypes.get((drawing_type, presentation, name))
+        if prototype is None:
+            prototype = cls.compile(key=(drawing_type, presentation.Name, name), presentation=presentation)
+            cls.prototypes[(drawing_type, presentation, name)] = prototype
+        return prototype
+
+    @classmethod
+    def compile(cls, key: Tuple[str, str, str], presentation: 'Presentation') -> SymbolPrototype:
+        """
+        Builds the path, pen and brush of each component of a symbol
+
+        :param key: Drawing Type, Presentation and symbol name
+        :param presentation: Presentation styling the Symbol
+        :return: The symbol's prototype
+        """
+        drawing_type, _, name = key
         try:
-            symbol_def = self.symbol_defs[self.layer.Drawing_type][name]
+            symbol_def = cls.symbol_defs[drawing_type][name]
         except KeyError:
-            self.logger.error(f"No symbol named [{name}] defined for drawing type [{self.layer.Drawing_type}]")
+            _logger.error(f"No symbol named [{name}] defined for drawing type [{drawing_type}]")
             raise BadConfigData
 
-        self.component_methods: Dict[str, Callable[[dict], None]] = {
-            'polygon': self.add_polygon,
-            'polyline': self.add_polyline,
-            'circle': self.add_circle,
+        component_paths: Dict[str, Callable] = {
+            'polygon': cls.polygon_path,
+            'polyline': cls.polyline_path,
+            'circle': cls.circle_path,
         }
-
-        # Convert pin to device coordinates
-        self.device_pin = layer.Tablet.to_dc(pin)
-
-        # Create item for each component shape element, position it on the tablet, and add it to a Qt
-        # symbol item group for any transforms to be applied to the entire symbol
+        components = []
         for component_name, cdef in symbol_def.items():
             component_type = list(cdef.keys())[0]
             try:
-                method = self.component_methods[component_type]
+                component_path = component_paths[component_type]
             except KeyError:
-                self.logger.error(f"Component type {component_type} for symbol {name} not supported")
+                _logger.error(f"Component type {component_type} for symbol {name} not supported")
                 raise BadConfigData
-            method(component_name, cdef[component_type])  # Call method apporpriate to the shape
-
-        # for shape in self.shape_elements:
-        #     for sname, method in self.shape_methods.items():
-        #         if shape.get(sname):
-        #             method(shape)  # Call method apporpriate to the shape
-
-        # Create the rotation transform and apply it to the group
-        self.symbol_item.setTransformOriginPoint(self.device_pin.x, self.device_pin.y)
-        self.symbol_item.setRotation(angle)
-
-        # Add it the transformed group to the Symbols list in the specified layer of the tablet
-        # for later rendering
-        self.layer.Symbols.append(self.symbol_item)
-
+            try:
+                component_style = presentation.Symbol_presentation[name][component_name]
+            except KeyError:
+                _logger.error(f"No style defined for component [{component_name}] in symbol [{name}]")
+                raise BadConfigData
+            # A polyline is never filled
+            brush = None if component_type == 'polyline' else CrayonBox.brush(component_style['fill'])
+            components.append(SymbolComponent(path=component_path(cdef[component_type]),
+                                              pen=CrayonBox.pen(component_style['line style']), brush=brush))
+        _logger.info(f"Compiled symbol [{name}] for presentation [{key[1]}]")
+        return SymbolPrototype(key=key, components=components, size=cls.size(drawing_type=drawing_type, name=name))
 
     @classmethod
     def load_symbol_defs(cls):
         """
-        Load all symbol definitions from the symbols.yaml file
+        Index the symbol definitions in the symbols.yaml file. The definitions for a Drawing Type
+        are parsed when a Symbol of that Drawing Type is first drawn. Once indexed, this is a stat of the file
+        to check that it hasn't changed, so it is done as each Tablet or MeasureContext is built rather than
+        on every query.
         """
-        raw_config_data = Config(app_name=TabletConfig.app_name, lib_config_dir=TabletConfig.config_path,
-                                 fspec={'symbols': None})
-        cls.symbol_defs = raw_config_data.loaded_data['symbols']
+        symbol_defs = ConfigCache.load_sections('symbols')
+        if symbol_defs is not cls.symbol_defs:
+            # Compiled from the old definitions
+            cls.prototypes = {}
+            cls.sizes = {}
+            cls.extents = {}
+            cls.extent_drawing_types = set()
+        cls.symbol_defs = symbol_defs
 
-    def add_circle(self, component_name: str, shape_def):
+    @classmethod
+    def size(cls, drawing_type: str, name: str) -> Rect_Size:
         """
-        Adds a circle shape element to the symbol item group
+        Returns the unrotated size of a Symbol computed from its definition, the same as the width and height
+        of a placed Symbol, but without creating any Qt items
 
-        :param component_name:
-        :param shape_def: The shape definition obtained from the symbol yaml file for this circle
+        :param drawing_type: Drawing Type defining the Symbol
+        :param name: Symbol name
+        :return: Size of the Symbol's bounding box
         """
-        # Translate center in symbol bounding box relative to the pin
-        # We just add the center position to the pin position to translate the circle
-        center_tablet = Position(self.pin[0]+shape_def['center'][0], self.pin[1]+shape_def['center'][1])
-
-        # Convert center tablet to device coordinates
-        center_dc = self.layer.Tablet.to_dc(center_tablet)
-        radius = shape_def['radius']
-        diameter = radius * 2
-
-        # Update dimensions of the bounding box if either dimension is larger
-        self.width = max(self.width, diameter)
-        self.height = max(self.height, diameter)
-
-        # Create Qt circle item
-        # We subtract the radius since Qt wants the top left corner for positioning
-        circle_item = QGraphicsEllipseItem(QRectF(center_dc.x-radius, center_dc.y-radius, diameter, diameter))
-
+        size = cls.sizes.get((drawing_type, name))
+        if size is not None:
+            return size
+        if cls.symbol_defs is None:
+            cls.load_symbol_defs()  # No Tablet need have loaded them
         try:
-            component_style = self.layer.Presentation.Symbol_presentation[self.name][component_name]
+            symbol_def = cls.symbol_defs[drawing_type][name]
         except KeyError:
-            self.logger.error(f"No style defined for component [{component_name}] in symbol [{self.name}]")
+            _logger.error(f"No symbol named [{name}] defined for drawing type [{drawing_type}]")
             raise BadConfigData
+        width = height = 0
+        for cdef in symbol_def.values():
+            component_type, shape_def = next(iter(cdef.items()))
+            if component_type == 'circle':
+                diameter = shape_def['radius'] * 2
+                width, height = max(width, diameter), max(height, diameter)
+            else:
+                width = max(width, max(v[0] for v in shape_def))
+                height = max(height, max(v[1] for v in shape_def))
+        size = Rect_Size(height=height, width=width)
+        cls.sizes[(drawing_type, name)] = size
+        return size
 
-        # Set pen and brush (border/fill) styles
-        CrayonBox.choose_crayons(
-            item=circle_item,
-            border_style=component_style['line style'],
-            fill=component_style['fill'])
+    @classmethod
+    def extent(cls, drawing_type: str, name: str, angle: float = 0) -> Extent:
+        """
+        Returns the bounding box of a Symbol placed at an angle, relative to its pin, computed from its
+        definition alone. No Qt items are created and nothing is added to any Layer.
 
-        # Add circle shape element to the symbol item group
-        self.symbol_item.addToGroup(circle_item)
+        The extents of every symbol of a Drawing Type at each right angle are computed together when the
+        first of them is asked for, and any other angle is computed once when first asked for.
 
-    def add_polyline(self, component_name: str, shape_def):
+        :param drawing_type: Drawing Type defining the Symbol
+        :param name: Symbol name
+        :param angle: Degrees clockwise, as the Symbol would be placed
+        :return: The lower left corner of the box relative to the pin and its size, in tablet coordinates
         """
-        Adds a path element (series of connected line segments) to the symbol item group
+        extent = cls.extents.get((drawing_type, name, angle))
+        if extent is None:
+            if cls.symbol_defs is None:
+                cls.load_symbol_defs()  # No Tablet need have loaded them
+            if drawing_type not in cls.extent_drawing_types:
+                cls.extent_drawing_types.add(drawing_type)
+                for symbol_name in cls.symbol_defs.get(drawing_type) or {}:
+                    for right_angle in (0, 90, 180, 270):
+                        cls.extents[(drawing_type, symbol_name, right_angle)] = cls.rotated_extent(
+                            drawing_type=drawing_type, name=symbol_name, angle=right_angle)
+            extent = cls.extents.get((drawing_type, name, angle))
+            if extent is None:
+                extent = cls.rotated_extent(drawing_type=drawing_type, name=name, angle=angle)
+                cls.extents[(drawing_type, name, angle)] = extent
+        return extent
 
-        :param shape_def: The shape definition obtained from the symbol yaml file for this path
+    @classmethod
+    def rotated_extent(cls, drawing_type: str, name: str, angle: float) -> Extent:
         """
-        # Translate each vertex relative to the pin
-        # We just add the pin to vertex coordinates
-        canvas_vertices = [Position(v[0] + self.pin[0], v[1] + self.pin[1]) for v in shape_def]
-
-        # Update dimensions of the bounding box if any vertex is outside the current dimensions
-        max_x = max(v[0] for v in shape_def)
-        max_y = max(v[1] for v in shape_def)
-        self.width = max(self.width, max_x)
-        self.height = max(self.height, max_y)
-
-        # Convert vertices to device coordinates
-        vertices_dc = [self.layer.Tablet.to_dc(v) for v in canvas_vertices]
+        Computes the bounding box of a Symbol's definition rotated about its pin
 
+        :param drawing_type: Drawing Type defining the Symbol
+        :param name: Symbol name
+        :param angle: Degrees clockwise
+        :return: The lower left corner of the box relative to the pin and its size, in tablet coordinates
+        """
         try:
-            component_style = self.layer.Presentation.Symbol_presentation[self.name][component_name]
+            symbol_def = cls.symbol_defs[drawing_type][name]
         except KeyError:
-            self.logger.error(f"No style defined for component [{component_name}] in symbol [{self.name}]")
+            _logger.error(f"No symbol named [{name}] defined for drawing type [{drawing_type}]")
             raise BadConfigData
+        radians = math.radians(angle)
+        cos, sin = math.cos(radians), math.sin(radians)
+        if angle % 90 == 0:
+            cos, sin = round(cos), round(sin)  # Right angles are rotated exactly
+        xs = []
+        ys = []
+        for cdef in symbol_def.values():
+            component_type, shape_def = next(iter(cdef.items()))
+            if component_type == 'circle':
+                points, radius = [shape_def['center']], shape_def['radius']
+            else:
+                points, radius = shape_def, 0
+            for x, y in points:
+                # Clockwise, with y running up
+                rx, ry = x * cos + y * sin, y * cos - x * sin
+                xs.extend((rx - radius, rx + radius))
+                ys.extend((ry - radius, ry + radius))
+        left, bottom = min(xs), min(ys)
+        return Extent(lower_left=Position(left, bottom),
+                      size=Rect_Size(height=max(ys) - bottom, width=max(xs) - left))
+
+    @staticmethod
+    def circle_path(shape_def) -> QPainterPath:
+        """
+        Returns the outline of a circle component
 
-        # Create a line item connecting gap between each pair of vertices
-        # from beginning of vertex list to the last vertex in the list
-        # and add the line item to the symbol item group
-        for v in range(len(vertices_dc) - 1):
-            start_point = vertices_dc[v]
-            end_point = vertices_dc[v + 1]
-
-            # Create a line item connecting the points
-            line = QGraphicsLineItem(QLineF(*start_point, *end_point))
-
-            # Set line style
-            CrayonBox.choose_crayons(
-                item=line,
-                border_style=component_style['line style'])
-
-            # Add line to the symbol item group
-            self.symbol_item.addToGroup(line)
-
-    def add_polygon(self, component_name: str, shape_def):
-        """
-        Adds a polygon component to the symbol
-
-        :param polyline:
-        :param component_name:
-        :param shape_def: The shape definition obtained from the symbol yaml file for this triangle
-        """
-        # Translate each vertex relative to the pin
-        # We just add the pin to vertex coordinates
-        canvas_vertices = [Position(v[0] + self.pin[0], v[1] + self.pin[1]) for v in shape_def]
-
-        # Update dimensions of the bounding box if any vertex is outside the current dimensions
-        max_x = max(v[0] for v in shape_def)
-        max_y = max(v[1] for v in shape_def)
-        self.width = max(self.width, max_x)
-        self.height = max(self.height, max_y)
-        #
-        # # Convert vertices to device coordinates
-        vertices_dc = [self.layer.Tablet.to_dc(v) for v in canvas_vertices]
-        #
-        # # Create a polygon item
-        pverts = [QPointF(*v) for v in vertices_dc]
-        polygon = QPolygonF(pverts)
-        poly_item = QGraphicsPolygonItem(polygon)
-        #
-        try:
-            component_style = self.layer.Presentation.Symbol_presentation[self.name][component_name]
-        except KeyError:
-            self.logger.error(f"No style defined for component [{component_name}] in symbol [{self.name}]")
-            raise BadConfigData
-        # # Set pen and brush (border/fill) styles
-        CrayonBox.choose_crayons(
-            item=poly_item,
-            border_style=component_style['line style'],
-            fill=component_style['fill'])
+        :param shape_def: The shape definition obtained from the symbol yaml file for this circle
+        :return: The circle, centered relative to the pin
+        """
+        # Device y runs down, where tablet y runs up
+        radius = shape_def['radius']
+        path = QPainterPath()
+        path.addEllipse(QPointF(shape_def['center'][0], -shape_def['center'][1]), radius, radius)
+        return path
 
-        # Add triangle to the symbol item group
-        self.symbol_item.addToGroup(poly_item)
+    @staticmethod
+    def polyline_path(shape_def) -> QPainterPath:
+        """
+        Returns a series of connected line segments
+
+        :param shape_def: The shape definition obtained from the symbol yaml file for this path
+        :return: Line segments from each vertex to the next, relative to the pin
+        """
+        path = QPainterPath(QPointF(shape_def[0][0], -shape_def[0][1]))
+        for v in shape_def[1:]:
+            path.lineTo(v[0], -v[1])
+        return path
+
+    @staticmethod
+    def polygon_path(shape_def) -> QPainterPath:
+        """
+        Returns the outline of a polygon component
+
+        :param shape_def: The shape definition obtained from the symbol yaml file for this polygon
+        :return: The closed polygon, relative to the pin
+        """
+        path = QPainterPath()
+        path.addPolygon(QPolygonF([QPointF(v[0], -v[1]) for v in shape_def]))
+        path.closeSubpath()
+        return path
 
     @classmethod
     def render(cls, layer: 'Layer'):
         """
-        Add each symbol item group to the Scene for display
+        Add each placed symbol to the Scene for display
 
         :param layer: Draw on this layer
         """
         for s in layer.Symbols:
-            # _logger.info(f"> Polygon at: [{p.vertices}]")
-
             # Display the item in the Qt scene
             layer.Scene.addItem(s)
 
@@ -4,26 +4,24 @@
 import logging
 from pathlib import Path
 from enum import Enum
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Tuple, Dict, Set
 
 if TYPE_CHECKING:
     from tabletqt.layer import Layer
     from tabletqt.presentation import Presentation
 
 # Qt
-from PyQt6.QtWidgets import QGraphicsTextItem
-from PyQt6.QtGui import QFont, QFontMetrics, QColor
-
-# Modelint
-from mi_config.config import Config
+from PyQt6.QtWidgets import QGraphicsTextItem, QGraphicsSimpleTextItem
+from PyQt6.QtGui import QColor
 
 # Tablet
 import tabletqt.element as element
 from tabletqt.geometry_types import Position, Rect_Size, HorizAlign
 from tabletqt.styledb import StyleDB
 from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.text_metrics import TextMetrics, FontKey, Qt_font_weight
 from tabletqt.exceptions import TabletBoundsExceeded
-from tabletqt.tablet_config import TabletConfig
+from tabletqt.config_cache import ConfigCache
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +35,6 @@ underlay_margin_v = 5
 underlay_offset_x = 2  # Lower left corner offsets from lower left origin of text item origin
 underlay_offset_y = 3
 
-Qt_font_weight = {'normal': QFont.Weight.Normal, 'bold': QFont.Weight.Bold}
-"""Maps an application style to a Qt specific font weight"""
-
 
 class TextBlockCorner(Enum):
     """ Text Block corners """
@@ -65,15 +60,15 @@ class TextElement:
     """
 
     stickers = None
+    plain_text_items = True  # Draw lines as plain text items rather than rich text QGraphicsTextItems
 
     @classmethod
     def load_stickers(cls):
         """
-        Load all predefined sticker text from the stickers.yaml file
+        Index all predefined sticker text in the stickers.yaml file. The stickers for a Drawing Type
+        are parsed when a sticker of that Drawing Type is first added.
         """
-        sticker_data = Config(app_name=TabletConfig.app_name, lib_config_dir=TabletConfig.config_path,
-                              fspec={'stickers': None})
-        cls.stickers = sticker_data.loaded_data['stickers']
+        cls.stickers = ConfigCache.load_sections('stickers')
 
     @classmethod
     def lower_left_pin(cls, presentation: 'Presentation', asset: str, text_block: List[str], pin: Position,
@@ -144,17 +139,23 @@ class TextElement:
         :return: Size of the text line ink area
         """
         style_name = presentation.Text_presentation[asset]  # Look up the text style for this asset
-        style = StyleDB.text_style[style_name['text style']]
-        font_name = StyleDB.typeface[style.typeface]
-
-        font = QFont(font_name, style.size)
-        font.setItalic(style.slant == 'italic')
-        font.setBold(style.weight == 'bold')
+        font_key = TextMetrics.font_key(style_name['text style'])
+        return TextMetrics.line_size(font_key, text_line)
 
-        font_metrics = QFontMetrics(font)
-        bound_rect = font_metrics.boundingRect(text_line)
+    @classmethod
+    def measure_many(cls, presentation: 'Presentation', asset: str, lines: List[str]) -> List[Rect_Size]:
+        """
+        Returns the size of each of many lines of text when rendered with the asset's text style.
+        Much faster than calling line_size for each line when sizing a large number of compartments.
 
-        return Rect_Size(height=bound_rect.height(), width=bound_rect.width())
+        :param presentation:  The Presentation
+        :param asset: Determines text display style
+        :param lines: Lines of text
+        :return: Size of each text line ink area, in the same order
+        """
+        style_name = presentation.Text_presentation[asset]  # Look up the text style for this asset
+        font_key = TextMetrics.font_key(style_name['text style'])
+        return TextMetrics.measure_many(font_key, lines)
 
     @classmethod
     def text_block_size(cls, presentation: 'Presentation', asset: str, text_block: List[str]) -> Rect_Size:
@@ -175,13 +176,50 @@ class TextElement:
         num_lines = len(text_block)
         assert num_lines > 0, "Text block size requested for empty text block"
         # The text block is the width of its widest ink render extent
-        widths = [cls.line_size(presentation=presentation, asset=asset, text_line=line).width for line in text_block]
-        widest_line = text_block[widths.index(max(widths))]
-        block_width = cls.line_size(presentation=presentation, asset=asset, text_line=widest_line).width
+        font_key = TextMetrics.font_key(style_name['text style'])
+        block_width = max(TextMetrics.line_size(font_key, line).width for line in text_block)
         block_height = num_lines * spacing - inter_line_spacing  # Deduct that one unneeded line of spacing on the top
 
         return Rect_Size(width=block_width, height=block_height)
 
+    @classmethod
+    def text_block_sizes(cls, presentation: 'Presentation', blocks: List[Tuple[str, List[str]]]) -> List[Rect_Size]:
+        """
+        Determines the dimensions of many text blocks at once, as a layout engine needs before it
+        draws anything. Each asset's text style is resolved once and each distinct line of text is
+        measured once per font, no matter how many blocks it appears in.
+
+        :param presentation: The Presentation
+        :param blocks: An (asset name, list of text lines) pair for each text block
+        :return: The display size of each text block, in the same order
+        """
+        # Resolve the text style of each asset and collect the distinct lines to measure in each font
+        styles = {}
+        font_lines: Dict[FontKey, Set[str]] = {}
+        for asset, text_block in blocks:
+            assert len(text_block) > 0, "Text block size requested for empty text block"
+            if asset not in styles:
+                style_name = presentation.Text_presentation[asset]['text style']
+                styles[asset] = (StyleDB.text_style[style_name], TextMetrics.font_key(style_name))
+            font_lines.setdefault(styles[asset][1], set()).update(text_block)
+
+        widths: Dict[FontKey, Dict[str, float]] = {}
+        for font_key, lines in font_lines.items():
+            lines = list(lines)
+            sizes = TextMetrics.measure_many(font_key, lines)
+            widths[font_key] = {line: size.width for line, size in zip(lines, sizes)}
+
+        block_sizes = []
+        for asset, text_block in blocks:
+            style, font_key = styles[asset]
+            font_height = style.size
+            spacing = font_height * style.spacing
+            inter_line_spacing = spacing - font_height  # Space between two lines
+            line_widths = widths[font_key]
+            block_sizes.append(Rect_Size(width=max(line_widths[line] for line in text_block),
+                                         height=len(text_block) * spacing - inter_line_spacing))
+        return block_sizes
+
     @classmethod
     def add_underlay(cls, layer: 'Layer', lower_left: Position, size: Rect_Size):
         """
@@ -318,17 +356,20 @@ class TextElement:
         :param layer: Draw on this Layer
         """
         for t in layer.Text:
-            t_item = QGraphicsTextItem(t.text)
             style = StyleDB.text_style[t.style['text style']]
-            text_color_name = StyleDB.text_style[t.style['text style']].color
-            text_rgb_color_value = StyleDB.color[text_color_name]
-            t_item.setDefaultTextColor(QColor(*text_rgb_color_value))
-            font = QFont(StyleDB.typeface[style.typeface], style.size)
-            font.setWeight(Qt_font_weight[style.weight])
-            if style.slant == 'italic':
-                font.setItalic(True)
-            t_item.setFont(font)
-            logger.info(f'Font [{style}]')
-            t_item.setPos(t.upper_left.x, t.upper_left.y)
+            text_color = QColor(*StyleDB.color[style.color])
+            font = TextMetrics.font(TextMetrics.font_key(t.style['text style']))
+            if cls.plain_text_items:
+                # Our lines are always single style plain text, so we don't need a text document per line
+                # A QGraphicsTextItem draws its text inside the document margin, so we skip over that
+                t_item = QGraphicsSimpleTextItem(t.text)
+                t_item.setBrush(text_color)
+                t_item.setFont(font)
+                t_item.setPos(t.upper_left.x + tbox_xoffset, t.upper_left.y + tbox_yoffset)
+            else:
+                t_item = QGraphicsTextItem(t.text)
+                t_item.setDefaultTextColor(text_color)
+                t_item.setFont(font)
+                t_item.setPos(t.upper_left.x, t.upper_left.y)
             logger.info(f'> Text line [{t.text}] at {t.upper_left}')
             layer.Scene.addItem(t_item)
@@ -0,0 +1,175 @@
+""" text_metrics.py -- Font and text measurement cache """
+
+# System
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Dict, List, Optional, TYPE_CHECKING
+
+# Qt
+from PyQt6.QtGui import QFont, QFontMetrics
+
+# Tablet
+from tabletqt.geometry_types import Rect_Size
+from tabletqt.styledb import StyleDB
+
+if TYPE_CHECKING:
+    from tabletqt.graphics.metrics_store import MetricsStore
+
+_logger = logging.getLogger(__name__)
+
+line_cache_size = 16384  # Most recently measured lines of text to remember
+
+Qt_font_weight = {'normal': QFont.Weight.Normal, 'bold': QFont.Weight.Bold}
+"""Maps an application style to a Qt specific font weight"""
+
+
+class FontKey(NamedTuple):
+    """A text style resolved down to the properties that determine its font"""
+    family: str
+    size: int
+    slant: str
+    weight: str
+
+
+class TextMetrics:
+    """
+    Measuring text is by far the most frequent request made of a Tablet. A layout engine like Flatland
+    measures the same class names, attributes and stickers over and over while it searches for a good layout.
+
+    So each text style is resolved once to the properties of its font (a FontKey) and each font and its
+    metrics are created once. On top of that, we remember the size of the most recently measured lines of
+    text for each font.
+
+    Since the FontKey includes everything that affects the size of a line, a measured size never goes stale.
+    Only the mapping from text style names to FontKeys must be rebuilt if the StyleDB is reloaded.
+
+    Optionally, measurements can also be saved in a persistent MetricsStore shared by all processes.
+    """
+    font_keys: Dict[str, FontKey] = {}  # Resolved FontKey for each text style name
+    fonts: Dict[FontKey, QFont] = {}
+    font_metrics: Dict[FontKey, QFontMetrics] = {}
+    generation: Optional[int] = None  # StyleDB generation the font keys were resolved from
+    store: Optional['MetricsStore'] = None  # Persistent measurements, if enabled
+
+    @classmethod
+    def font_key(cls, text_style: str) -> FontKey:
+        """
+        Resolves a text style to the properties of its font
+
+        :param text_style: Name of a text style in the StyleDB
+        :return: The font properties
+        """
+        if cls.generation != StyleDB.generation:
+            cls.font_keys = {}
+            cls.generation = StyleDB.generation
+        key = cls.font_keys.get(text_style)
+        if key is None:
+            style = StyleDB.text_style[text_style]
+            key = FontKey(family=StyleDB.typeface[style.typeface], size=style.size,
+                          slant=style.slant, weight=style.weight)
+            cls.font_keys[text_style] = key
+        return key
+
+    @classmethod
+    def font(cls, key: FontKey) -> QFont:
+        """
+        Returns the Qt font for a FontKey, creating it if necessary
+
+        :param key: Font properties
+        :return: Qt font
+        """
+        font = cls.fonts.get(key)
+        if font is None:
+            font = QFont(key.family, key.size)
+            font.setWeight(Qt_font_weight[key.weight])
+            font.setItalic(key.slant == 'italic')
+            cls.fonts[key] = font
+            _logger.info(f"Font [{key}]")
+        return font
+
+    @classmethod
+    def metrics(cls, key: FontKey) -> QFontMetrics:
+        """
+        Returns the Qt font metrics for a FontKey, creating them if necessary
+
+        :param key: Font properties
+        :return: Qt font metrics
+        """
+        fm = cls.font_metrics.get(key)
+        if fm is None:
+            fm = QFontMetrics(cls.font(key))
+            cls.font_metrics[key] = fm
+        return fm
+
+    @classmethod
+    def line_size(cls, key: FontKey, text_line: str) -> Rect_Size:
+        """
+        Returns the size of a line of text rendered in a font
+
+        :param key: Font properties
+        :param text_line: Line of text
+        :return: Size of the text line ink area
+        """
+        return _measure_line(key, text_line)
+
+    @classmethod
+    def measure_many(cls, key: FontKey, lines: List[str]) -> List[Rect_Size]:
+        """
+        Returns the size of each of many lines of text rendered in a font. If NumPy is installed they are
+        computed together from the font's glyph table, otherwise one at a time.
+
+        :param key: Font properties
+        :param lines: Lines of text
+        :return: Size of each text line ink area
+        """
+        from tabletqt.graphics.glyph_table import GlyphTable, np
+        if np is None:
+            return [_measure_line(key, line) for line in lines]
+        return GlyphTable.for_font(key).measure(lines)
+
+    @classmethod
+    def use_store(cls, path: Optional[Path] = None):
+        """
+        Consult a persistent MetricsStore before asking Qt to measure any text and save all new
+        measurements there
+
+        :param path: Database path, defaults to the user configuration directory
+        """
+        from tabletqt.graphics.metrics_store import open_store
+        if cls.store:
+            cls.store.close()
+        cls.store = open_store(path)
+        _measure_line.cache_clear()  # Anything measured so far hasn't been saved
+
+    @classmethod
+    def clear(cls):
+        """
+        Discard all fonts and measurements
+        """
+        cls.font_keys = {}
+        cls.fonts = {}
+        cls.font_metrics = {}
+        cls.generation = None
+        _measure_line.cache_clear()
+
+
+@lru_cache(maxsize=line_cache_size)
+def _measure_line(key: FontKey, text_line: str) -> Rect_Size:
+    """
+    Ask Qt for the size of a line of text, remembering the most recent answers
+
+    :param key: Font properties
+    :param text_line: Line of text
+    :return: Size of the text line ink area
+    """
+    store = TextMetrics.store
+    if store:
+        size = store.get(key, text_line)
+        if size:
+            return size
+    bound_rect = TextMetrics.metrics(key).boundingRect(text_line)
+    size = Rect_Size(height=bound_rect.height(), width=bound_rect.width())
+    if store:
+        store.put(key, text_line, size)
+    return size
@@ -6,19 +6,20 @@ import logging
 from typing import TYPE_CHECKING, List
 
 # Qt
-from PyQt6.QtWidgets import (QGraphicsRectItem, QGraphicsLineItem, QGraphicsPolygonItem,
-                             QGraphicsItemGroup)
+from PyQt6.QtWidgets import QGraphicsRectItem, QGraphicsLineItem, QGraphicsPolygonItem
 
 # Tablet
 import tabletqt.element as element
-from tabletqt.presentation import Presentation
+import tabletqt.element_store as element_store
+from tabletqt.element_store import ElementColumns
+from tabletqt.presentation import PresentationRegistry
 from tabletqt.graphics.circle_se import CircleSE
 from tabletqt.graphics.polygon_se import PolygonSE
 from tabletqt.graphics.line_segment import LineSegment
 from tabletqt.graphics.rectangle_se import RectangleSE
 from tabletqt.graphics.text_element import TextElement
 from tabletqt.graphics.image import ImageDE
-from tabletqt.graphics.symbol import Symbol
+from tabletqt.graphics.symbol import Symbol, SymbolItem
 from tabletqt.graphics.diagnostic_marker import DiagnosticMarker
 
 
@@ -54,30 +55,26 @@ class Layer:
         self.logger.info(f"creating layer: [{name}] ")
         self.Name = name
         self.Tablet = tablet
-        self.Scene = tablet.View.scene  # This is what we actually draw on
+        self.Scene = tablet.Scene  # This is what we actually draw on
         self.Drawing_type = drawing_type
 
         # Stuff we will draw on the Layer
-        self.Line_segments: List[element.Line_Segment] = []
-        self.Symbols: List[QGraphicsItemGroup] = []
-        self.Circles: List[element.Circle] = []
+        # Shapes are kept by column, they can number in the hundreds of thousands
+        self.Line_segments: ElementColumns = element_store.line_segments()
+        self.Symbols: List[SymbolItem] = []
+        self.Circles: ElementColumns = element_store.circles()
         self.Polygons: List[QGraphicsPolygonItem] = []
-        self.Rectangles: List[element.Rectangle] = []
+        self.Rectangles: ElementColumns = element_store.rectangles()
         self.RawRectangles: List[QGraphicsRectItem] = []
         self.RawLines: List[QGraphicsLineItem] = []
-        self.TextUnderlayRects: List[element.FillRect] = []
+        self.TextUnderlayRects: ElementColumns = element_store.fill_rects()
         self.Text: List[element.Text_line] = []
         self.Images: List[element.Image] = []
 
-        # Load this Layer's presentation assets if they haven't been already
-        # Unique ID (see Tablet Subsystem class diagram) of a Presentation is both
-        # its name and its View Type name.  So we combine them to form the index
-        pres_index = ':'.join([self.Drawing_type, presentation])
-        self.Presentation = self.Tablet.Presentations.get(pres_index)
-        if not self.Presentation:
-            # It hasn't been loaded from the Flatland DB yet
-            self.Presentation = Presentation(name=presentation, drawing_type=self.Drawing_type)
-            self.Tablet.Presentations[pres_index] = self.Presentation
+        # Get this Layer's presentation assets from the process wide registry, loading them
+        # if no Layer has used this Presentation yet
+        self.Presentation = PresentationRegistry.get(drawing_type=self.Drawing_type, presentation=presentation)
+        self.Tablet.Presentations[':'.join([self.Drawing_type, presentation])] = self.Presentation
 
 
     def render(self):
@@ -0,0 +1,107 @@
+""" measure_context.py -- Measure text and symbols without a Tablet """
+
+# System
+import logging
+from typing import List, Tuple
+
+# Tablet
+from tabletqt.geometry_types import Rect_Size, Extent
+from tabletqt.styledb import StyleDB
+from tabletqt.config_bundle import ConfigBundle
+from tabletqt.qt_app import QtApp
+from tabletqt.presentation import PresentationRegistry
+from tabletqt.graphics.symbol import Symbol
+from tabletqt.graphics.text_element import TextElement
+
+_logger = logging.getLogger(__name__)
+
+
+class MeasureContext:
+    """
+    A layout engine usually tries out many candidate layouts before it draws one, and all it needs to
+    know along the way is how big some text or a symbol will be. A MeasureContext answers those questions
+    for a Drawing Type and Presentation without creating a Tablet, Layer, scene, window or output file.
+
+    All measurements go through the same caches a Tablet uses, so anything measured here is remembered
+    when the chosen layout is finally drawn. Qt is only needed for its fonts, so any existing Qt application
+    is used. Otherwise the usual one is created, just as for a Tablet with a window, since measuring comes
+    before drawing and mustn't keep a later Tablet from showing its window. Where there is no window system,
+    create a headless Tablet first or set QT_QPA_PLATFORM=offscreen.
+
+        - Drawing_type -- Name of the Drawing Type defining the assets to be measured
+        - Presentation -- The shared Presentation that styles those assets
+    """
+
+    def __init__(self, drawing_type: str, presentation: str):
+        """
+        Constructs a measurement context
+
+        :param drawing_type: Name of a Drawing Type, such as 'Starr class diagram'
+        :param presentation: Name of one of its Presentations, such as 'default'
+        """
+        QtApp.instance(headless=None)  # Fonts require a Qt application, the platform is left to the Tablets
+        ConfigBundle.load()
+        StyleDB.load_config_files()
+        Symbol.load_symbol_defs()
+
+        self.Drawing_type = drawing_type
+        self.Presentation = PresentationRegistry.get(drawing_type=drawing_type, presentation=presentation)
+        _logger.info(f"Measure context: [{drawing_type}:{presentation}]")
+
+    def line_size(self, asset: str, text_line: str) -> Rect_Size:
+        """
+        Returns the size of a line of text when rendered with the asset's text style
+
+        :param asset: Determines text display style
+        :param text_line: Line of text
+        :return: Size of the text line ink area
+        """
+        return TextElement.line_size(presentation=self.Presentation, asset=asset, text_line=text_line)
+
+    def measure_many(self, asset: str, lines: List[str]) -> List[Rect_Size]:
+        """
+        Returns the size of each of many lines of text when rendered with the asset's text style
+
+        :param asset: Determines text display style
+        :param lines: Lines of text
+        :return: Size of each text line ink area, in the same order
+        """
+        return TextElement.measure_many(presentation=self.Presentation, asset=asset, lines=lines)
+
+    def text_block_size(self, asset: str, text_block: List[str]) -> Rect_Size:
+        """
+        Returns the size of a block of text when rendered with the asset's text style
+
+        :param asset: Name of the text asset to get display style properties
+        :param text_block: A list of text lines to be displayed
+        :return: The display size of the text block
+        """
+        return TextElement.text_block_size(presentation=self.Presentation, asset=asset, text_block=text_block)
+
+    def text_block_sizes(self, blocks: List[Tuple[str, List[str]]]) -> List[Rect_Size]:
+        """
+        Returns the size of each of many text blocks
+
+        :param blocks: An (asset name, list of text lines) pair for each text block
+        :return: The display size of each text block, in the same order
+        """
+        return TextElement.text_block_sizes(presentation=self.Presentation, blocks=blocks)
+
+    def symbol_size(self, name: str) -> Rect_Size:
+        """
+        Returns the unrotated size of a Symbol
+
+        :param name: Symbol name, such as '1 mult'
+        :return: Size of the Symbol's bounding box
+        """
+        return Symbol.size(drawing_type=self.Drawing_type, name=name)
+
+    def symbol_extent(self, name: str, angle: float = 0) -> Extent:
+        """
+        Returns the bounding box of a Symbol placed at an angle
+
+        :param name: Symbol name, such as '1 mult'
+        :param angle: Degrees clockwise
+        :return: The lower left corner of the box relative to the pin and its size
+        """
+        return Symbol.extent(drawing_type=self.Drawing_type, name=name, angle=angle)
@@ -3,18 +3,33 @@ presentation.py – Presentation class in View domain
 """
 # System
 import logging
+import threading
 from collections import namedtuple
-from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict
 
-# Modelint
-from mi_config.config import Config
+# Tablet
+from tabletqt.config_cache import ConfigCache
 
 CornerSpec = namedtuple('Corner_Spec', 'radius top bottom')
-config_dir = Path(__file__).parent / "configuration"
 
 _logger = logging.getLogger(__name__)
 
 
+def _freeze(data: Any) -> Any:
+    """
+    Returns a read only copy of some loaded yaml data so that it can be safely shared
+
+    :param data: Loaded yaml data (nested dicts and lists)
+    :return: The same data as nested read only mappings and tuples
+    """
+    if isinstance(data, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze(v) for v in data)
+    return data
+
+
 class Presentation:
     """
    A set of compatible visual styles including fonts, colors, border widths and so forth as appropriate to a
@@ -22,6 +37,9 @@ class Presentation:
    might be drawn using certain fonts for state stickers and possibly different colors for transient and
    non-transient states. Alternatively, only black and white might be used with purple for a certain kind of
    connector in a diagnostic Presentation.
+
+   Once loaded, a Presentation is immutable so that a single instance can be shared by every Layer
+   of every Tablet in the process (see the PresentationRegistry).
    """
 
     def __init__(self, name: str, drawing_type: str):
@@ -41,6 +59,12 @@ class Presentation:
         # Load Asset Presentations for all Assets in this Presentation
         self.logger.info(f"using presentation: [{self.Name}]")
         self.load_drawing_type()
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"Presentation [{self.Drawing_type}:{self.Name}] is immutable")
+        super().__setattr__(name, value)
 
     def load_drawing_type(self):
         """
@@ -48,8 +72,7 @@ class Presentation:
         """
         _logger.info(f"Loading presentations\n---")
 
-        c = Config(app_name='mi_tablet', lib_config_dir=config_dir, fspec={'drawing_types':None})
-        dtype_data = c.loaded_data['drawing_types']
+        dtype_data = ConfigCache.load_sections('drawing_types')  # Only my drawing type is parsed
         try:
             my_data = dtype_data[self.Drawing_type][self.Name]
         except KeyError:
@@ -57,9 +80,64 @@ class Presentation:
             raise
 
         # Load symbol presentations
+        my_data = _freeze(my_data)
         self.Symbol_presentation = my_data.get('symbol')
         self.Text_presentation = my_data.get('text')
-        self.Underlays = {k for k,v in self.Text_presentation.items() if v.get('underlay')}
+        self.Underlays = frozenset(k for k,v in self.Text_presentation.items() if v.get('underlay'))
         if my_data.get('shape'):
             self.Rectangle_presentation = my_data['shape'].get('rectangle')
-            self.Line_presentation = my_data['shape'].get('line')
\ No newline at end of file
+            self.Line_presentation = my_data['shape'].get('line')
+
+
+class PresentationRegistry:
+    """
+    Every Presentation in use by any Tablet in this process, keyed by '<drawing type>:<presentation>'
+
+    A Presentation is loaded the first time any Layer asks for it. After that, every Layer on every Tablet
+    shares the same immutable instance, so creating a Layer costs a dict lookup.
+
+    Each request checks, with a stat of the file, that the drawing types configuration is unchanged. Should
+    the ConfigCache have reloaded it, all registered Presentations are discarded and loaded again on demand.
+    """
+    _presentations: Dict[str, Presentation] = {}
+    _dtype_data = None  # Drawing types data the registered Presentations were loaded from
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, drawing_type: str, presentation: str) -> Presentation:
+        """
+        Returns the named Presentation of a Drawing Type, loading it if necessary
+
+        :param drawing_type: Name of the Drawing Type defining the Presentation
+        :param presentation: Name of the Presentation
+        :return: The shared Presentation
+        """
+        # Unique ID (see Tablet Subsystem class diagram) of a Presentation is both
+        # its name and its View Type name.  So we combine them to form the index
+        pres_index = ':'.join([drawing_type, presentation])
+        # A stat of drawing_types.yaml when nothing has changed, so an edited file is seen by the next Layer
+        dtype_data = ConfigCache.load_sections('drawing_types')
+        if dtype_data is cls._dtype_data:
+            p = cls._presentations.get(pres_index)
+            if p:
+                return p
+
+        with cls._lock:
+            if dtype_data is not cls._dtype_data:
+                # The drawing types have been (re)loaded since the registered Presentations were
+                cls._presentations.clear()
+                cls._dtype_data = dtype_data
+            p = cls._presentations.get(pres_index)
+            if not p:
+                p = Presentation(name=presentation, drawing_type=drawing_type)
+                cls._presentations[pres_index] = p
+            return p
+
+    @classmethod
+    def clear(cls):
+        """
+        Discard all registered Presentations
+        """
+        with cls._lock:
+            cls._presentations.clear()
+            cls._dtype_data = None
\ No newline at end of file
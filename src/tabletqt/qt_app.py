@@ -0,0 +1,47 @@
+""" qt_app.py -- The Qt application shared by all Tablets """
+
+# System
+import logging
+from typing import Optional
+
+# Qt
+from PyQt6.QtWidgets import QApplication
+
+_logger = logging.getLogger(__name__)
+
+
+class QtApp:
+    """
+    Qt requires a single application instance to exist before any fonts, scenes or widgets are created.
+    We create it when the first Tablet needs it and then keep using the same one, so it is not
+    garbage collected on repeated instantiation of Tablet.
+
+    A headless application uses Qt's offscreen platform so that no window system is required.
+    The platform can only be chosen when the application is created, so the first Tablet decides.
+    Anything that only needs Qt for its fonts, such as a MeasureContext, leaves the choice to the Tablets.
+    """
+    app = None
+    headless = False
+    made_offscreen = False  # Created on the offscreen platform for a headless Tablet, not by the environment
+
+    @classmethod
+    def instance(cls, headless: Optional[bool] = None) -> QApplication:
+        """
+        Returns the Qt application, creating it if necessary
+
+        :param headless: True to create the application on the offscreen platform, False if a window is needed,
+        None if any platform will do, in which case an application is created on the window system
+        :return: The Qt application
+        """
+        if cls.app is None:
+            cls.app = QApplication.instance()  # The client application may have created one already
+            if cls.app is None:
+                args = ['tablet', '-platform', 'offscreen'] if headless else ['tablet']
+                cls.app = QApplication(args)
+                cls.made_offscreen = bool(headless)
+            cls.headless = cls.app.platformName() == 'offscreen'
+        elif headless and not cls.headless:
+            _logger.info("Qt application already created on a window system platform")
+        elif headless is False and cls.made_offscreen:
+            _logger.warning("Qt application already created headless by an earlier Tablet, no window can be shown")
+        return cls.app
@@ -3,21 +3,83 @@
 # System
 import logging
 from PyQt6.QtWidgets import QGraphicsView, QVBoxLayout, QGraphicsScene, QWidget
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor, QPainter, QPageSize, QPageLayout
-from PyQt6.QtPrintSupport import QPrinter
-from pypdf import PdfWriter, PdfReader
+from PyQt6.QtCore import Qt, QRectF, QSizeF, QMarginsF
+from PyQt6.QtGui import QColor, QPainter, QPageSize, QPageLayout, QPdfWriter
+from typing import Optional
+
+# Tablet
+from tabletqt.export.target import ExportTarget, Output
 
 _logger = logging.getLogger(__name__)
 
-# A generated PDF leave extra space on the bottom or right side depending
-# on the tablet dimensions. These are the crop values that seem to work
-# determined experiementally for the height to width ratio for each
-# standard sheet size and orientation.
-# Thus, all keys less than zero are for landscape orientation
-# Each corresponding value is the amount to crop the pdf on the bottom
-# for landscape and off the right side for portrait
-pdf_crop = { 0.65: 196, 0.71: 101, 0.75: 32, 0.77: 0, 1.29: 635, 1.33: 665, 1.55: 789}
+pad = 10  # Padding added to the SceneView widget around the scene
+pdf_resolution = 72  # One PDF point per tablet unit
+
+
+def create_scene(size, background, indexed: bool = True) -> QGraphicsScene:
+    """
+    Create a scene to draw on
+
+    :param size: Tablet size
+    :param background: Background RGB color, if any
+    :param indexed: Maintain a spatial index of the scene items. This only speeds up hit testing and visible
+    item lookup for an interactive view. A scene that is only ever exported draws every item anyway.
+    :return: The new scene
+    """
+    scene = QGraphicsScene()
+    scene.setSceneRect(0, 0, size.width, size.height)
+    if not indexed:
+        scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+    if background:
+        _logger.info(f"Setting scene background to RGB: {background}")
+        scene.setBackgroundBrush(QColor(*background))
+    return scene
+
+
+def page_layout(size) -> QPageLayout:
+    """
+    A margin free page layout exactly the size of a tablet
+
+    :param size: Tablet size in points
+    :return: The page layout
+    """
+    page_size = QPageSize(QSizeF(size.width, size.height), QPageSize.Unit.Point, "Tablet",
+                          QPageSize.SizeMatchPolicy.ExactMatch)
+    return QPageLayout(page_size, QPageLayout.Orientation.Portrait, QMarginsF(0, 0, 0, 0))
+
+
+def pdf_writer(target: ExportTarget, size) -> QPdfWriter:
+    """
+    Create a PDF writer with a single page that is exactly the size of the tablet, so the scene can
+    be drawn on it one point per tablet unit with nothing to crop afterward
+
+    :param target: Where the PDF is written
+    :param size: Tablet size in points
+    :return: The PDF writer
+    """
+    writer = QPdfWriter(target.device())
+    writer.setPageLayout(page_layout(size))
+    writer.setResolution(pdf_resolution)
+    return writer
+
+
+def save_scene_as_pdf(scene: QGraphicsScene, size, output: Output) -> Optional[bytes]:
+    """
+    Save a scene as a PDF
+
+    :param scene: The scene to save
+    :param size: Tablet size
+    :param output: Path of the PDF file, a writable binary stream, or None
+    :return: The PDF content if no output was given
+    """
+    target = ExportTarget(output)
+    writer = pdf_writer(target, size)
+    painter = QPainter(writer)
+    tablet_rect = QRectF(0, 0, size.width, size.height)
+    scene.render(painter, tablet_rect, tablet_rect)
+    painter.end()
+    return target.finish()
+
 
 class SceneView(QGraphicsView):
     def __init__(self, size, background):
@@ -25,13 +87,9 @@ class SceneView(QGraphicsView):
 
         # Create a QGraphicsScene
         self.tablet_size = size
-        self.scene = QGraphicsScene()
+        self.scene = create_scene(size, background)
         self.setSceneRect(0, 0, size.width, size.height)
-        pad = 10
         self.setFixedSize(size.width + pad, size.height + pad)
-        if background:
-            _logger.info(f"Setting scene background to RGB: {background}")
-            self.scene.setBackgroundBrush(QColor(*background))
 
         # Set the scene to the view
         self.setScene(self.scene)
@@ -44,61 +102,9 @@ class SceneView(QGraphicsView):
         # self.setRenderHint(QPainter.RenderHint.Antialiasing)
         # self.setRenderHint(QPainter.RenderHint.TextAntialiasing)
 
-    def save_as_pdf(self, file_path):
-        # Create a QPrinter object and set the output format to PDF
-        printer = QPrinter(QPrinter.PrinterMode.PrinterResolution)
-        printer.setOutputFormat(QPrinter.OutputFormat.PdfFormat)
-        # printer.setPageSize(QPageSize(self.size))
-        ps = QPageSize(QPageSize.PageSizeId.AnsiC)
-        printer.setPageSize(ps)
-        printer.setPageOrientation(QPageLayout.Orientation.Landscape)
-        # printer.setPageMargins(QMarginsF(0, 0, 0, 0))
-        printer.setFullPage(True)
-        printer.setOutputFileName(str(file_path))
-
-        # Create a QPainter to render the view content onto the printer
-        painter = QPainter(printer)
-
-        # Render the entire scene to the printer (the PDF)
-        self.render(painter)
-
-        # Finish the painting process
-        painter.end()
-
-        self.crop_pdf(file_path)
-
-    def crop_pdf(self, file_path):
-        reader = PdfReader(file_path)
-        writer = PdfWriter()
-        hw_ratio = self.tablet_size.height / self.tablet_size.width
-
-        sheet = reader.pages[0]
-        crop_box = sheet.cropbox
-
-        # Find the closest key by selecting the key with minimum distance
-        # to the hw_ratio
-        closest_key = min(pdf_crop.keys(), key=lambda k: abs(k - hw_ratio))
-
-        # And that gives us an experimentally derived crop value
-        crop = pdf_crop[closest_key]
-
-        # I did compute a linear function based on the dictionary values that comes close
-        # to the crop data set, but is sometimes off by a little too much.
-        # So I left it commented out here for reference, but use the data set directly to get the best crop value
-        if self.tablet_size.height > self.tablet_size.width: # portrait
-            # crop = 582.65 * hw_ratio - 113.55
-            crop_box.upper_right = (crop_box.upper_right[0] - crop, crop_box.upper_right[1])
-            sheet.cropbox.upper_right = crop_box.upper_right
-        else: # landscape
-            # crop = -1635.53 * hw_ratio + 1259.99
-            crop_box.lower_left = (crop_box.lower_left[0], crop_box.lower_left[1] + crop)
-            sheet.cropbox.lower_left = crop_box.lower_left
-
-        writer.add_page(sheet)
-        with open(file_path, "wb") as fp:
-            writer.write(fp)
-        # with open("cropped.pdf", "wb") as fp:
-        #     writer.write(fp)
+    def save_as_pdf(self, output: Output) -> Optional[bytes]:
+        # Save the scene itself rather than the view widget, so the page is exactly the tablet size
+        return save_scene_as_pdf(self.scene, self.tablet_size, output)
 
 
 class MainWindow(QWidget):
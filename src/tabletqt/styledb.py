@@ -6,13 +6,11 @@ import logging
 from pathlib import Path
 from typing import NamedTuple, Any
 
-# Modelint
-from mi_config.config import Config
-
 # Tablet
 from tabletqt.exceptions import BadConfigData
 from tabletqt.configuration.styles import (FloatRGB, LineStyle, TextStyle, DashPattern)
 from tabletqt.tablet_config import TabletConfig
+from tabletqt.config_cache import ConfigCache
 
 _logger = logging.getLogger(__name__)
 
@@ -34,7 +32,6 @@ config_type = {
     'typefaces': PP(nt=None, pre=False, post=False),
     'text_styles': PP(nt=TextStyle, pre=False, post=True),
     'color_usages': PP(nt=None, pre=False, post=True),
-    'symbols': PP(nt=None, pre=False, post=False),
 }
 
 
@@ -57,9 +54,8 @@ class StyleDB:
     line_style = None
     text_style = None
     color_usage = None
-    raw_config_data = None
     config_data = None
-    symbol = None
+    generation = 0  # Incremented each time new style data is loaded so that derived data can be rebuilt
 
 
     @classmethod
@@ -68,14 +64,17 @@ class StyleDB:
         Processes the config_type dictionary, loading each yaml configuration file into either
         a named tuple or a simple key value dictionary if no named tuple is provided
         and then sets the corresponding StyleDB class attribute to that value
+
+        The files are obtained from the process wide ConfigCache, so if none of them have changed
+        since the last load, there is nothing more to do.
         """
-        _logger.info(f"StyleDB loading tabletqt configuration\n---")
         fspec = {k: v.nt for k,v in config_type.items()}
-        cls.raw_config_data = Config(app_name=TabletConfig.app_name, lib_config_dir=TabletConfig.config_path,
-                                     fspec=fspec)
-        cls.config_data = cls.raw_config_data.loaded_data
+        config_data = ConfigCache.load_many(fspec)
+        if cls.config_data and all(cls.config_data.get(k) is v for k, v in config_data.items()):
+            return  # Same data already loaded and processed
 
-        for fname, cdata in cls.config_data.items():
+        _logger.info(f"StyleDB loading tabletqt configuration\n---")
+        for fname, cdata in config_data.items():
             config_file_path = TabletConfig.config_path / (fname + ".yaml")
             _logger.info(f"loading: {config_file_path}")
             if config_type[fname].pre:
@@ -83,17 +82,33 @@ class StyleDB:
                 method_name = 'preprocess_'+fname
                 method = getattr(cls, method_name, None)
                 # Invoke it on the loaded yaml data
-                method(cls.config_data[fname])
+                method(cdata)
             attr_name = fname[:-1]  # drop the plural 's' from the file name to get the attribute name
             # Assign the loaded and possibly preprocessed yaml data to the relevant class attribute
-            setattr(cls, attr_name, cls.config_data[fname])
+            setattr(cls, attr_name, cdata)
             if config_type[fname].post:
                 method_name = 'postprocess_'+fname  # Keep the plural
                 method = getattr(cls, method_name, None)
                 method()
 
+        # Only now that everything has been validated do we consider the data loaded
+        cls.config_data = config_data
+        cls.generation += 1
         _logger.info(f"---\n")
 
+    @classmethod
+    def install(cls, config_data: dict[str, Any]):
+        """
+        Assigns configuration data that has already been validated, such as the data in a
+        compiled configuration bundle, skipping all pre and post processing
+
+        :param config_data: Validated data keyed by configuration file name
+        """
+        for fname in config_type:
+            setattr(cls, fname[:-1], config_data[fname])
+        cls.config_data = {fname: config_data[fname] for fname in config_type}
+        cls.generation += 1
+
     @classmethod
     def postprocess_text_styles(cls):
         """
@@ -102,7 +117,7 @@ class StyleDB:
         undefined_typefaces = [t.typeface for t in cls.text_style.values() if t.typeface not in cls.typeface]
         if undefined_typefaces:
             _logger.error(f"Undefined typefaces: {undefined_typefaces} encountered in"
-                          f"text styles configuration file:\n    {config_path / 'text_styles.yaml'}")
+                          f"text styles configuration file:\n    {TabletConfig.config_path / 'text_styles.yaml'}")
             raise BadConfigData
 
 
@@ -115,7 +130,7 @@ class StyleDB:
             for n in [rgb.r, rgb.g, rgb.b]:
                 if not 0 <= n <= 255:
                     _logger.error(f"Bad color value [{n}] for: {name} in "
-                                  f"configuration file:\n    {config_path / 'colors.yaml'}")
+                                  f"configuration file:\n    {TabletConfig.config_path / 'colors.yaml'}")
                     raise BadConfigData
             StyleDB.color[name] = rgb
 
@@ -127,7 +142,7 @@ class StyleDB:
         undefined_colors = [c for c in cls.color_usage.values() if c not in cls.color]
         if undefined_colors:
             _logger.error(f"Undefined colors: {undefined_colors} encountered in"
-                          f"color usages configuration file:\n    {config_path / 'color_usages.yaml'}")
+                          f"color usages configuration file:\n    {TabletConfig.config_path / 'color_usages.yaml'}")
             raise BadConfigData
 
     @classmethod
@@ -2,30 +2,26 @@
 tabletqt.py – A multi-layered drawing surface implemented on top of the Qt GUI framework
 """
 # System
+import os
 import logging
 from datetime import datetime  # For initial log entry
 from pathlib import Path
-from typing import Optional
-
-# Qt
-from PyQt6.QtWidgets import QApplication
+from typing import TYPE_CHECKING, Optional, Union, BinaryIO
 
 # Tablet
 from tabletqt.exceptions import NonSystemInitialLayer, TabletBoundsExceeded, MissingConfigData
 from tabletqt.geometry_types import Rect_Size, Position
 from tabletqt.styledb import StyleDB
-from tabletqt.graphics.text_element import TextElement
-from tabletqt.layer import Layer
-from tabletqt.scene_view import MainWindow
-from tabletqt.graphics.image import ImageDE
+from tabletqt.config_bundle import ConfigBundle
 from tabletqt.configuration.styles import FloatRGB
-from tabletqt.graphics.symbol import Symbol
 from tabletqt.resource_library import ResourceLibrary
 
-default_background = FloatRGB(255, 255, 255)  # White
+# Qt and the graphics modules that depend on them are imported only once a Tablet is built
+# so that a client that just needs geometry, style or configuration data doesn't pay for starting up Qt
+if TYPE_CHECKING:
+    from tabletqt.layer import Layer
 
-gui_app = QApplication([]) # Declare it here so it is not garbage collected on repeated instantiation of Tablet
-# We create a Qt App instance just once on the import and then keep using the same one
+default_background = FloatRGB(255, 255, 255)  # White
 
 class Tablet:
     """
@@ -67,25 +63,57 @@ class Tablet:
         - Size -- The height and width of the drawing surface (attribute)
         - Output_file -- A filename or output stream object to be output as a drawing (attribute)
         - Background_color -- The color of the Tablet (visible through all non-opaque layer elements)
+
+    A headless Tablet is intended for servers that only export files. It runs Qt on the offscreen platform
+    and draws on a bare scene without any window, view or widget, so no window system is required.
+
+    A headless Tablet can also paint its PDF immediately from the recorded elements of each Layer rather
+    than building a scene first. No scene or scene items are created at all, which roughly halves the
+    memory and time needed to export a large diagram.
+
+    A Tablet that coalesces geometry draws all unfilled line segments, rectangles and circles of a Layer
+    with one path item per line style rather than an item per shape, so that a large diagram doesn't
+    need tens of thousands of Qt items. Filled shapes keep their place in the draw order, but between them
+    the outlines are drawn grouped by line style, so overlapping outlines of different styles may stack
+    differently. And the shapes can no longer be picked out individually in the scene.
     """
 
-    def __init__(self, size: Rect_Size, output_file: Path, drawing_type: str, presentation: str,
-                 layer: str, show_window: bool = False, background_color: Optional[str] = 'white'):
+    def __init__(self, size: Rect_Size, output_file: Union[Path, BinaryIO, None], drawing_type: str, presentation: str,
+                 layer: str, show_window: bool = False, background_color: Optional[str] = 'white',
+                 headless: bool = False, coalesce_geometry: bool = False, immediate: bool = False,
+                 output_format: Optional[str] = None):
         """
         Constructs a new Tablet instance with a single initial predefined Layer
 
         :param size: Vertical and horizontal span of the entire draw surface in points
-        :param output_file: Name of the drawing file to be generated, PDF only for now
+        :param output_file: Name of the drawing file to be generated. Or any writable binary
+        stream, or None to have render() return the content instead
         :param drawing_type: Initial layer Drawing Type so we know what kinds text and graphics Assets can be drawn
         :param presentation: Initial layer's Presentation so we know what graphic styles to use for our Assets
         :param layer: The name of the predefined initial Layer to be created on this Tablet (typically 'diagram')
         :param background_color: Name of background color defined in colors.yaml
+        :param headless: Export only, never create a window (show_window is ignored)
+        :param coalesce_geometry: Draw unfilled shapes with one path item per line style on each Layer,
+        accepting that overlapping outlines of different line styles may be drawn in a different order
+        :param immediate: Headless only, paint the export directly without building a scene
+        :param output_format: 'pdf', 'svg', 'png' or 'dzi', by default the output file's suffix or else 'pdf'.
+        All but PDF are written directly from the Layer elements, so a headless Tablet never builds a scene for them.
+        A Deep Zoom image (dzi) is a tile pyramid written beside the output file, which must be a path
         """
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"Tablet init: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         self.app_name = "tablet"
 
+        from tabletqt.qt_app import QtApp
+        from tabletqt.layer import Layer
+        from tabletqt.scene_view import MainWindow, create_scene
+        from tabletqt.graphics.image import ImageDE
+        from tabletqt.graphics.symbol import Symbol
+        from tabletqt.graphics.text_element import TextElement
+
         # Load all of the common font, color, etc. styles used by all Presentations from yaml files
+        # (or from the compiled configuration bundle, if it is up to date)
+        ConfigBundle.load()
         StyleDB.load_config_files()
 
         # Ensure the user has an image library
@@ -99,7 +127,14 @@ class Tablet:
         # Establish a system default layer ordering. Not all of them will be used in any given
         # View, but this is the draw order from bottom-most layer upward
         # It can (should be) customizable by the user, but this should work for most diagrams
-        self.show_window = show_window
+        self.headless = headless
+        self.coalesce_geometry = coalesce_geometry
+        self.immediate = immediate and headless
+        if output_format is None:
+            suffix = Path(output_file).suffix.lower() if isinstance(output_file, (str, os.PathLike)) else ''
+            output_format = {'.svg': 'svg', '.png': 'png', '.dzi': 'dzi'}.get(suffix, 'pdf')
+        self.Output_format = output_format
+        self.show_window = show_window and not headless
         try:
             self.background_color = StyleDB.color[background_color]  # This is referenced when filling text underlay rects
         except KeyError:
@@ -107,9 +142,19 @@ class Tablet:
             raise MissingConfigData
         self.layer_order = ['sheet', 'grid', 'frame', 'diagram', 'scenario', 'annotation']
         self.Presentations = {}  # Presentations loaded from the Flatland database, updated by Layer class
-        self.App = gui_app  # QT Application (must be created before any QT widgets)
-        self.Window = MainWindow(title=self.app_name, size=size, background=self.background_color)  # QT widget for drawing 2D elements
-        self.View = self.Window.graphics_view
+        self.App = QtApp.instance(headless=headless)  # QT Application (must be created before any QT widgets)
+        if headless:
+            # Just a scene to draw on, nothing is ever displayed or hit tested
+            # And not even that if we paint the elements directly
+            self.Window = None
+            self.View = None
+            scene_free = self.immediate or self.Output_format != 'pdf'
+            self.Scene = None if scene_free else create_scene(size=size, background=self.background_color,
+                                                              indexed=False)
+        else:
+            self.Window = MainWindow(title=self.app_name, size=size, background=self.background_color)  # QT widget for drawing 2D elements
+            self.View = self.Window.graphics_view
+            self.Scene = self.View.scene
 
         if layer not in self.layer_order:
             raise NonSystemInitialLayer
@@ -121,7 +166,7 @@ class Tablet:
         self.Size = size
         self.Output_file = output_file
 
-    def add_layer(self, name: str, presentation: str, drawing_type: str) -> Optional[Layer]:
+    def add_layer(self, name: str, presentation: str, drawing_type: str) -> Optional['Layer']:
         """
         Populate a new layer by name and return it. If a layer of the same name has already been
         populated, no layer is returned.
@@ -146,6 +191,7 @@ class Tablet:
         :return: A reference to the newly created layer
         """
         if not self.layers.get(name):
+            from tabletqt.layer import Layer
             if name not in self.layer_order:
                 self.layer_order.append(name)
             self.layers[name] = Layer(name=name, tablet=self, presentation=presentation, drawing_type=drawing_type)
@@ -154,21 +200,47 @@ class Tablet:
             self.logger.warning(f"Layer: [{name}] already exists")
             return None
 
-    def render(self):
+    def render(self) -> Optional[bytes]:
         """
         Renders each populated layer of the Tablet moving up the z axis. Any unpopulated layers are skipped.
+
+        :return: The PDF, SVG or PNG content if the Tablet has no output file or stream
         """
+        content = None
+        if self.Output_format != 'pdf':
+            # Written straight from the elements, the scene is only needed to show the window
+            if self.Output_format == 'svg':
+                from tabletqt.export.svg import save_svg
+                content = save_svg(tablet=self, output=self.Output_file)
+            elif self.Output_format == 'png':
+                from tabletqt.export.raster import save_png
+                content = save_png(tablet=self, output=self.Output_file)
+            else:
+                from tabletqt.export.deep_zoom import save_deep_zoom
+                save_deep_zoom(tablet=self, path=self.Output_file)
+            if self.headless:
+                return content
+        elif self.immediate:
+            from tabletqt.export.painter import save_pdf
+            return save_pdf(tablet=self, output=self.Output_file)
+
         # Create and show the drawing window
         [self.layers[name].render() for name in self.layer_order if self.layers.get(name)]
+        if self.headless:
+            from tabletqt.scene_view import save_scene_as_pdf
+            return save_scene_as_pdf(scene=self.Scene, size=self.Size, output=self.Output_file)
+
         self.Window.show()
 
         # Save the rendered tabletqt as a PDF for alternate viewing
-        self.View.save_as_pdf(self.Output_file)
+        if self.Output_format == 'pdf':
+            content = self.View.save_as_pdf(self.Output_file)
 
         # Run the Qt GUI event loop
         # sys.exit(self.App.exec())
         if self.show_window:
             self.App.exec()
+        return content
 
     def to_dc(self, tablet_coord: Position) -> Position:
         """
@@ -0,0 +1,44 @@
+""" conftest.py - Fixtures shared by the tests """
+
+import shutil
+import pytest
+from tabletqt.tablet import Tablet
+from tabletqt.tablet_config import TabletConfig
+from tabletqt.config_cache import ConfigCache
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.line_segment import LineSegment
+from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.text_element import TextElement, TextBlockCorner
+from tabletqt.graphics.symbol import Symbol
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    """
+    A copy of the user's configuration files in a temporary directory, so that a test can edit them
+    """
+    for fpath in TabletConfig.config_path.glob('*' + ConfigCache.ext):
+        # Modification times are kept, so the cached data of unedited files is still current
+        shutil.copy2(ConfigCache.file_path(fpath.stem), tmp_path)
+    shutil.copytree(ConfigCache.user_config_dir / 'images', tmp_path / 'images')
+    monkeypatch.setattr(ConfigCache, 'user_config_dir', tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def class_diagram():
+    """
+    Draws a small class diagram that a test can add the elements it checks to
+    """
+    def draw(output=None, size=Rect_Size(height=300, width=400), drawing_type="xUML class diagram",
+             name='Aircraft', immediate=False) -> Tablet:
+        tablet = Tablet(size=size, output_file=output, drawing_type=drawing_type, presentation="default",
+                        layer="diagram", background_color='white', headless=True, immediate=immediate)
+        dlayer = tablet.layers['diagram']
+        LineSegment.add(layer=dlayer, asset='association stem', from_here=Position(20, 150),
+                        to_there=Position(380, 150))
+        RectangleSE.add(layer=dlayer, asset='class name compartment', lower_left=Position(50, 200),
+                        size=Rect_Size(height=30, width=120))
+        TextElement.pin_block(layer=dlayer, asset='class name', pin=Position(60, 225), text=[name],
+                              corner=TextBlockCorner.UL)
+        Symbol(layer=dlayer, name='superclass', pin=Position(200, 100), angle=90)
+        return tablet
+    return draw
@@ -0,0 +1,45 @@
+""" test_coalesce.py - Coalesced geometry draws the same picture with far fewer items """
+
+import inspect
+from pathlib import Path
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QImage, QPainter
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.line_segment import LineSegment
+from tabletqt.graphics.rectangle_se import RectangleSE
+
+size = Rect_Size(height=300, width=400)
+
+def draw_geometry(output_path: Path, coalesce: bool) -> Tablet:
+    tablet = Tablet(size=size, output_file=output_path, drawing_type="xUML class diagram",
+                    presentation="default", layer="diagram", background_color='white', headless=True,
+                    coalesce_geometry=coalesce)
+    dlayer = tablet.layers['diagram']
+    glayer = tablet.add_layer(name='grid', presentation='default', drawing_type='Grid Diagnostic')
+    for i in range(40):
+        asset = 'association stem' if i % 3 else 'binary association connector'
+        LineSegment.add(layer=dlayer, asset=asset, from_here=Position(10 + i * 9, 20), to_there=Position(30 + i * 8, 280))
+        RectangleSE.add(layer=glayer, asset='grid border', lower_left=Position(5 + i * 9, 5), size=Rect_Size(height=50, width=30))
+    # A filled compartment must still cover the lines drawn underneath it
+    RectangleSE.add(layer=dlayer, asset='imported class name compartment', lower_left=Position(100, 100),
+                    size=Rect_Size(height=60, width=150))
+    tablet.render()
+    return tablet
+
+def rasterize(tablet: Tablet) -> QImage:
+    image = QImage(size.width * 2, size.height * 2, QImage.Format.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    tablet.Scene.render(painter, QRectF(image.rect()), QRectF(0, 0, size.width, size.height))
+    painter.end()
+    return image
+
+def test_coalesced_geometry():
+    function_name = inspect.currentframe().f_code.co_name
+    separate = draw_geometry(Path(f"output/{function_name}_separate.pdf"), coalesce=False)
+    coalesced = draw_geometry(Path(f"output/{function_name}.pdf"), coalesce=True)
+
+    assert len(separate.Scene.items()) == 81
+    assert len(coalesced.Scene.items()) == 4  # Two line styles, one filled compartment, one grid border style
+    assert rasterize(coalesced) == rasterize(separate)
@@ -0,0 +1,37 @@
+""" test_config_bundle.py - Compile the configuration files and load them back in a single read """
+
+import pickle
+from tabletqt.config_bundle import ConfigBundle
+from tabletqt.config_cache import ConfigCache
+from tabletqt.styledb import StyleDB
+
+def test_compile_and_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(ConfigBundle, 'loaded', False)
+    monkeypatch.setattr(ConfigBundle, 'rejected', None)
+    bundle_path = ConfigBundle.compile(path=tmp_path / "config.bundle")
+
+    assert ConfigBundle.load(path=bundle_path)
+    assert ConfigCache.entry('colors').data is StyleDB.color
+
+def test_stale_bundle_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(ConfigBundle, 'loaded', False)
+    monkeypatch.setattr(ConfigBundle, 'rejected', None)
+    bundle_path = ConfigBundle.compile(path=tmp_path / "config.bundle")
+
+    # Pretend the colors file has been edited since the bundle was compiled
+    snapshot = pickle.loads(bundle_path.read_bytes())
+    stamp = snapshot['stamps']['colors']
+    snapshot['stamps']['colors'] = stamp._replace(mtime_ns=stamp.mtime_ns - 1, digest='edited')
+    bundle_path.write_bytes(pickle.dumps(snapshot))
+
+    assert not ConfigBundle.load(path=bundle_path)
+
+    # It isn't read again, until it is recompiled
+    reads = []
+    read = ConfigBundle.read
+    monkeypatch.setattr(ConfigBundle, 'read', lambda path: reads.append(path) or read(path))
+    assert not ConfigBundle.load(path=bundle_path)
+    assert not reads
+    ConfigBundle.compile(path=bundle_path)
+    assert ConfigBundle.load(path=bundle_path)
+    assert reads == [bundle_path]
@@ -0,0 +1,35 @@
+""" test_config_cache.py - Configuration files are parsed once per process """
+
+import os
+import inspect
+from pathlib import Path
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size
+from tabletqt.config_cache import ConfigCache
+
+points_in_mm = 2.83465
+A4 = Rect_Size(round(210 * points_in_mm), round(297 * points_in_mm))
+
+def test_second_tablet_parses_nothing():
+    dtype = "Starr class diagram"
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.pdf")
+
+    Tablet(size=A4, output_file=output_path, drawing_type=dtype,
+           presentation="default", layer="diagram", show_window=False, background_color='white')
+    generation = ConfigCache.generation
+    Tablet(size=A4, output_file=output_path, drawing_type=dtype,
+           presentation="default", layer="diagram", show_window=False, background_color='white')
+    assert ConfigCache.generation == generation
+
+def test_touched_file_not_reparsed(config_dir):
+    colors = ConfigCache.load('colors')
+    generation = ConfigCache.generation
+
+    # Change the modification time, but not the content
+    fpath = ConfigCache.file_path('colors')
+    st = fpath.stat()
+    os.utime(fpath, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert ConfigCache.load('colors') is colors
+    assert ConfigCache.generation == generation
@@ -0,0 +1,33 @@
+""" test_config_sections.py - Drawing Type sections of a configuration file are parsed on demand """
+
+import yaml
+from tabletqt.config_cache import ConfigCache, ConfigSections
+
+notations = """
+# Two notations
+Starr class diagram:
+  1 mult:
+    solid arrow:
+      polygon: [[-3,9], [0,0], [3,9]]
+
+xUML class diagram: # Drawing type
+  superclass:
+    superclass arrow:
+      polygon: [[-8,12], [0,0], [8,12]]
+"""
+
+def test_only_requested_section_parsed():
+    sections = ConfigSections.from_yaml(notations)
+    assert list(sections) == ['Starr class diagram', 'xUML class diagram']
+
+    assert sections['xUML class diagram'] == yaml.safe_load(notations)['xUML class diagram']
+    assert 'Starr class diagram' in sections._sections  # Still unparsed
+
+def test_unrecognized_layout_parsed_whole():
+    sections = ConfigSections.from_yaml("{Starr class diagram: {}, xUML class diagram: {}}")
+    assert dict(sections) == {'Starr class diagram': {}, 'xUML class diagram': {}}
+
+def test_sections_match_full_parse():
+    for fname in ['drawing_types', 'symbols', 'stickers']:
+        full = yaml.safe_load(ConfigCache.file_path(fname).read_text())
+        assert dict(ConfigCache.load_sections(fname)) == full
@@ -0,0 +1,20 @@
+""" test_crayon_box.py - Pens and brushes are made once per style """
+
+from PyQt6.QtWidgets import QGraphicsRectItem
+from tabletqt.styledb import StyleDB
+from tabletqt.graphics.crayon_box import CrayonBox
+
+def test_crayons_shared_until_reload(monkeypatch):
+    StyleDB.load_config_files()
+    pen = CrayonBox.pen('normal')
+    assert CrayonBox.pen('normal') is pen
+    assert CrayonBox.brush('white') is CrayonBox.brush('white')
+
+    item = QGraphicsRectItem(0, 0, 10, 10)
+    CrayonBox.choose_crayons(item=item, border_style='normal', fill='white')
+    assert item.pen() == pen
+    assert item.brush().color().getRgb()[:3] == tuple(StyleDB.color['white'])
+
+    # A reloaded StyleDB gets fresh crayons
+    monkeypatch.setattr(StyleDB, 'generation', StyleDB.generation + 1)
+    assert CrayonBox.pen('normal') is not pen
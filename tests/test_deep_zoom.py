@@ -0,0 +1,55 @@
+""" test_deep_zoom.py - Export a Tablet as a Deep Zoom tile pyramid """
+
+import json
+import inspect
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from PyQt6.QtGui import QImage
+from tabletqt.geometry_types import Rect_Size
+from tabletqt.export.raster import TileIndex
+
+size = Rect_Size(height=600, width=800)
+
+def test_deep_zoom(class_diagram):
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.dzi")
+    tablet = class_diagram(output_path, size=size)
+    assert tablet.Output_format == 'dzi' and tablet.Scene is None
+    tablet.render()
+
+    image = ET.parse(output_path).getroot()
+    assert image.get('TileSize') == '256'
+    size_element = image.find('{http://schemas.microsoft.com/deepzoom/2008}Size')
+    assert (size_element.get('Width'), size_element.get('Height')) == ('3334', '2500')  # 300 dpi
+
+    tiles = Path(f"output/{function_name}_files")
+    levels = sorted(int(p.name) for p in tiles.iterdir())
+    assert levels == list(range(13))  # Up to 2^12 pixels across
+    assert QImage(str(tiles / '0' / '0_0.png')).size().width() == 1
+    # At full resolution, only tiles with something drawn on them are written
+    full = list((tiles / '12').iterdir())
+    assert 0 < len(full) < 14 * 10
+    assert not (tiles / '12' / '0_0.png').exists()
+    # And the viewer fills in the rest with the background
+    options = json.loads(output_path.with_suffix('.json').read_text())
+    assert options == {'tileSources': 'test_deep_zoom.dzi', 'placeholderFillStyle': '#ffffff'}
+    assert QImage(str(tiles / '12' / '0_7.png')).width() == 256  # The connector
+    # The whole image fits on one tile from level 8 down
+    level_8 = QImage(str(tiles / '8' / '0_0.png'))
+    assert (level_8.width(), level_8.height()) == (209, 157)
+
+def test_simplified_detail(class_diagram):
+    tablet = class_diagram(size=size)
+    index = TileIndex(tablet, span=1000, simplify_below=20)
+    layer = index.layers(0, 0)[0]
+    assert not layer.Text and len(layer.TextUnderlayRects) == 1  # The class name is a grey bar
+    assert not layer.Symbols
+    assert layer.Line_segments and layer.Rectangles
+
+def test_stale_tiles_removed(class_diagram):
+    output_path = Path("output/test_stale_tiles_removed.dzi")
+    stale = Path("output/test_stale_tiles_removed_files/12/99_99.png")
+    stale.parent.mkdir(parents=True, exist_ok=True)
+    stale.write_bytes(b'')
+    class_diagram(output_path, size=size).render()
+    assert not stale.exists()
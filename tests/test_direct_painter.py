@@ -0,0 +1,42 @@
+""" test_direct_painter.py - Painting the element lists directly matches a scene render """
+
+import inspect
+from pathlib import Path
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QImage, QPainter
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.line_segment import LineSegment
+from tabletqt.graphics.text_element import TextElement
+from tabletqt.export.painter import paint_page
+
+size = Rect_Size(height=300, width=400)
+
+def labelled_diagram(class_diagram, output_path: Path, immediate: bool) -> Tablet:
+    tablet = class_diagram(output_path, immediate=immediate)
+    dlayer = tablet.layers['diagram']
+    LineSegment.add(layer=dlayer, asset='binary association connector', from_here=Position(200, 20),
+                    to_there=Position(200, 280))
+    TextElement.add_block(layer=dlayer, asset='label', lower_left=Position(210, 140), text=['R1', 'is flying'])
+    tablet.render()
+    return tablet
+
+def rasterize(tablet: Tablet) -> QImage:
+    image = QImage(size.width * 2, size.height * 2, QImage.Format.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    if tablet.Scene:
+        tablet.Scene.render(painter, QRectF(), QRectF(0, 0, size.width, size.height))
+    else:
+        paint_page(painter, tablet)
+    painter.end()
+    return image
+
+def test_direct_painter(class_diagram):
+    function_name = inspect.currentframe().f_code.co_name
+    direct = labelled_diagram(class_diagram, Path(f"output/{function_name}.pdf"), immediate=True)
+    scene = labelled_diagram(class_diagram, Path(f"output/{function_name}_scene.pdf"), immediate=False)
+
+    assert direct.Scene is None
+    assert Path(f"output/{function_name}.pdf").read_bytes().startswith(b'%PDF')
+    assert rasterize(direct) == rasterize(scene)
@@ -0,0 +1,48 @@
+""" test_element_store.py - Layer shapes are stored by column and read back as elements """
+
+import tracemalloc
+import pytest
+from tabletqt import element
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.line_segment import LineSegment
+from tabletqt.element_store import line_segments
+
+def draw_layer(class_diagram):
+    tablet = class_diagram(size=Rect_Size(height=600, width=800), immediate=True)
+    dlayer = tablet.layers['diagram']
+    LineSegment.add(layer=dlayer, asset='binary association connector', from_here=Position(200, 20),
+                    to_there=Position(200, 280.5))
+    return dlayer
+
+def test_elements_read_back(class_diagram):
+    dlayer = draw_layer(class_diagram)
+    segments = dlayer.Line_segments
+    assert len(segments) == 2
+    assert list(segments) == [segments[0], segments[-1]]
+    assert segments[1] == element.Line_Segment(from_here=Position(200, 580), to_there=Position(200, 319.5),
+                                               style=segments[1].style)
+    assert type(segments[1].from_here) is Position and segments[1].from_here.y == 580
+    assert segments.column('to_there.y').tolist() == [450, 319.5]
+    assert len(segments.values['style']) == 2
+
+    rect = dlayer.Rectangles[0]
+    assert rect.upper_left == Position(50, 370) and rect.size == Rect_Size(height=30, width=120)
+    assert rect.top is False and rect.bottom is False
+    with pytest.raises(IndexError):
+        dlayer.Rectangles[1]
+
+def test_compact():
+    segment = element.Line_Segment(from_here=Position(1.5, 2.5), to_there=Position(3.5, 4.5), style='connector')
+    tracemalloc.start()
+    segments = line_segments()
+    for _ in range(10000):
+        segments.append(segment)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert used / 10000 < 48  # Four coordinates and a style id
+
+def test_numpy_columns(class_diagram):
+    np = pytest.importorskip("numpy")
+    dlayer = draw_layer(class_diagram)
+    xs = np.frombuffer(dlayer.Line_segments.column('from_here.x'))
+    assert xs.tolist() == [20, 200]
@@ -0,0 +1,23 @@
+""" test_glyph_table.py - Measuring many lines at once gives the same sizes as Qt """
+
+import random
+import string
+import pytest
+from tabletqt.qt_app import QtApp
+from tabletqt.styledb import StyleDB
+from tabletqt.graphics.text_metrics import TextMetrics
+
+np = pytest.importorskip("numpy")
+
+@pytest.mark.parametrize("text_style", ['p9body', 'p12title', 'footer central', 'coordinate'])
+def test_measure_many_matches_qt(text_style):
+    QtApp.instance()
+    StyleDB.load_config_files()
+    rng = random.Random(text_style)
+    lines = [''.join(rng.choice(string.printable[:95]) for _ in range(rng.randint(1, 30))) for _ in range(500)]
+    lines += ["office file", "Größe", "", "ID {I}"]  # Ligatures, non-ascii and empty lines fall back to Qt
+    key = TextMetrics.font_key(text_style)
+    fm = TextMetrics.metrics(key)
+    sizes = TextMetrics.measure_many(key, lines)
+    assert [(s.height, s.width) for s in sizes] == [(fm.boundingRect(t).height(), fm.boundingRect(t).width())
+                                                     for t in lines]
@@ -0,0 +1,41 @@
+""" test_headless.py - Export a PDF without creating any window """
+
+import inspect
+from pathlib import Path
+from PyQt6.QtWidgets import QGraphicsScene
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.text_element import TextElement
+
+points_in_mm = 2.83465
+A4 = Rect_Size(round(210 * points_in_mm), round(297 * points_in_mm))
+
+def test_headless_export():
+    dtype = "Starr class diagram"
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.pdf")
+
+    test_tablet = Tablet(size=A4, output_file=output_path, drawing_type=dtype,
+                         presentation="default", layer="diagram", show_window=True, background_color='blue steel',
+                         headless=True)
+    dlayer = test_tablet.layers['diagram']
+
+    RectangleSE.add(layer=dlayer, asset="class name compartment", lower_left=Position(100, 100),
+                    size=Rect_Size(height=27, width=253))
+    TextElement.add_block(layer=dlayer, asset='class face name', lower_left=Position(110, 110), text=['Aircraft'])
+    test_tablet.render()
+
+    assert test_tablet.Window is None and test_tablet.View is None
+    assert test_tablet.Scene.itemIndexMethod() == QGraphicsScene.ItemIndexMethod.NoIndex
+    assert output_path.read_bytes().startswith(b'%PDF')
+
+def test_window_after_headless_warns(monkeypatch, caplog):
+    from tabletqt.qt_app import QtApp
+    from tabletqt.measure_context import MeasureContext
+    QtApp.instance(headless=True)
+    monkeypatch.setattr(QtApp, 'made_offscreen', True)  # As if the first Tablet had been headless
+    MeasureContext(drawing_type="Starr class diagram", presentation="default")
+    assert not caplog.records  # Measuring takes whatever application there is
+    QtApp.instance(headless=False)
+    assert 'no window can be shown' in caplog.records[0].getMessage()
@@ -0,0 +1,36 @@
+""" test_import_time.py - Importing tabletqt modules must not start up Qt """
+
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+# Import time budget in milliseconds for each module, measured in a fresh interpreter
+# These are deliberately generous so that a slow CI machine won't fail, the real
+# point is to catch an import that drags in Qt
+import_budget = {
+    'tabletqt': 50,
+    'tabletqt.geometry_types': 100,
+    'tabletqt.styledb': 250,
+    'tabletqt.tablet': 300,
+}
+
+deferred_packages = ['PyQt6']
+
+probe = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': elapsed, 'modules': sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+@pytest.mark.parametrize("module", import_budget)
+def test_import_budget(module):
+    result = subprocess.run([sys.executable, '-c', probe.format(module=module)],
+                            capture_output=True, text=True, check=True, env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)})
+    measured = json.loads(result.stdout)
+
+    assert not set(deferred_packages) & set(measured['modules'])
+    assert measured['ms'] < import_budget[module]
@@ -0,0 +1,13 @@
+""" test_measure_context.py - Measuring without a Tablet """
+
+from tabletqt.measure_context import MeasureContext
+from tabletqt.geometry_types import Rect_Size
+
+def test_measure_context():
+    mc = MeasureContext(drawing_type="Starr class diagram", presentation="default")
+    size = mc.line_size(asset='class face name', text_line="Aircraft")
+    assert size.width > 0 and size.height > 0
+    assert mc.measure_many(asset='class face name', lines=["Aircraft"]) == [size]
+    assert mc.text_block_sizes(blocks=[('class face name', ["Aircraft"])]) == [
+        mc.text_block_size(asset='class face name', text_block=["Aircraft"])]
+    assert mc.symbol_size(name='1 mult') == Rect_Size(height=9, width=3)
@@ -0,0 +1,23 @@
+""" test_metrics_store.py - Text measurements survive from one process to the next """
+
+from tabletqt.qt_app import QtApp
+from tabletqt.styledb import StyleDB
+from tabletqt.graphics.metrics_store import MetricsStore
+from tabletqt.graphics.text_metrics import TextMetrics
+
+def test_store_reopened(tmp_path, monkeypatch):
+    QtApp.instance()
+    StyleDB.load_config_files()
+    db_path = tmp_path / "text_metrics.db"
+    monkeypatch.setattr(TextMetrics, 'store', None)
+    TextMetrics.use_store(db_path)
+    key = TextMetrics.font_key('p12title')
+    size = TextMetrics.line_size(key, "Aircraft")
+    TextMetrics.store.close()
+    TextMetrics.clear()
+
+    # A fresh store finds the size without asking Qt
+    store = MetricsStore(db_path)
+    assert store.get(key, "Aircraft") == size
+    assert store.get(key, "Never measured") is None
+    store.close()
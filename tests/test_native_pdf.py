@@ -0,0 +1,54 @@
+""" test_native_pdf.py - Write PDF content streams directly, reusing symbols and images """
+
+import inspect
+from pathlib import Path
+from PyQt6.QtPdf import QPdfDocument
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.symbol import Symbol
+from tabletqt.graphics.image import ImageDE
+from tabletqt.export.native_pdf import NativePdfWriter
+from tabletqt.export.document import save_pdf_document
+
+size = Rect_Size(height=600, width=800)
+
+def draw_page(class_diagram, name: str):
+    tablet = class_diagram(size=size, name=name, immediate=True)
+    dlayer = tablet.layers['diagram']
+    for k in range(99):  # Besides the one drawn with every class diagram
+        Symbol(layer=dlayer, name='superclass', pin=Position(50 + (k * 37) % 700, 300 + (k * 13) % 250),
+               angle=(k * 90) % 360)
+    ImageDE.add(layer=dlayer, name="mint-small", lower_left=Position(500, 50), size=Rect_Size(180, 24))
+    return tablet
+
+def test_native_pdf(class_diagram):
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.pdf")
+    tablets = [draw_page(class_diagram, 'Aircraft'), draw_page(class_diagram, 'Pilot')]
+    with NativePdfWriter(output_path) as writer:
+        writer.add_pages(tablets)
+    pdf = output_path.read_bytes()
+
+    # One form for all 200 symbols, and the image and its transparency mask written once for both pages
+    assert pdf.count(b'/Subtype /Form') == 1
+    assert pdf.count(b'/Subtype /Image') == 2
+    assert len(pdf) < len(save_pdf_document(tablets, output=None))
+
+    doc = QPdfDocument(None)
+    doc.load(str(output_path))
+    assert doc.pageCount() == 2
+    assert doc.pagePointSize(0).width() == size.width and doc.pagePointSize(0).height() == size.height
+    assert doc.getAllText(0).text() == 'Aircraft'
+    assert doc.getAllText(1).text() == 'Pilot'
+
+def test_raw_rectangle_left_unchanged(class_diagram):
+    from PyQt6.QtGui import QColor
+    from tabletqt.graphics.diagnostic_marker import DiagnosticMarker
+    tablet = class_diagram(immediate=True)
+    dlayer = tablet.layers['diagram']
+    DiagnosticMarker.add_raw_rectangle(layer=dlayer, upper_left=Position(300, 280), size=Rect_Size(20, 40))
+    dlayer.RawRectangles[0].setPen(QColor(255, 0, 0))
+    output_path = Path("output/test_native_pdf_raw_rectangle.pdf")
+    with NativePdfWriter(output_path, compress=False) as writer:
+        writer.add_pages([tablet])
+    assert b'0 0 0 RG' in output_path.read_bytes()  # Stroked in black
+    assert dlayer.RawRectangles[0].pen().color() == QColor(255, 0, 0)
@@ -0,0 +1,42 @@
+""" test_pdf_document.py - Many Tablets as the pages of one PDF """
+
+import re
+import inspect
+from pathlib import Path
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.text_element import TextElement
+from tabletqt.export.document import PdfDocument, save_pdf_document
+
+sizes = [Rect_Size(height=595, width=842), Rect_Size(height=300, width=400), Rect_Size(height=1000, width=333)]
+
+def draw(size: Rect_Size, name: str) -> Tablet:
+    tablet = Tablet(size=size, output_file=None, drawing_type="Starr class diagram",
+                    presentation="default", layer="diagram", background_color='white', headless=True,
+                    immediate=True)
+    dlayer = tablet.layers['diagram']
+    RectangleSE.add(layer=dlayer, asset="class name compartment", lower_left=Position(20, 20),
+                    size=Rect_Size(height=27, width=200))
+    TextElement.add_block(layer=dlayer, asset='class face name', lower_left=Position(30, 30), text=[name])
+    return tablet
+
+def test_pdf_document():
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.pdf")
+    with PdfDocument(output_path) as doc:
+        for i, size in enumerate(sizes):
+            doc.add_page(draw(size, f'Class {i}'))
+    pdf = output_path.read_bytes()
+
+    media_boxes = [[float(v) for v in m.split()] for m in re.findall(rb'/MediaBox \[([\d. ]+)]', pdf)]
+    assert media_boxes == [[0, 0, s.width, s.height] for s in sizes]
+
+    # The font is embedded once for the document, not once per page
+    single = draw(sizes[0], 'Class 0').render()
+    assert pdf.count(b'/FontFile2') == single.count(b'/FontFile2')
+    assert len(pdf) < 3 * len(single)
+
+def test_pdf_document_bytes():
+    pdf = save_pdf_document([draw(s, 'Aircraft') for s in sizes], output=None)
+    assert pdf.startswith(b'%PDF') and len(re.findall(rb'/Type\s*/Page\b', pdf)) == len(sizes)
@@ -0,0 +1,24 @@
+""" test_pdf_size.py - The PDF page is exactly the tablet size """
+
+import re
+import inspect
+import pytest
+from pathlib import Path
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.rectangle_se import RectangleSE
+
+@pytest.mark.parametrize("immediate", [False, True])
+@pytest.mark.parametrize("size", [Rect_Size(height=595, width=842), Rect_Size(height=1000, width=333)])
+def test_exact_page_size(size, immediate):
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}_{size.width}x{size.height}_{immediate}.pdf")
+    tablet = Tablet(size=size, output_file=output_path, drawing_type="Starr class diagram",
+                    presentation="default", layer="diagram", background_color='white', headless=True,
+                    immediate=immediate)
+    RectangleSE.add(layer=tablet.layers['diagram'], asset="class name compartment", lower_left=Position(10, 10),
+                    size=Rect_Size(height=27, width=253))
+    tablet.render()
+
+    media_box = re.search(rb'/MediaBox \[([\d. ]+)]', output_path.read_bytes()).group(1).split()
+    assert [float(v) for v in media_box] == [0, 0, size.width, size.height]
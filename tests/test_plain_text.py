@@ -0,0 +1,39 @@
+""" test_plain_text.py - Plain text items draw exactly where rich text items did """
+
+import inspect
+from pathlib import Path
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QGraphicsSimpleTextItem
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.text_element import TextElement
+
+size = Rect_Size(height=200, width=300)
+
+def draw_text(output_path: Path) -> Tablet:
+    tablet = Tablet(size=size, output_file=output_path, drawing_type="Starr class diagram",
+                    presentation="default", layer="diagram", background_color='white', headless=True)
+    dlayer = tablet.layers['diagram']
+    TextElement.add_block(layer=dlayer, asset='class face name', lower_left=Position(20, 20),
+                          text=['Aircraft', 'ID : Tail number {I}'])
+    TextElement.add_block(layer=dlayer, asset='generalization', lower_left=Position(150, 150), text=['R12'])
+    tablet.render()
+    return tablet
+
+def rasterize(tablet: Tablet) -> QImage:
+    image = QImage(size.width * 4, size.height * 4, QImage.Format.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    tablet.Scene.render(painter, QRectF(image.rect()), QRectF(0, 0, size.width, size.height))
+    painter.end()
+    return image
+
+def test_plain_text_matches_rich_text(monkeypatch):
+    function_name = inspect.currentframe().f_code.co_name
+    plain = draw_text(Path(f"output/{function_name}.pdf"))
+    assert any(isinstance(i, QGraphicsSimpleTextItem) for i in plain.Scene.items())
+
+    monkeypatch.setattr(TextElement, 'plain_text_items', False)
+    rich = draw_text(Path(f"output/{function_name}_rich.pdf"))
+    assert rasterize(plain) == rasterize(rich)
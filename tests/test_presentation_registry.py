@@ -0,0 +1,41 @@
+""" test_presentation_registry.py - Presentations are shared by all Tablets """
+
+import pytest
+import inspect
+from pathlib import Path
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size
+from tabletqt.presentation import PresentationRegistry
+
+points_in_mm = 2.83465
+A4 = Rect_Size(round(210 * points_in_mm), round(297 * points_in_mm))
+
+def test_shared_presentation():
+    dtype = "Starr class diagram"
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.pdf")
+
+    t1 = Tablet(size=A4, output_file=output_path, drawing_type=dtype,
+                presentation="default", layer="diagram", show_window=False, background_color='white')
+    t2 = Tablet(size=A4, output_file=output_path, drawing_type=dtype,
+                presentation="default", layer="diagram", show_window=False, background_color='white')
+    p = t1.layers['diagram'].Presentation
+    assert p is t2.layers['diagram'].Presentation
+
+    with pytest.raises(AttributeError):
+        p.Name = "changed"
+    with pytest.raises(TypeError):
+        p.Text_presentation['class face name'] = {}
+
+def test_edited_drawing_types_reloaded(config_dir):
+    dtype = "Starr class diagram"
+    p = PresentationRegistry.get(dtype, "default")
+    assert PresentationRegistry.get(dtype, "default") is p
+
+    fpath = config_dir / 'drawing_types.yaml'
+    fpath.write_text(fpath.read_text() + "# Edited\n")
+    tablet = Tablet(size=A4, output_file=None, drawing_type=dtype, presentation="default", layer="diagram",
+                    headless=True)
+    edited = tablet.layers['diagram'].Presentation
+    assert edited is not p
+    assert PresentationRegistry.get(dtype, "default") is edited
@@ -0,0 +1,49 @@
+""" test_raster.py - Rasterize a Tablet to PNG in tiles """
+
+import inspect
+from pathlib import Path
+from PyQt6.QtGui import QImage
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.image import ImageDE
+from tabletqt.export.raster import save_png, TileIndex
+from tabletqt.export.items import ItemShape
+
+size = Rect_Size(height=300, width=400)
+
+def test_tiles_match_one_image(class_diagram):
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.png")
+    tablet = class_diagram(output_path)
+    ImageDE.add(layer=tablet.layers['diagram'], name="mint-small", lower_left=Position(200, 20),
+                size=Rect_Size(180, 24))
+    assert tablet.Output_format == 'png' and tablet.Scene is None
+    tablet.render()
+
+    tiled = QImage(str(output_path))
+    whole = QImage.fromData(save_png(tablet, output=None, tile_size=5000))
+    assert tiled.width() == 1667 and tiled.height() == 1250  # 300 dpi
+    assert round(tiled.dotsPerMeterX() * 0.0254) == 300
+    assert tiled == whole
+
+def test_tile_index(class_diagram):
+    tablet = class_diagram()
+    index = TileIndex(tablet, span=100)
+    assert (index.columns, index.rows) == (4, 3)
+    # The connector crosses the middle row of tiles, nothing is drawn in the lower right corner
+    assert all(index.layers(column, 1)[0].Line_segments for column in range(4))
+    assert not index.layers(3, 2)
+    # Painting threads get copies of what each symbol draws, never the Qt item itself
+    symbol = next(layer.Symbols[0] for tile in index.tiles.values() for layer in tile if layer.Symbols)
+    assert all(isinstance(shape, ItemShape) for shape in symbol)
+
+def test_raw_rectangle_left_unchanged(class_diagram):
+    from PyQt6.QtGui import QColor
+    from tabletqt.graphics.diagnostic_marker import DiagnosticMarker
+    tablet = class_diagram()
+    dlayer = tablet.layers['diagram']
+    DiagnosticMarker.add_raw_rectangle(layer=dlayer, upper_left=Position(300, 280), size=Rect_Size(20, 40))
+    dlayer.RawRectangles[0].setPen(QColor(255, 0, 0))
+    pen = dlayer.RawRectangles[0].pen()
+    image = QImage.fromData(save_png(tablet, output=None, dpi=72, antialias=False))
+    assert image.pixelColor(300, 20) == QColor(0, 0, 0)  # Painted in black
+    assert dlayer.RawRectangles[0].pen() == pen  # By the painting threads, without touching the item
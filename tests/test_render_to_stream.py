@@ -0,0 +1,29 @@
+""" test_render_to_stream.py - Render to memory or a stream rather than a file """
+
+import io
+import pytest
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.rectangle_se import RectangleSE
+from tabletqt.graphics.text_element import TextElement
+
+size = Rect_Size(height=200, width=300)
+
+def draw(output, immediate: bool) -> Tablet:
+    tablet = Tablet(size=size, output_file=output, drawing_type="Starr class diagram",
+                    presentation="default", layer="diagram", background_color='white', headless=True,
+                    immediate=immediate)
+    dlayer = tablet.layers['diagram']
+    RectangleSE.add(layer=dlayer, asset="class name compartment", lower_left=Position(20, 20),
+                    size=Rect_Size(height=27, width=200))
+    TextElement.add_block(layer=dlayer, asset='class face name', lower_left=Position(30, 30), text=['Aircraft'])
+    return tablet
+
+@pytest.mark.parametrize("immediate", [False, True])
+def test_render_to_bytes_and_stream(immediate):
+    pdf = draw(None, immediate).render()
+    assert pdf.startswith(b'%PDF') and pdf.rstrip().endswith(b'%%EOF')
+
+    stream = io.BytesIO()
+    assert draw(stream, immediate).render() is None
+    assert stream.getvalue().startswith(b'%PDF') and len(stream.getvalue()) == pytest.approx(len(pdf), rel=0.05)
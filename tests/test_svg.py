@@ -0,0 +1,74 @@
+""" test_svg.py - Write SVG directly from the Layer element lists """
+
+import inspect
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from PyQt6.QtCore import QByteArray
+from PyQt6.QtSvg import QSvgRenderer
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.line_segment import LineSegment
+from tabletqt.graphics.symbol import Symbol
+from tabletqt.graphics.image import ImageDE
+
+size = Rect_Size(height=600, width=800)
+svg_ns = '{http://www.w3.org/2000/svg}'
+
+def draw_diagram(class_diagram, output) -> Tablet:
+    tablet = class_diagram(output, size=size, drawing_type="Starr class diagram", name='Aircraft & <Pilot>')
+    dlayer = tablet.layers['diagram']
+    for y in range(20, 140, 10):
+        LineSegment.add(layer=dlayer, asset='binary association connector', from_here=Position(20, y),
+                        to_there=Position(380, y))
+    for k in range(50):
+        Symbol(layer=dlayer, name='1 mult', pin=Position(50 + k * 10, 300), angle=(k * 90) % 360)
+        Symbol(layer=dlayer, name='Mc mult', pin=Position(50 + k * 10, 400), angle=(k * 90) % 360)
+    ImageDE.add(layer=dlayer, name="mint-small", lower_left=Position(500, 50), size=Rect_Size(180, 24))
+    ImageDE.add(layer=dlayer, name="mint-small", lower_left=Position(500, 100), size=Rect_Size(180, 24))
+    return tablet
+def test_svg(class_diagram):
+    function_name = inspect.currentframe().f_code.co_name
+    output_path = Path(f"output/{function_name}.svg")
+    tablet = draw_diagram(class_diagram, output_path)
+    assert tablet.Output_format == 'svg' and tablet.Scene is None
+    tablet.render()
+    svg = output_path.read_bytes()
+
+    root = ET.fromstring(svg)
+    defs = root.find(f'{svg_ns}defs')
+    assert len(defs.findall(f'{svg_ns}g')) == 3  # One definition per symbol
+    # Drawn from the prototype's components
+    prototype = tablet.layers['diagram'].Symbols[0].prototype
+    assert len(defs.find(f'{svg_ns}g').findall(f'{svg_ns}path')) == len(prototype.components)
+    assert len(defs.findall(f'{svg_ns}image')) == 1
+    layer = root.find(f'{svg_ns}g')
+    assert len(layer.findall(f'{svg_ns}use')) == 103
+    assert len(layer.findall(f'{svg_ns}path')) == 1  # All connectors in one path
+    assert layer.find(f'{svg_ns}text').text == 'Aircraft & <Pilot>'
+    assert b'style=' not in svg
+    assert QSvgRenderer(QByteArray(svg)).isValid()
+
+def test_svg_to_bytes():
+    svg = Tablet(size=size, output_file=None, drawing_type="Starr class diagram", presentation="default",
+                 layer="diagram", headless=True, output_format='svg').render()
+    assert svg.startswith(b'<?xml') and svg.rstrip().endswith(b'</svg>')
+
+def test_style_names_kept_apart():
+    from tabletqt.export.svg import SvgStyles
+    styles = SvgStyles()
+    first = styles.add('line:1 mult', 'line-1-mult', 'stroke:#000000')
+    second = styles.add('line:1-mult', 'line-1-mult', 'stroke:#ff0000')
+    assert (first, second) == ('line-1-mult', 'line-1-mult-2')
+    assert styles.rules[second] == 'stroke:#ff0000'
+
+def test_raw_rectangle_left_unchanged(class_diagram):
+    from PyQt6.QtGui import QColor
+    from tabletqt.graphics.diagnostic_marker import DiagnosticMarker
+    from tabletqt.export.svg import save_svg
+    tablet = class_diagram()
+    dlayer = tablet.layers['diagram']
+    DiagnosticMarker.add_raw_rectangle(layer=dlayer, upper_left=Position(300, 280), size=Rect_Size(20, 40))
+    dlayer.RawRectangles[0].setPen(QColor(255, 0, 0))
+    svg = save_svg(tablet, output=None)
+    assert b'stroke:#000000' in svg and b'stroke:#ff0000' not in svg  # Stroked in black
+    assert dlayer.RawRectangles[0].pen().color() == QColor(255, 0, 0)
@@ -0,0 +1,52 @@
+""" test_symbol_extent.py - Rotated symbol extents computed without Qt items """
+
+import pytest
+from PyQt6.QtCore import QRectF
+from tabletqt.tablet import Tablet
+from tabletqt.measure_context import MeasureContext
+from tabletqt.geometry_types import Rect_Size, Position, Extent
+from tabletqt.graphics.symbol import Symbol
+
+def test_right_angles():
+    mc = MeasureContext(drawing_type="Starr class diagram", presentation="default")
+    assert mc.symbol_extent(name='Mc mult') == Extent(lower_left=Position(-3, 0), size=Rect_Size(height=18, width=6))
+    assert mc.symbol_extent(name='Mc mult', angle=90) == Extent(lower_left=Position(0, -3),
+                                                                size=Rect_Size(height=6, width=18))
+    assert mc.symbol_extent(name='Mc mult', angle=180) == Extent(lower_left=Position(-3, -18),
+                                                                 size=Rect_Size(height=18, width=6))
+    assert Symbol.extent("Starr class diagram", 'Mc mult', 270) is Symbol.extent("Starr class diagram", 'Mc mult', 270)
+
+@pytest.mark.parametrize('name', ['initial pseudo state', 'final pseudo state', 'target state'])
+@pytest.mark.parametrize('angle', [0, 30, 90, 135, 270])
+def test_extent_matches_placed_symbol(name: str, angle: int):
+    tablet = Tablet(size=Rect_Size(height=300, width=400), output_file=None, drawing_type="xUML state machine diagram",
+                    presentation="default", layer="diagram", headless=True, immediate=True)
+    pin = Position(200, 150)
+    item = Symbol(layer=tablet.layers['diagram'], name=name, pin=pin, angle=angle).symbol_item
+    drawn = QRectF()
+    for c in item.prototype.components:
+        drawn = drawn.united(item.sceneTransform().map(c.path).boundingRect())
+
+    extent = Symbol.extent(drawing_type="xUML state machine diagram", name=name, angle=angle)
+    # The device y axis runs down from the top of the tablet
+    device_pin = tablet.to_dc(pin)
+    assert extent.lower_left.x == pytest.approx(drawn.left() - device_pin.x, abs=0.01)
+    assert extent.lower_left.y == pytest.approx(device_pin.y - drawn.bottom(), abs=0.01)
+    assert extent.size.width == pytest.approx(drawn.width(), abs=0.01)
+    assert extent.size.height == pytest.approx(drawn.height(), abs=0.01)
+
+def test_no_tablet_needed(monkeypatch):
+    # As in a process that has yet to create any Tablet or MeasureContext
+    monkeypatch.setattr(Symbol, 'symbol_defs', None)
+    assert Symbol.extent("Starr class diagram", 'superclass', 0).size.height > 0
+    assert Symbol.size(drawing_type="Starr class diagram", name='Mc mult') == Rect_Size(height=18, width=3)
+
+def test_edited_symbols_reloaded(config_dir):
+    extent = Symbol.extent("Starr class diagram", 'Mc mult', 90)
+    fpath = config_dir / 'symbols.yaml'
+    fpath.write_text(fpath.read_text() + "# Edited\n")
+    # Queries use the definitions already loaded, the edit is picked up when the next MeasureContext is built
+    assert Symbol.extent("Starr class diagram", 'Mc mult', 90) is extent
+    MeasureContext(drawing_type="Starr class diagram", presentation="default")
+    edited = Symbol.extent("Starr class diagram", 'Mc mult', 90)
+    assert edited == extent and edited is not extent  # Computed again from the edited file
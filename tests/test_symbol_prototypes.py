@@ -0,0 +1,40 @@
+""" test_symbol_prototypes.py - Each symbol is compiled once and placed by transform """
+
+from PyQt6.QtCore import QPointF
+from tabletqt.tablet import Tablet
+from tabletqt.geometry_types import Rect_Size, Position
+from tabletqt.graphics.symbol import Symbol, SymbolItem
+
+def test_symbol_prototypes():
+    tablet = Tablet(size=Rect_Size(height=600, width=800), output_file=None, drawing_type="Starr class diagram",
+                    presentation="default", layer="diagram", headless=True, immediate=True)
+    dlayer = tablet.layers['diagram']
+    placed = [Symbol(layer=dlayer, name='Mc mult', pin=Position(100 + k, 100), angle=(k * 90) % 360)
+              for k in range(100)]
+
+    assert len(dlayer.Symbols) == 100 and all(isinstance(s, SymbolItem) for s in dlayer.Symbols)
+    prototype = Symbol.prototypes[("Starr class diagram", dlayer.Presentation, 'Mc mult')]
+    assert prototype.key == ("Starr class diagram", "default", 'Mc mult')
+    assert all(s.prototype is prototype for s in dlayer.Symbols)
+    assert len(prototype.components) == 2
+    assert (placed[0].width, placed[0].height) == (3, 18)  # As far as the definition reaches from the pin
+    assert Symbol.size(drawing_type="Starr class diagram", name='Mc mult') == prototype.size
+
+    # The outer arrow tip is drawn 9 points above the pin, rotated about the pin
+    item = dlayer.Symbols[1]
+    assert item.pos() == QPointF(101, 500) and item.rotation() == 90
+    tip = item.sceneTransform().map(QPointF(0, -9))
+    assert round(tip.x()) == 110 and round(tip.y()) == 500
+
+def test_edited_presentation_recompiled(config_dir):
+    dtype = "Starr class diagram"
+    tablet = Tablet(size=Rect_Size(height=600, width=800), output_file=None, drawing_type=dtype,
+                    presentation="default", layer="diagram", headless=True)
+    prototype = Symbol(layer=tablet.layers['diagram'], name='Mc mult', pin=Position(100, 100)).symbol_item.prototype
+
+    fpath = config_dir / 'drawing_types.yaml'
+    fpath.write_text(fpath.read_text() + "# Edited\n")
+    tablet = Tablet(size=Rect_Size(height=600, width=800), output_file=None, drawing_type=dtype,
+                    presentation="default", layer="diagram", headless=True)
+    placed = Symbol(layer=tablet.layers['diagram'], name='Mc mult', pin=Position(100, 100))
+    assert placed.symbol_item.prototype is not prototype  # Styled by the reloaded Presentation
@@ -0,0 +1,19 @@
+""" test_text_block_sizes.py - Sizing many text blocks at once """
+
+from tabletqt.qt_app import QtApp
+from tabletqt.styledb import StyleDB
+from tabletqt.presentation import PresentationRegistry
+from tabletqt.graphics.text_element import TextElement
+
+def test_text_block_sizes():
+    QtApp.instance()
+    StyleDB.load_config_files()
+    p = PresentationRegistry.get("Starr class diagram", "default")
+    blocks = [
+        ('class face name', ["Aircraft"]),
+        ('label', ["ID : Tail number {I}", "Altitude : Distance", "Heading : Compass direction"]),
+        ('class face name', ["Pilot", "Aircraft"]),
+        ('binary association', ["is flying", "1c"]),
+    ]
+    sizes = TextElement.text_block_sizes(presentation=p, blocks=blocks)
+    assert sizes == [TextElement.text_block_size(presentation=p, asset=a, text_block=b) for a, b in blocks]
@@ -0,0 +1,24 @@
+""" test_text_metrics.py - Text measurements are cached by resolved font """
+
+from PyQt6.QtGui import QFont, QFontMetrics
+from tabletqt.qt_app import QtApp
+from tabletqt.styledb import StyleDB
+from tabletqt.graphics.text_metrics import TextMetrics, _measure_line
+
+def test_cached_line_size():
+    QtApp.instance()
+    StyleDB.load_config_files()
+    key = TextMetrics.font_key('p12title')
+    assert TextMetrics.font(key) is TextMetrics.font(key)
+
+    # Same answer as asking Qt directly
+    font = QFont(StyleDB.typeface[StyleDB.text_style['p12title'].typeface], 12)
+    font.setBold(True)
+    rect = QFontMetrics(font).boundingRect("Aircraft")
+    size = TextMetrics.line_size(key, "Aircraft")
+    assert (size.height, size.width) == (rect.height(), rect.width())
+
+    # And the second time it is remembered
+    hits = _measure_line.cache_info().hits
+    TextMetrics.line_size(key, "Aircraft")
+    assert _measure_line.cache_info().hits == hits + 1